@@ -1,55 +1,273 @@
+import asyncio
+import time
 from datetime import datetime
+from datetime import time as time_of_day
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Literal, Optional, Tuple, Union
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
-from supabase import Client
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic_core import to_json
 
-from backend.models.chronotype import ChronotypeCreate, ChronotypeResponse, ChronotypeUpdate
-from backend.dependencies import get_supabase
+from backend.config import settings
+from backend.models.chronotype import (
+    ChronotypeBatchItemResult,
+    ChronotypeBatchPredictRequest,
+    ChronotypeBatchPredictResponse,
+    ChronotypeColumnarResponse,
+    ChronotypeCreate,
+    ChronotypeDataColumns,
+    ChronotypeEnergyAtTime,
+    ChronotypeEnergyRange,
+    ChronotypeFeedback,
+    ChronotypeFeedbackResponse,
+    ChronotypeListResponse,
+    ChronotypePredictRequest,
+    ChronotypePredictResponse,
+    ChronotypeResponse,
+    ChronotypeUpdate,
+    InterpolationMethod,
+    TrainingJobStatus,
+)
+from backend.models.quiz import ChronotypeResult
+from backend.dependencies import get_async_db, get_chronotype_cache, get_rl_engine, get_training_jobs
+from backend.services.async_db import AsyncSupabase
+from backend.services.chronotype_cache import REVISION_COLUMN, CachedChronotype, ChronotypeCache, new_revision
+from backend.services.columnar import decode_data_points, encode_data_points, from_columns, to_columns
+from backend.services.fast_json import FastJSONResponse
+from backend.services.feedback_log import (
+    FEEDBACK_TABLE,
+    drop_feedback,
+    load_feedback,
+    load_feedback_for,
+    load_feedback_rows,
+    with_feedback,
+)
+from backend.services.projection import Projection, load_projected, load_projected_page
+from backend.services.training_jobs import FAILED, SUCCEEDED, TrainingJob, TrainingJobManager
+
+if TYPE_CHECKING:
+    # numpy-backed; imported where they are used so the app starts without numpy.
+    from backend.services.energy_index import EnergyIndex
+    from backend.services.insight_context import InsightContext
+    from backend.services.rl_engine import ChronotypeRLEngine
 
 router = APIRouter(prefix="/chronotype", tags=["Chronotype"])
 
+# Columns behind a full ChronotypeResponse; anything else on the row is never read.
+FULL_VIEW = Projection()
+
 
 def _parse_chronotype(record: dict) -> ChronotypeResponse:
     try:
-        return ChronotypeResponse(**record)
+        if isinstance(record.get("data_points"), dict):
+            record = {**record, "data_points": decode_data_points(record["data_points"])}
+        return ChronotypeResponse.model_validate(record)
     except Exception as exc:  # pragma: no cover - defensive guard
         raise HTTPException(status_code=500, detail=f"Could not parse chronotype record: {exc}")
 
 
+async def _load_stored(db: AsyncSupabase, chronotype_id: str, columns: str) -> Tuple[dict, List[dict]]:
+    """The stored row and its feedback log rows, for a write that folds the log in."""
+    response, feedback_rows = await asyncio.gather(
+        db.table("chronotypes").select(columns).eq("chronotype_id", chronotype_id).execute(),
+        load_feedback_rows(db, chronotype_id),
+    )
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Chronotype not found")
+    return response.data[0], feedback_rows
+
+
+async def _load_chronotype(db: AsyncSupabase, chronotype_id: str) -> CachedChronotype:
+    response, feedback = await asyncio.gather(
+        db.table("chronotypes").select(FULL_VIEW.columns()).eq("chronotype_id", chronotype_id).execute(),
+        load_feedback(db, chronotype_id),
+    )
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Chronotype not found")
+    return CachedChronotype.of(_parse_chronotype(with_feedback(response.data[0], feedback)))
+
+
+async def _read_chronotype(db: AsyncSupabase, cache: ChronotypeCache, chronotype_id: str) -> CachedChronotype:
+    """Combined view through the read-through cache; repeat reads skip Supabase entirely."""
+    return await cache.responses.get_or_compute(chronotype_id, lambda: _load_chronotype(db, chronotype_id))
+
+
+def _etag(cached: CachedChronotype, format: str = "rows") -> str:
+    # Each representation needs its own strong tag; columnar is derived from the same content.
+    return cached.etag if format == "rows" else f'{cached.etag[:-1]}-{format}"'
+
+
+def _etag_matches(header: Optional[str], etags: List[str], weak: bool) -> bool:
+    """Whether an If-Match / If-None-Match header lists one of ``etags`` (or ``*``)."""
+    if header is None:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    if "*" in tags:
+        return True
+    if weak:
+        tags = [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+    return any(tag in etags for tag in tags)
+
+
+def _etag_headers(etag: str) -> Dict[str, str]:
+    # Clients may keep the body but must revalidate before reusing it.
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def _chronotype_response(cached: CachedChronotype, status_code: int = status.HTTP_200_OK) -> FastJSONResponse:
+    """The cached body as is; validated once when cached, serialized once, never again."""
+    return FastJSONResponse(cached.body, status_code=status_code, headers=_etag_headers(cached.etag))
+
+
+def _columnar(chronotype: ChronotypeResponse) -> ChronotypeColumnarResponse:
+    columns = to_columns([dp.model_dump(mode="json") for dp in chronotype.data_points])
+    return ChronotypeColumnarResponse(
+        user_id=chronotype.user_id,
+        chronotype_id=chronotype.chronotype_id,
+        data_columns=ChronotypeDataColumns(**columns),
+    )
+
+
+def _submitted_points(data_points: Optional[list], data_columns: Optional[ChronotypeDataColumns]) -> Optional[List[dict]]:
+    """Data points from a create/update payload, which may carry either rows or columns."""
+    if data_columns is not None:
+        if data_points:
+            raise HTTPException(status_code=400, detail="Send either data_points or data_columns, not both")
+        return from_columns(data_columns.model_dump())
+    if data_points is None:
+        return None
+    return [dp.model_dump() for dp in data_points]
+
+
+def _projection(
+    fields: Optional[str] = Query(None, description="Comma-separated subset of chronotype_id,user_id,data_points"),
+    points_last: Optional[int] = Query(None, ge=0, description="Only the last N data points"),
+    points_from: Optional[time_of_day] = Query(None, description="Only data points at or after this time of day"),
+    points_to: Optional[time_of_day] = Query(None, description="Only data points at or before this time of day; before points_from wraps past midnight"),
+) -> Optional[Projection]:
+    try:
+        return Projection.parse(fields, points_last, points_from, points_to)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
 @router.post("", response_model=ChronotypeResponse, status_code=status.HTTP_201_CREATED)
 async def create_chronotype(
     payload: ChronotypeCreate,
-    db: Client = Depends(get_supabase),
+    db: AsyncSupabase = Depends(get_async_db),
+    cache: ChronotypeCache = Depends(get_chronotype_cache),
 ):
     try:
-        record = payload.model_dump()
+        record = payload.model_dump(exclude={"data_columns"})
         record.setdefault("chronotype_id", str(uuid4()))
-        record["data_points"] = [dp.model_dump() for dp in payload.data_points]
+        record["data_points"] = encode_data_points(_submitted_points(payload.data_points, payload.data_columns))
         record.setdefault("created_at", datetime.utcnow().isoformat())
+        record[REVISION_COLUMN] = new_revision()
 
-        response = db.table("chronotypes").insert(record).execute()
-        if not response.data:
+        read_version = cache.version(record["chronotype_id"])
+        inserted = await db.table("chronotypes").insert(record).execute()
+        if not inserted.data:
+            cache.record_write(record["chronotype_id"])
             raise HTTPException(status_code=400, detail="Failed to create chronotype")
 
-        return _parse_chronotype(response.data[0])
+        created = CachedChronotype.of(_parse_chronotype(inserted.data[0]))
+        cache.record_write(created.chronotype.chronotype_id, read_version, created)
+        return _chronotype_response(created, status.HTTP_201_CREATED)
     except HTTPException:
         raise
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Error creating chronotype: {exc}")
 
 
-@router.get("/{chronotype_id}", response_model=ChronotypeResponse)
+@router.get("", response_model=ChronotypeListResponse)
+async def list_chronotypes(
+    user_id: Optional[str] = Query(None, description="Only this user's chronotypes"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=500),
+    projection: Optional[Projection] = Depends(_projection),
+    db: AsyncSupabase = Depends(get_async_db),
+):
+    """
+    Chronotypes in ``chronotype_id`` order, one page at a time. Pagination is keyset
+    based (``chronotype_id > cursor``), so every page costs the same however deep it is
+    and rows written meanwhile are neither skipped nor repeated.
+    """
+    try:
+        # One extra row tells us whether another page follows.
+        page = await load_projected_page(db, user_id, cursor, limit + 1, projection or FULL_VIEW)
+        next_cursor = page[limit - 1]["chronotype_id"] if len(page) > limit else None
+        return FastJSONResponse({"items": page[:limit], "next_cursor": next_cursor})
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Error listing chronotypes: {exc}")
+
+
+async def _export_lines(db: AsyncSupabase, user_id: Optional[str], projection: Projection) -> AsyncIterator[bytes]:
+    page_size = max(1, settings.chronotype_export_page_size)
+    after: Optional[str] = None
+    while True:
+        page = await load_projected_page(db, user_id, after, page_size, projection)
+        for chronotype in page:
+            yield to_json(chronotype) + b"\n"
+        if len(page) < page_size:
+            return
+        after = page[-1]["chronotype_id"]
+
+
+@router.get("/export")
+async def export_chronotypes(
+    user_id: Optional[str] = Query(None, description="Only this user's chronotypes"),
+    projection: Optional[Projection] = Depends(_projection),
+    db: AsyncSupabase = Depends(get_async_db),
+):
+    """
+    Every chronotype (or one user's) as newline-delimited JSON, one chronotype per line.
+    Rows are fetched ``CHRONOTYPE_EXPORT_PAGE_SIZE`` at a time and streamed as they
+    arrive, so memory use does not grow with the size of the table.
+    """
+    return StreamingResponse(_export_lines(db, user_id, projection or FULL_VIEW), media_type="application/x-ndjson")
+
+
+@router.get("/{chronotype_id}", response_model=Union[ChronotypeResponse, ChronotypeColumnarResponse])
 async def get_chronotype(
     chronotype_id: str,
-    db: Client = Depends(get_supabase),
+    format: Literal["rows", "columnar"] = Query("rows", description="'columnar' returns data_columns instead of data_points"),
+    if_none_match: Optional[str] = Header(None),
+    projection: Optional[Projection] = Depends(_projection),
+    db: AsyncSupabase = Depends(get_async_db),
+    cache: ChronotypeCache = Depends(get_chronotype_cache),
 ):
+    """
+    The chronotype with its appended feedback. Responses carry a strong ``ETag``; a
+    matching ``If-None-Match`` gets ``304 Not Modified`` with no body.
+
+    ``fields`` and the ``points_*`` parameters return part of the chronotype instead,
+    served from the read cache when it has the chronotype and otherwise selecting only
+    the needed columns. Partial responses carry no ETag.
+    """
     try:
-        response = db.table("chronotypes").select("*").eq("chronotype_id", chronotype_id).execute()
-        if not response.data:
-            raise HTTPException(status_code=404, detail="Chronotype not found")
+        if projection is not None:
+            cached_full = cache.responses.get(chronotype_id)
+            if cached_full is not None:
+                projected = projection.project_response(cached_full.chronotype)
+            else:
+                projected = await load_projected(db, chronotype_id, projection)
+                if projected is None:
+                    raise HTTPException(status_code=404, detail="Chronotype not found")
+            if format == "columnar" and "data_points" in projected:
+                projected["data_columns"] = to_columns(projected.pop("data_points"))
+            return FastJSONResponse(projected)
 
-        return _parse_chronotype(response.data[0])
+        cached = await _read_chronotype(db, cache, chronotype_id)
+        etag = _etag(cached, format)
+        if _etag_matches(if_none_match, [etag], weak=True):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_etag_headers(etag))
+
+        if format == "columnar":
+            return FastJSONResponse(_columnar(cached.chronotype), headers=_etag_headers(etag))
+        return _chronotype_response(cached)
     except HTTPException:
         raise
     except Exception as exc:
@@ -60,21 +278,56 @@ async def get_chronotype(
 async def update_chronotype(
     chronotype_id: str,
     payload: ChronotypeUpdate,
-    db: Client = Depends(get_supabase),
+    if_match: Optional[str] = Header(None),
+    db: AsyncSupabase = Depends(get_async_db),
+    cache: ChronotypeCache = Depends(get_chronotype_cache),
 ):
+    """
+    Replace the chronotype's data points. They replace the combined view that GET returns,
+    so appended feedback is folded in and its log rows are deleted. With ``If-Match``, the update only applies if
+    the chronotype still has that ETag (as returned by a GET in either format);
+    otherwise it fails with ``412 Precondition Failed``.
+    """
     try:
         update_data = {}
-        if payload.data_points is not None:
-            update_data["data_points"] = [dp.model_dump() for dp in payload.data_points]
+        points = _submitted_points(payload.data_points, payload.data_columns)
+        if points is not None:
+            update_data["data_points"] = encode_data_points(points)
 
         if not update_data:
             raise HTTPException(status_code=400, detail="No fields to update")
 
-        response = db.table("chronotypes").update(update_data).eq("chronotype_id", chronotype_id).execute()
-        if not response.data:
+        read_version = cache.version(chronotype_id)
+        update_data[REVISION_COLUMN] = new_revision()
+        query = db.table("chronotypes").update(update_data).eq("chronotype_id", chronotype_id)
+        if if_match is not None:
+            # Checked against the stored row, not the cache, which may lag other workers.
+            record, feedback_rows = await _load_stored(db, chronotype_id, f"{FULL_VIEW.columns()},{REVISION_COLUMN}")
+            current = CachedChronotype.of(
+                _parse_chronotype(with_feedback(record, [row["data_point"] for row in feedback_rows]))
+            )
+            if not _etag_matches(if_match, [_etag(current), _etag(current, "columnar")], weak=False):
+                raise HTTPException(status_code=412, detail="Chronotype has been modified")
+            # Only write the row that was checked; rows from before revisions have none.
+            revision = record.get(REVISION_COLUMN)
+            query = query.eq(REVISION_COLUMN, revision) if revision is not None else query.is_(REVISION_COLUMN, "null")
+        else:
+            feedback_rows = await load_feedback_rows(db, chronotype_id)
+
+        # The submitted points replace the combined view, appended feedback included, so
+        # the log rows folded into it are dropped rather than appended a second time.
+        # Feedback appended after that read is kept, after the new points.
+        written = await query.execute()
+        if not written.data:
+            cache.record_write(chronotype_id)
+            if if_match is not None:
+                raise HTTPException(status_code=412, detail="Chronotype has been modified")
             raise HTTPException(status_code=404, detail="Chronotype not found")
+        await drop_feedback(db, feedback_rows)
 
-        return _parse_chronotype(response.data[0])
+        updated = CachedChronotype.of(_parse_chronotype(written.data[0]))
+        cache.record_write(chronotype_id, read_version, updated)
+        return _chronotype_response(updated)
     except HTTPException:
         raise
     except Exception as exc:
@@ -84,16 +337,403 @@ async def update_chronotype(
 @router.delete("/{chronotype_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_chronotype(
     chronotype_id: str,
-    db: Client = Depends(get_supabase),
+    db: AsyncSupabase = Depends(get_async_db),
+    cache: ChronotypeCache = Depends(get_chronotype_cache),
 ):
     try:
-        response = db.table("chronotypes").delete().eq("chronotype_id", chronotype_id).execute()
+        response = await db.table("chronotypes").delete().eq("chronotype_id", chronotype_id).execute()
+        cache.record_write(chronotype_id)
         if not response.data:
             raise HTTPException(status_code=404, detail="Chronotype not found")
 
+        await db.table(FEEDBACK_TABLE).delete().eq("chronotype_id", chronotype_id).execute()
+
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     except HTTPException:
         raise
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Error deleting chronotype: {exc}")
 
+
+@router.post(
+    "/{chronotype_id}/feedback",
+    response_model=ChronotypeFeedbackResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def append_chronotype_feedback(
+    chronotype_id: str,
+    payload: ChronotypeFeedback,
+    db: AsyncSupabase = Depends(get_async_db),
+    cache: ChronotypeCache = Depends(get_chronotype_cache),
+):
+    """
+    Append feedback data points without touching the stored data_points array.
+    Reads of the chronotype return them after the stored points, oldest first.
+    """
+    try:
+        existing = await db.table("chronotypes").select("chronotype_id").eq("chronotype_id", chronotype_id).execute()
+        if not existing.data:
+            raise HTTPException(status_code=404, detail="Chronotype not found")
+
+        recorded_at = datetime.utcnow().isoformat()
+        rows = [
+            {
+                "feedback_id": str(uuid4()),
+                "chronotype_id": chronotype_id,
+                "data_point": dp.model_dump(mode="json"),
+                "recorded_at": recorded_at,
+            }
+            for dp in payload.data_points
+        ]
+
+        response = await db.table(FEEDBACK_TABLE).insert(rows).execute()
+        cache.record_write(chronotype_id)
+        if not response.data:
+            raise HTTPException(status_code=400, detail="Failed to record feedback")
+
+        return ChronotypeFeedbackResponse(chronotype_id=chronotype_id, appended=len(response.data))
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Error recording feedback: {exc}")
+
+
+async def _load_training_input(db: AsyncSupabase, chronotype_id: str) -> Tuple[dict, List[dict]]:
+    """The chronotype's combined view as JSON plus the feedback log rows folded into it."""
+    record, feedback_rows = await _load_stored(db, chronotype_id, FULL_VIEW.columns())
+    chronotype = _parse_chronotype(
+        with_feedback(record, [row["data_point"] for row in feedback_rows])
+    ).model_dump(mode="json")
+    return chronotype, feedback_rows
+
+
+async def _store_prediction(
+    db: AsyncSupabase, cache: ChronotypeCache, chronotype_id: str, result: dict, feedback_rows: List[dict]
+) -> ChronotypeResponse:
+    """Persist a retrained curve and drop the feedback log rows it absorbed."""
+    updated = _parse_chronotype(result["chronotype"])
+    await db.table("chronotypes").update(
+        {
+            "data_points": encode_data_points([dp.model_dump(mode="json") for dp in updated.data_points]),
+            REVISION_COLUMN: new_revision(),
+        }
+    ).eq("chronotype_id", chronotype_id).execute()
+    cache.record_write(chronotype_id)
+    await drop_feedback(db, feedback_rows)
+    return updated
+
+
+def _job_status(job: TrainingJob) -> TrainingJobStatus:
+    return TrainingJobStatus(
+        job_id=job.job_id,
+        chronotype_id=job.chronotype_id,
+        status=job.status,
+        submitted_at=job.submitted_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        coalesced_submissions=job.coalesced_submissions,
+        training_metadata=job.training_metadata,
+        error=job.error,
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=TrainingJobStatus)
+async def get_training_job(
+    job_id: str,
+    jobs: TrainingJobManager = Depends(get_training_jobs),
+):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    return _job_status(job)
+
+
+@router.get("/cache/stats")
+async def chronotype_cache_stats(cache: ChronotypeCache = Depends(get_chronotype_cache)):
+    """Hit/miss counters for the chronotype read and energy-index caches."""
+    return cache.stats()
+
+
+@router.post(
+    "/{chronotype_id}/predict",
+    response_model=ChronotypePredictResponse,
+    responses={status.HTTP_202_ACCEPTED: {"model": TrainingJobStatus}},
+)
+async def predict_chronotype(
+    chronotype_id: str,
+    payload: ChronotypePredictRequest,
+    mode: Literal["sync", "async"] = Query(
+        "sync", description="'async' queues a background training job and returns 202 with its id"
+    ),
+    db: AsyncSupabase = Depends(get_async_db),
+    engine: "ChronotypeRLEngine" = Depends(get_rl_engine),
+    jobs: TrainingJobManager = Depends(get_training_jobs),
+    cache: ChronotypeCache = Depends(get_chronotype_cache),
+):
+    """
+    Retrain the chronotype's energy model on its data points, appended feedback and the
+    feedback in this request, then store the re-predicted curve.
+
+    The appended feedback log is folded into the stored data points by this write.
+    """
+    try:
+        feedback = [point.model_dump(mode="json", exclude_unset=True) for point in payload.feedback]
+        config = payload.training_config.model_dump(exclude_unset=True)
+
+        if mode == "async":
+            existing = await db.table("chronotypes").select("chronotype_id").eq("chronotype_id", chronotype_id).execute()
+            if not existing.data:
+                raise HTTPException(status_code=404, detail="Chronotype not found")
+
+            async def run(job: TrainingJob) -> dict:
+                # Loaded when the job starts, so a coalesced follow-up sees the latest data.
+                chronotype, feedback_rows = await _load_training_input(db, chronotype_id)
+                result = await jobs.run_in_executor(engine.train_and_predict, chronotype, job.feedback, job.config)
+                await _store_prediction(db, cache, chronotype_id, result, feedback_rows)
+                return result
+
+            job, _ = jobs.submit(chronotype_id, feedback, config, run)
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content=_job_status(job).model_dump(mode="json"),
+            )
+
+        chronotype, feedback_rows = await _load_training_input(db, chronotype_id)
+
+        # Training is CPU-bound; keep it off the event loop.
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(None, engine.train_and_predict, chronotype, feedback, config)
+        updated = await _store_prediction(db, cache, chronotype_id, result, feedback_rows)
+
+        return FastJSONResponse(
+            ChronotypePredictResponse(
+                chronotype_id=chronotype_id,
+                updated_chronotype=updated,
+                training_metadata=result.get("training_metadata", {}),
+            )
+        )
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Error predicting chronotype: {exc}")
+
+
+async def _load_batch(db: AsyncSupabase, payload: ChronotypeBatchPredictRequest) -> Dict[str, dict]:
+    """Requested chronotypes keyed by id: explicit ids first, then each user's, without duplicates."""
+    queries = []
+    if payload.chronotype_ids:
+        queries.append(db.table("chronotypes").select("*").in_("chronotype_id", payload.chronotype_ids).execute())
+    if payload.user_ids:
+        queries.append(db.table("chronotypes").select("*").in_("user_id", payload.user_ids).execute())
+
+    records: Dict[str, dict] = {}
+    for response in await asyncio.gather(*queries):
+        for record in response.data:
+            records.setdefault(record["chronotype_id"], record)
+
+    ordered = {cid: records[cid] for cid in payload.chronotype_ids if cid in records}
+    ordered.update((cid, record) for cid, record in records.items() if cid not in ordered)
+    return ordered
+
+
+async def _predict_chunk(
+    db: AsyncSupabase,
+    cache: ChronotypeCache,
+    engine: "ChronotypeRLEngine",
+    records: List[dict],
+    config: dict,
+) -> List[ChronotypeBatchItemResult]:
+    """Retrain one chunk as a stacked batch and write the successes back in one upsert."""
+    ids = [record["chronotype_id"] for record in records]
+    feedback_rows = await load_feedback_for(db, ids)
+
+    results: Dict[str, ChronotypeBatchItemResult] = {}
+    inputs: List[Tuple[dict, List[dict]]] = []
+    trained: List[dict] = []
+    for record in records:
+        cid = record["chronotype_id"]
+        feedback = [row["data_point"] for row in feedback_rows[cid]]
+        try:
+            chronotype = ChronotypeResponse.model_validate(with_feedback(record, feedback)).model_dump(mode="json")
+        except Exception as exc:
+            results[cid] = ChronotypeBatchItemResult(chronotype_id=cid, status=FAILED, error=f"Invalid chronotype: {exc}")
+            continue
+        inputs.append((chronotype, []))
+        trained.append(record)
+
+    loop = asyncio.get_running_loop()
+    outcomes = await loop.run_in_executor(None, engine.train_and_predict_batch, inputs, config)
+
+    upserts: List[dict] = []
+    absorbed: List[str] = []
+    for record, outcome in zip(trained, outcomes):
+        cid = record["chronotype_id"]
+        if isinstance(outcome, Exception):
+            results[cid] = ChronotypeBatchItemResult(chronotype_id=cid, status=FAILED, error=str(outcome))
+            continue
+        # The engine's points are the validated input's JSON dump plus float predictions,
+        # so they are encoded as they are rather than validated a second time.
+        upserts.append(
+            {
+                **record,
+                "data_points": encode_data_points(outcome["chronotype"]["data_points"]),
+                REVISION_COLUMN: new_revision(),
+            }
+        )
+        absorbed.extend(row["feedback_id"] for row in feedback_rows[cid])
+        results[cid] = ChronotypeBatchItemResult(
+            chronotype_id=cid, status=SUCCEEDED, training_metadata=outcome.get("training_metadata", {})
+        )
+
+    if upserts:
+        try:
+            await db.table("chronotypes").upsert(upserts, on_conflict="chronotype_id").execute()
+            for row in upserts:
+                cache.record_write(row["chronotype_id"])
+            if absorbed:
+                await db.table(FEEDBACK_TABLE).delete().in_("feedback_id", absorbed).execute()
+        except Exception as exc:
+            for row in upserts:
+                results[row["chronotype_id"]] = ChronotypeBatchItemResult(
+                    chronotype_id=row["chronotype_id"], status=FAILED, error=f"Could not store prediction: {exc}"
+                )
+
+    return [results[cid] for cid in ids]
+
+
+@router.post("/predict/batch", response_model=ChronotypeBatchPredictResponse)
+async def predict_chronotypes_batch(
+    payload: ChronotypeBatchPredictRequest,
+    db: AsyncSupabase = Depends(get_async_db),
+    engine: "ChronotypeRLEngine" = Depends(get_rl_engine),
+    cache: ChronotypeCache = Depends(get_chronotype_cache),
+):
+    """
+    Retrain many chronotypes at once, e.g. for a nightly refresh.
+
+    Chronotypes are loaded in one query, trained in stacked chunks of
+    ``BATCH_PREDICT_CHUNK_SIZE`` and written back with one upsert per chunk. Each
+    chronotype gets its own result, so a bad record does not fail the batch.
+    """
+    if not payload.chronotype_ids and not payload.user_ids:
+        raise HTTPException(status_code=400, detail="Provide chronotype_ids or user_ids")
+
+    try:
+        started = time.perf_counter()
+        config = payload.training_config.model_dump(exclude_unset=True)
+        records = await _load_batch(db, payload)
+
+        by_id = {
+            cid: ChronotypeBatchItemResult(chronotype_id=cid, status=FAILED, error="Chronotype not found")
+            for cid in payload.chronotype_ids
+            if cid not in records
+        }
+        chunk_size = max(1, settings.batch_predict_chunk_size)
+        pending = list(records.values())
+        for offset in range(0, len(pending), chunk_size):
+            for result in await _predict_chunk(db, cache, engine, pending[offset : offset + chunk_size], config):
+                by_id[result.chronotype_id] = result
+        results = [by_id[cid] for cid in dict.fromkeys([*payload.chronotype_ids, *records])]
+
+        elapsed = time.perf_counter() - started
+        succeeded = sum(result.status == SUCCEEDED for result in results)
+        return ChronotypeBatchPredictResponse(
+            results=results,
+            succeeded=succeeded,
+            failed=len(results) - succeeded,
+            elapsed_seconds=elapsed,
+            chronotypes_per_second=succeeded / elapsed if elapsed > 0 else 0.0,
+        )
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Error predicting chronotypes: {exc}")
+
+
+async def _load_energy_index(db: AsyncSupabase, cache: ChronotypeCache, chronotype_id: str) -> Optional["EnergyIndex"]:
+    from backend.services.energy_index import build_index
+
+    cached = await _read_chronotype(db, cache, chronotype_id)
+    return build_index([dp.model_dump() for dp in cached.chronotype.data_points])
+
+
+async def _load_quiz_result(db: AsyncSupabase, chronotype_id: str) -> Optional[ChronotypeResult]:
+    # None until the quiz_submissions write-behind buffer has flushed the submission.
+    response = await (
+        db.table("quiz_submissions")
+        .select("chronotype_result")
+        .eq("chronotype_id", chronotype_id)
+        .order("submitted_at", desc=True)
+        .limit(1)
+        .execute()
+    )
+    return ChronotypeResult.model_validate(response.data[0]["chronotype_result"]) if response.data else None
+
+
+async def _load_insight_context(db: AsyncSupabase, cache: ChronotypeCache, chronotype_id: str) -> "InsightContext":
+    from backend.services.insight_context import build_insight_context
+
+    cached, index, result = await asyncio.gather(
+        _read_chronotype(db, cache, chronotype_id),
+        cache.energy.get_or_compute(chronotype_id, lambda: _load_energy_index(db, cache, chronotype_id)),
+        _load_quiz_result(db, chronotype_id),
+    )
+    return build_insight_context(cached.chronotype, result, index)
+
+
+async def load_insight_context(db: AsyncSupabase, cache: ChronotypeCache, chronotype_id: str) -> "InsightContext":
+    """
+    Compact summary of a chronotype for grounding a Gemini prompt, cached per chronotype
+    version so repeat questions skip Supabase and the summarising. Raises 404 when the
+    chronotype doesn't exist.
+    """
+    return await cache.insights.get_or_compute(chronotype_id, lambda: _load_insight_context(db, cache, chronotype_id))
+
+
+@router.get(
+    "/{chronotype_id}/energy",
+    response_model=Union[ChronotypeEnergyAtTime, ChronotypeEnergyRange],
+)
+async def get_chronotype_energy(
+    chronotype_id: str,
+    t: Optional[time_of_day] = Query(None, description="Time of day (HH:MM) for a single reading"),
+    start: Optional[time_of_day] = Query(None, alias="from", description="Start of a range (HH:MM)"),
+    end: Optional[time_of_day] = Query(None, alias="to", description="End of a range (HH:MM); before 'from' wraps past midnight"),
+    step: int = Query(15, ge=1, le=1440, description="Range step in minutes"),
+    method: InterpolationMethod = Query("linear", description="'linear' or 'spline' interpolation"),
+    db: AsyncSupabase = Depends(get_async_db),
+    cache: ChronotypeCache = Depends(get_chronotype_cache),
+):
+    """
+    Predicted energy at a time of day (``?t=``) or across a range (``?from=&to=&step=``),
+    interpolated between the chronotype's data points.
+    """
+    if t is None and (start is None or end is None):
+        raise HTTPException(status_code=400, detail="Provide t, or both from and to")
+    from backend.services.energy_index import format_seconds, time_range
+
+    try:
+        index = await cache.energy.get_or_compute(chronotype_id, lambda: _load_energy_index(db, cache, chronotype_id))
+        if index is None:
+            raise HTTPException(status_code=404, detail="Chronotype has no data points")
+
+        if t is not None:
+            return ChronotypeEnergyAtTime(
+                chronotype_id=chronotype_id,
+                time_of_day=t,
+                energy_level=index.at(t, method),
+                method=method,
+            )
+
+        seconds = time_range(start, end, step * 60)
+        return ChronotypeEnergyRange(
+            chronotype_id=chronotype_id,
+            method=method,
+            step_minutes=step,
+            times=format_seconds(seconds),
+            energy_levels=index.between(seconds, method).tolist(),
+        )
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Error reading chronotype energy: {exc}")
@@ -1,6 +1,17 @@
-from fastapi import APIRouter, HTTPException
-from backend.services.gemini_wrapper import GeminiWrapper
+from typing import AsyncGenerator, AsyncIterator, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+from backend.api.chronotype import load_insight_context
+from backend.dependencies import get_async_db, get_chronotype_cache
+from backend.services.async_db import AsyncSupabase
+from backend.services.chronotype_cache import ChronotypeCache
+from backend.services.concurrency import LimiterRejected
+from backend.services.gemini_wrapper import GeminiWrapper, insight_prompt
+from backend.services.http_pool import ConnectionWarmer
 from backend.models.gemini import ChatRequest, ChatResponse
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -8,29 +19,174 @@ logger.setLevel(logging.INFO)
 
 router = APIRouter(prefix="/gemini", tags=["Gemini"])
 
-# Initialize Gemini wrapper
-try:
-    gemini = GeminiWrapper()
-except ValueError as e:
-    print(f"Warning: {e}")
-    gemini = None
+# Built at startup by add_gemini_probe() when connection warm-up is on, otherwise by
+# the first request that needs it; never at import, as constructing it loads
+# google-genai and the app has to start without a GOOGLE_API_KEY.
+gemini: Optional[GeminiWrapper] = None
 
-@router.post("/chat", response_model=ChatResponse)
-async def chat_with_gemini(request: ChatRequest):
-    """
-    Chat endpoint for frontend to interact with Gemini.
-    """
-    print('hi')
-    print(request)
+
+def get_gemini() -> Optional[GeminiWrapper]:
+    """The shared wrapper, built on first call; ``None`` without a GOOGLE_API_KEY."""
+    global gemini
     if gemini is None:
+        try:
+            gemini = GeminiWrapper()
+        except ValueError as e:
+            logger.warning("Gemini unavailable: %s", e)
+    return gemini
+
+
+def add_gemini_probe(warmer: ConnectionWarmer) -> None:
+    wrapper = get_gemini()
+    if wrapper is None:
+        warmer.skip("gemini", "GOOGLE_API_KEY not set")
+    else:
+        warmer.add("gemini", wrapper.warm_up)
+
+
+async def close_gemini() -> None:
+    global gemini
+    wrapper, gemini = gemini, None
+    if isinstance(wrapper, GeminiWrapper):
+        await wrapper.aclose()
+
+
+def _require_gemini() -> GeminiWrapper:
+    wrapper = get_gemini()
+    if wrapper is None:
         raise HTTPException(
             status_code=500, 
             detail="Gemini API not configured. Please set GOOGLE_API_KEY environment variable."
         )
+    return wrapper
+
+
+def _overloaded(exc: LimiterRejected) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=f"Gemini is busy ({exc.reason}), please retry shortly.",
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+async def _insight_context(request: ChatRequest, db: AsyncSupabase, cache: ChronotypeCache) -> Optional[str]:
+    if request.chronotype_id is None:
+        return None
+    return (await load_insight_context(db, cache, request.chronotype_id)).text
+
+
+class _UpstreamStreamingResponse(StreamingResponse):
+    """
+    A streaming response that owns the upstream stream it relays, and closes it
+    however the response ends. The body generator's own ``finally`` only runs once
+    iteration has started, so a client that disconnects before the first chunk is
+    sent would otherwise leave the stream, and its limiter slot, open.
+    """
+
+    def __init__(self, content: AsyncIterator[str], upstream: AsyncGenerator, **kwargs):
+        super().__init__(content, **kwargs)
+        self.upstream = upstream
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.upstream.aclose()
+
+
+def _sse_event(data: dict, event: Optional[str] = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+@router.post("/chat", response_model=ChatResponse)
+async def chat_with_gemini(
+    request: ChatRequest,
+    db: AsyncSupabase = Depends(get_async_db),
+    cache: ChronotypeCache = Depends(get_chronotype_cache),
+):
+    """
+    Chat endpoint for frontend to interact with Gemini. With a ``chronotype_id`` the
+    prompt carries a compact summary of that chronotype (404 if it doesn't exist).
+    """
+    wrapper = _require_gemini()
+    context = await _insight_context(request, db, cache)
     
     try:
-        response = gemini.chat(request.message, request.model)
+        response = await wrapper.chat_async(request.message, request.model, context=context)
         return ChatResponse(response=response, success=True)
+    except LimiterRejected as e:
+        raise _overloaded(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating response: {str(e)}")
 
+
+@router.get("/cache/stats")
+async def gemini_cache_stats():
+    """
+    Hit/miss counters for the chat response cache, for sizing GEMINI_CACHE_MAX_ENTRIES.
+    """
+    return _require_gemini().cache.stats()
+
+
+@router.get("/limiter/stats")
+async def gemini_limiter_stats():
+    """
+    Upstream concurrency, queue depth and queue wait-time metrics for the Gemini limiter.
+    """
+    return _require_gemini().limiter.stats()
+
+
+@router.post("/chat/stream")
+async def stream_chat_with_gemini(
+    request: ChatRequest,
+    db: AsyncSupabase = Depends(get_async_db),
+    cache: ChronotypeCache = Depends(get_chronotype_cache),
+):
+    """
+    Streaming chat endpoint, grounded like ``/chat``. Sends the response as Server-Sent Events:
+
+        data: {"text": "<fragment>"}     one per generated chunk
+        event: done                      once the model has finished
+        event: error                     if generation fails mid-stream
+    """
+    wrapper = _require_gemini()
+    context = await _insight_context(request, db, cache)
+    fragments = wrapper.stream_content(insight_prompt(request.message, context), request.model)
+
+    # Pull the first fragment before committing to a 200 so that admission
+    # rejections and immediate upstream failures become real HTTP errors.
+    try:
+        first = await fragments.__anext__()
+    except StopAsyncIteration:
+        first = None
+    except LimiterRejected as e:
+        raise _overloaded(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generating response: {str(e)}")
+
+    async def events() -> AsyncIterator[str]:
+        # Closing the upstream stream releases its limiter slot right away when the
+        # client disconnects, instead of whenever the generator is garbage-collected.
+        try:
+            if first is None:
+                yield _sse_event({"success": True}, event="done")
+                return
+            yield _sse_event({"text": first})
+            try:
+                async for fragment in fragments:
+                    yield _sse_event({"text": fragment})
+            except Exception as e:
+                logger.exception("Gemini stream failed")
+                yield _sse_event({"detail": f"Error generating response: {str(e)}"}, event="error")
+                return
+            yield _sse_event({"success": True}, event="done")
+        finally:
+            await fragments.aclose()
+
+    return _UpstreamStreamingResponse(
+        events(),
+        upstream=fragments,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
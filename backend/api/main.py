@@ -1,20 +1,46 @@
 import os
+from contextlib import asynccontextmanager
 from datetime import datetime
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from supabase import Client
+from fastapi.responses import JSONResponse, PlainTextResponse
 
-from backend.dependencies import get_supabase
+from backend.dependencies import (
+    close_connection_pools,
+    close_quiz_submission_buffer,
+    get_connection_warmer,
+    get_rl_engine,
+    get_supabase,
+    shutdown_training_jobs,
+)
 
 from backend.api.chronotype import router as chronotype_router
 from backend.api.quiz import router as quiz_router
-from backend.api.gemini import router as gemini_router
+from backend.api.gemini import add_gemini_probe, close_gemini, router as gemini_router
+from backend.services.http_pool import ConnectionWarmer
+from backend.services.metrics import REGISTRY, MetricsMiddleware
+from backend.services.profiling import ProfilingMiddleware
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Open upstream connections before serving, so the first requests don't pay for them
+    warmer = await get_connection_warmer()
+    if warmer.enabled:
+        add_gemini_probe(warmer)
+    await warmer.start()
+    yield
+    await close_quiz_submission_buffer()
+    shutdown_training_jobs()
+    await close_connection_pools()
+    await close_gemini()
+
 
 app = FastAPI(
     title="Sero Backend API",
     description="FastAPI backend with Supabase integration for Sero chronotype tracking",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
 )
 
 # add chronotype endpoints router
@@ -39,6 +65,26 @@ app.add_middleware(
 )
 
 
+# Reads PROFILING_ENABLED on the first request, so building the app needs no settings
+app.add_middleware(ProfilingMiddleware)
+
+# Added last so it is outermost and times everything, CORS included
+app.add_middleware(MetricsMiddleware)
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Request, Supabase and Gemini metrics in Prometheus text format"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/ready")
+async def ready(warmer: ConnectionWarmer = Depends(get_connection_warmer)):
+    """Readiness probe: 200 once upstream connections are warm, 503 until then"""
+    status = warmer.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
@@ -0,0 +1 @@
+"""Performance benchmarks for the backend. Run modules with ``python -m backend.benchmarks.<name>``."""
@@ -0,0 +1,170 @@
+"""
+Concurrent throughput of the chronotype routes against a slow fake Supabase client.
+
+Each request reads a different chronotype through a fresh read cache, so every one
+goes to the store. Compares two data paths on the same app:
+
+* ``inline``  - ``execute()`` runs directly on the event loop (the old behaviour)
+* ``offload`` - ``execute()`` runs on the bounded thread pool behind ``get_async_db``
+
+Usage (from the repository root)::
+
+    python -m backend.benchmarks.bench_async_db --requests 500 --concurrency 200 --latency-ms 50
+"""
+
+import argparse
+import asyncio
+import os
+import threading
+import time
+from typing import Any
+
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_ANON_KEY", "bench-anon-key")
+os.environ.setdefault("GOOGLE_API_KEY", "bench-google-key")
+
+import httpx
+
+from backend.api.main import app
+from backend.dependencies import _get_db_executor, get_async_db, get_chronotype_cache, get_supabase
+from backend.services.async_db import AsyncSupabase
+from backend.services.chronotype_cache import ChronotypeCache
+from backend.services.memory_db import MemoryClient
+
+
+class SlowQuery:
+    """A ``MemoryClient`` query builder whose ``execute()`` first sleeps like a network round-trip."""
+
+    def __init__(self, query: Any, latency: float):
+        self._query = query
+        self._latency = latency
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self._query, name)
+
+        def call(*args: Any, **kwargs: Any) -> "SlowQuery":
+            return SlowQuery(method(*args, **kwargs), self._latency)
+
+        return call
+
+    def execute(self) -> Any:
+        time.sleep(self._latency)
+        return self._query.execute()
+
+
+class SlowSupabaseClient:
+    """The in-memory store behind every route, with ``latency`` added to each ``execute()``."""
+
+    def __init__(self, latency: float):
+        self.store = MemoryClient()
+        self._latency = latency
+
+    def table(self, name: str) -> SlowQuery:
+        return SlowQuery(self.store.table(name), self._latency)
+
+
+class InlineSupabase(AsyncSupabase):
+    """Reproduces the pre-offload behaviour: ``execute()`` blocks the event loop."""
+
+    def table(self, name: str):
+        return _InlineQuery(self.client.table(name))
+
+
+class _InlineQuery:
+    def __init__(self, builder: Any):
+        self._builder = builder
+
+    def __getattr__(self, attr: str) -> Any:
+        method = getattr(self._builder, attr)
+
+        def call(*args: Any, **kwargs: Any) -> "_InlineQuery":
+            return _InlineQuery(method(*args, **kwargs))
+
+        return call
+
+    async def execute(self) -> Any:
+        return self._builder.execute()
+
+
+async def _drive(n_requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def one(i: int) -> None:
+            async with semaphore:
+                response = await client.get(f"/chronotype/bench-{i}")
+                assert response.status_code == 200, response.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(n_requests)))
+        return time.perf_counter() - start
+
+
+def run(mode: str, n_requests: int, concurrency: int, latency: float) -> float:
+    fake = SlowSupabaseClient(latency)
+    # One chronotype per request, so every read misses the read-through cache and goes
+    # to the (slow) store; a hot id would measure cache hits instead of the offload.
+    fake.store.table("chronotypes").insert(
+        [
+            {
+                "chronotype_id": f"bench-{i}",
+                "user_id": "bench-user",
+                "data_points": [
+                    {
+                        "time_of_day": f"{hour:02d}:00:00",
+                        "predicted_energy_level": 0.5,
+                        "actual_energy_level": 0.5,
+                        "difference_from_actual": 0.0,
+                        "context": {"source": "bench"},
+                    }
+                    for hour in range(24)
+                ],
+            }
+            for i in range(n_requests)
+        ]
+    ).execute()
+    cache = ChronotypeCache()
+
+    async def override_get_supabase():
+        return fake
+
+    async def override_inline_db():
+        return InlineSupabase(fake, _get_db_executor())
+
+    async def override_get_chronotype_cache():
+        return cache
+
+    app.dependency_overrides[get_supabase] = override_get_supabase
+    app.dependency_overrides[get_chronotype_cache] = override_get_chronotype_cache
+    if mode == "inline":
+        app.dependency_overrides[get_async_db] = override_inline_db
+    try:
+        return asyncio.run(_drive(n_requests, concurrency))
+    finally:
+        app.dependency_overrides.clear()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    latency = args.latency_ms / 1000.0
+    print(
+        f"{args.requests} GET /chronotype/{{id}} requests, concurrency {args.concurrency}, "
+        f"fake round-trip {args.latency_ms:.0f} ms, pool size {_get_db_executor()._max_workers}"
+    )
+    results = {}
+    for mode in ("inline", "offload"):
+        elapsed = run(mode, args.requests, args.concurrency, latency)
+        results[mode] = args.requests / elapsed
+        print(f"  {mode:<8} {elapsed:7.2f} s  {results[mode]:8.1f} req/s  (threads alive: {threading.active_count()})")
+    print(f"  speedup  {results['offload'] / results['inline']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
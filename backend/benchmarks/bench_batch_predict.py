@@ -0,0 +1,66 @@
+"""
+Engine throughput for retraining many chronotypes: one ``train_and_predict`` call per
+chronotype vs. ``train_and_predict_batch`` over stacked chunks.
+
+Usage (from the repository root)::
+
+    python -m backend.benchmarks.bench_batch_predict --chronotypes 1000 --points 24 --chunk-size 256
+"""
+
+import argparse
+import random
+import time
+from typing import Any, Dict, List, Tuple
+
+from backend.services.rl_engine import ChronotypeRLEngine
+
+
+def make_chronotypes(count: int, points: int, seed: int = 0) -> List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+    rng = random.Random(seed)
+    items = []
+    for index in range(count):
+        n = rng.randint(max(1, points // 2), points)
+        data_points = [
+            {
+                "time_of_day": f"{rng.randrange(24):02d}:{rng.randrange(60):02d}:00",
+                "predicted_energy_level": rng.random(),
+                "actual_energy_level": rng.random(),
+                "difference_from_actual": 0.0,
+                "context": {},
+            }
+            for _ in range(n)
+        ]
+        items.append(({"chronotype_id": f"bench-{index}", "data_points": data_points}, []))
+    return items
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--chronotypes", type=int, default=1000)
+    parser.add_argument("--points", type=int, default=24, help="maximum data points per chronotype")
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--epochs", type=int, default=50)
+    args = parser.parse_args()
+
+    engine = ChronotypeRLEngine()
+    items = make_chronotypes(args.chronotypes, args.points)
+    config = {"max_epochs": args.epochs}
+
+    started = time.perf_counter()
+    for chronotype, feedback in items:
+        engine.train_and_predict(chronotype, feedback, config)
+    single = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for offset in range(0, len(items), args.chunk_size):
+        engine.train_and_predict_batch(items[offset : offset + args.chunk_size], config)
+    batched = time.perf_counter() - started
+
+    print(f"{'mode':<10}{'seconds':>10}{'chronotypes/s':>16}")
+    print(f"{'single':<10}{single:>10.2f}{len(items) / single:>16.0f}")
+    print(f"{'batch':<10}{batched:>10.2f}{len(items) / batched:>16.0f}")
+    print(f"speedup: {single / batched:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
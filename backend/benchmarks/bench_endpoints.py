@@ -0,0 +1,280 @@
+"""
+Endpoint throughput, latency percentiles and allocations for the main routes.
+
+Drives the real app in-process over ASGI, with concurrent async clients, against the
+in-process ``MemoryClient`` store (``services/memory_db.py``) and a ``GeminiWrapper``
+whose upstream client is stubbed with a fixed artificial latency. Each scenario runs
+at every ``--sizes`` value:
+
+* ``quiz_submit``       - ``POST /quiz/submit`` with ``size`` answers
+* ``chronotype_create`` - ``POST /chronotype`` with ``size`` data points
+* ``chronotype_get``    - ``GET /chronotype/{id}`` over pre-seeded chronotypes of ``size`` points
+* ``chronotype_update`` - ``PUT /chronotype/{id}`` replacing ``size`` data points
+* ``gemini_chat``       - ``POST /gemini/chat`` with a ``size``-word prompt (each one unique, so uncached)
+
+For each it reports requests/s, p50/p95/p99 latency and, from a separate sequential
+pass under ``tracemalloc``, the peak memory allocated per request. ``--output`` saves
+the results as JSON; ``--compare`` checks them against a previous file and exits
+non-zero if requests/s fell or p95 rose by more than ``--threshold``.
+
+Usage (from the repository root)::
+
+    python -m backend.benchmarks.bench_endpoints --requests 500 --concurrency 32 --output bench.json
+    python -m backend.benchmarks.bench_endpoints --compare bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_ANON_KEY", "bench-anon-key")
+os.environ.setdefault("GOOGLE_API_KEY", "bench-google-key")
+
+import httpx
+
+from backend.api import gemini as gemini_api
+from backend.api.main import app
+from backend.dependencies import get_chronotype_cache, get_quiz_submission_buffer, get_supabase
+from backend.services.chronotype_cache import ChronotypeCache
+from backend.services.gemini_wrapper import GeminiWrapper
+from backend.services.memory_db import MemoryClient
+from backend.services.write_behind import WriteBehindBuffer
+
+Request = Tuple[str, str, Optional[Dict[str, Any]]]
+
+QUIZ_ANSWERS = {1: "well", 2: "9am", 3: "12am", 4: "not-alert", 5: "7pm-test", 6: "not-tired", 7: "wake-much-later"}
+
+
+class StubModels:
+    """Stands in for ``genai.Client().aio.models`` with a fixed upstream latency."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def generate_content(self, model: str, contents: str, config: Any) -> SimpleNamespace:
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(text=f"{model}: {len(contents)} characters considered")
+
+
+def install_stub_gemini(latency: float) -> None:
+    wrapper = GeminiWrapper(api_key="bench-google-key")
+    wrapper.client = SimpleNamespace(aio=SimpleNamespace(models=StubModels(latency)))
+    gemini_api.gemini = wrapper
+
+
+def install_memory_db() -> MemoryClient:
+    client = MemoryClient()
+    cache = ChronotypeCache()
+    buffer = WriteBehindBuffer("quiz_submissions")
+
+    async def override_supabase() -> MemoryClient:
+        return client
+
+    async def override_cache() -> ChronotypeCache:
+        return cache
+
+    async def override_buffer() -> WriteBehindBuffer:
+        return buffer
+
+    app.dependency_overrides[get_supabase] = override_supabase
+    app.dependency_overrides[get_chronotype_cache] = override_cache
+    app.dependency_overrides[get_quiz_submission_buffer] = override_buffer
+    return client
+
+
+def data_points(size: int, offset: float = 0.0) -> List[Dict[str, Any]]:
+    return [
+        {
+            "time_of_day": f"{(i * 7) % 24:02d}:{(i * 13) % 60:02d}:00",
+            "predicted_energy_level": round((i % 10) / 10 + offset, 3) % 1,
+            "actual_energy_level": 0.5,
+            "difference_from_actual": 0.0,
+            "context": {"source": "bench"},
+        }
+        for i in range(size)
+    ]
+
+
+def seed(client: MemoryClient, prefix: str, count: int, size: int) -> List[str]:
+    ids = [f"{prefix}-{i}" for i in range(count)]
+    for chronotype_id in ids:
+        client.table("chronotypes").insert(
+            {"chronotype_id": chronotype_id, "user_id": f"user-{chronotype_id}", "data_points": data_points(size)}
+        ).execute()
+    return ids
+
+
+def scenarios(client: MemoryClient, size: int) -> Dict[str, Callable[[int], Request]]:
+    points = data_points(size)
+    get_ids = seed(client, f"get-{size}", 100, size)
+    update_ids = seed(client, f"update-{size}", 100, size)
+
+    def quiz(i: int) -> Request:
+        responses = [
+            {"question_id": q % 8, "question_text": f"Question {q % 8}", "response_value": QUIZ_ANSWERS.get(q % 8, "start")}
+            for q in range(size)
+        ]
+        return "POST", "/quiz/submit", {"user_id": f"quiz-user-{i}", "responses": responses}
+
+    def create(i: int) -> Request:
+        return "POST", "/chronotype", {"user_id": "bench", "chronotype_id": f"create-{size}-{i}", "data_points": points}
+
+    def get(i: int) -> Request:
+        return "GET", f"/chronotype/{get_ids[i % len(get_ids)]}", None
+
+    def update(i: int) -> Request:
+        return "PUT", f"/chronotype/{update_ids[i % len(update_ids)]}", {"data_points": data_points(size, offset=i / 1000)}
+
+    def chat(i: int) -> Request:
+        return "POST", "/gemini/chat", {"message": f"request {i}: " + "energy " * size}
+
+    return {
+        "quiz_submit": quiz,
+        "chronotype_create": create,
+        "chronotype_get": get,
+        "chronotype_update": update,
+        "gemini_chat": chat,
+    }
+
+
+async def send(http: httpx.AsyncClient, request: Request) -> int:
+    method, url, body = request
+    response = await http.request(method, url, json=body)
+    return response.status_code
+
+
+async def drive(http: httpx.AsyncClient, make: Callable[[int], Request], total: int, concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            request = make(i)
+            started = time.perf_counter()
+            status = await send(http, request)
+            latencies.append(time.perf_counter() - started)
+            errors += status >= 400
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "requests": total,
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 4),
+        "requests_per_second": round(total / elapsed, 1),
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p95_ms": round(cuts[94] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+    }
+
+
+async def allocations(http: httpx.AsyncClient, make: Callable[[int], Request], samples: int, start: int) -> float:
+    """Mean peak KiB allocated while serving one request, measured sequentially."""
+    peaks = []
+    tracemalloc.start()
+    try:
+        for i in range(start, start + samples):
+            request = make(i)
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            await send(http, request)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    return round(statistics.mean(peaks) / 1024, 1)
+
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    install_stub_gemini(args.gemini_latency_ms / 1000)
+    client = install_memory_db()
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        for size in args.sizes:
+            for name, make in scenarios(client, size).items():
+                if args.only and name not in args.only:
+                    continue
+                await drive(http, make, min(args.warmup, args.requests), args.concurrency)
+                result = await drive(http, make, args.requests, args.concurrency)
+                result["alloc_peak_kib"] = await allocations(http, make, args.alloc_samples, args.requests)
+                results.append({"scenario": name, "size": size, "concurrency": args.concurrency, **result})
+                print(
+                    f"{name:<19}{size:>7}{result['requests_per_second']:>10.1f}{result['p50_ms']:>10.2f}"
+                    f"{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['alloc_peak_kib']:>11.1f}{result['errors']:>7}"
+                )
+    app.dependency_overrides.clear()
+    return results
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, threshold: float) -> List[str]:
+    """Regressions against a previous results file, one message per scenario and metric."""
+    baseline = {(r["scenario"], r["size"]): r for r in json.loads(Path(baseline_path).read_text())["results"]}
+    regressions = []
+    for result in results:
+        before = baseline.get((result["scenario"], result["size"]))
+        if before is None:
+            continue
+        label = f"{result['scenario']}[{result['size']}]"
+        if result["requests_per_second"] < before["requests_per_second"] * (1 - threshold):
+            regressions.append(f"{label}: req/s {before['requests_per_second']} -> {result['requests_per_second']}")
+        if result["p95_ms"] > before["p95_ms"] * (1 + threshold):
+            regressions.append(f"{label}: p95 {before['p95_ms']}ms -> {result['p95_ms']}ms")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=300, help="timed requests per scenario and size")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000])
+    parser.add_argument("--only", nargs="*", help="run only these scenarios")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--alloc-samples", type=int, default=20)
+    parser.add_argument("--gemini-latency-ms", type=float, default=50.0)
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="previous results JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed relative regression")
+    args = parser.parse_args()
+
+    print(f"{'scenario':<19}{'size':>7}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'alloc KiB':>11}{'errors':>7}")
+    results = asyncio.run(run(args))
+
+    if args.output:
+        report = {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "args": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+            },
+            "results": results,
+        }
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"wrote {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.threshold:.0%} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Per-request CPU for turning a stored chronotype row into response bytes.
+
+Three paths are timed for chronotypes of 10, 1k and 10k data points:
+
+* ``response_model`` - the previous path: construct the model, then FastAPI dumps it,
+  validates the dump again against ``response_model`` and encodes it with ``json.dumps``
+* ``validate_once`` - ``model_validate`` once, then straight to bytes through the
+  pre-built ``TypeAdapter`` (a cache miss: what ``CachedChronotype.of`` does)
+* ``cached_body`` - a cache hit, which reuses the stored body
+
+Usage (from the repository root)::
+
+    python -m backend.benchmarks.bench_serialization --sizes 10 1000 10000
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Any, Callable, Dict, List
+
+from pydantic import TypeAdapter
+
+from backend.models.chronotype import ChronotypeResponse
+from backend.services.chronotype_cache import CachedChronotype
+
+RESPONSE_MODEL = TypeAdapter(ChronotypeResponse)
+
+
+def make_record(points: int, seed: int = 0) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    return {
+        "chronotype_id": "bench",
+        "user_id": "bench-user",
+        "data_points": [
+            {
+                "time_of_day": f"{rng.randrange(24):02d}:{rng.randrange(60):02d}:00",
+                "predicted_energy_level": rng.random(),
+                "actual_energy_level": rng.random(),
+                "difference_from_actual": 0.0,
+                "context": {"source": "feedback"},
+            }
+            for _ in range(points)
+        ],
+    }
+
+
+def response_model_path(record: Dict[str, Any]) -> bytes:
+    chronotype = ChronotypeResponse(**record)
+    # What FastAPI does with a returned model: dump, re-validate, serialize, json.dumps.
+    revalidated = RESPONSE_MODEL.validate_python(chronotype.model_dump())
+    content = RESPONSE_MODEL.dump_python(revalidated, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def validate_once_path(record: Dict[str, Any]) -> bytes:
+    return CachedChronotype.of(ChronotypeResponse.model_validate(record)).body
+
+
+def time_per_call(func: Callable[[], Any], min_seconds: float) -> float:
+    calls = 0
+    started = time.process_time()
+    while True:
+        func()
+        calls += 1
+        elapsed = time.process_time() - started
+        if elapsed >= min_seconds:
+            return elapsed / calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--min-seconds", type=float, default=0.5, help="CPU time spent per measurement")
+    args = parser.parse_args()
+
+    print(f"{'points':>8}{'response_model':>18}{'validate_once':>16}{'cached_body':>14}{'speedup':>10}")
+    for size in args.sizes:
+        record = make_record(size)
+        cached = CachedChronotype.of(ChronotypeResponse.model_validate(record))
+        assert json.loads(response_model_path(record)) == json.loads(validate_once_path(record))
+
+        rows: List[float] = [
+            time_per_call(lambda: response_model_path(record), args.min_seconds),
+            time_per_call(lambda: validate_once_path(record), args.min_seconds),
+            time_per_call(lambda: cached.body, args.min_seconds),
+        ]
+        old, new, hit = (value * 1e6 for value in rows)
+        print(f"{size:>8}{old:>16.1f}us{new:>14.1f}us{hit:>12.2f}us{old / new:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Cold import time of the app, measured in fresh interpreters with ``-X importtime``.
+
+Autoscaled containers pay for ``import backend.api.main`` on every cold start, so it
+must stay cheap: heavy clients (google-genai, supabase-py) are only imported and
+built on first use, and numpy only once a route needs the energy model, scoring or
+curves. Each run starts a new interpreter without ``GOOGLE_API_KEY`` or Supabase
+settings, imports the app, and parses the ``-X importtime`` report. The benchmark prints:
+
+* the median cumulative import time
+* the modules with the highest self time
+* whether any module from ``--forbid`` was imported
+
+It exits non-zero if a forbidden module was imported, or if the median exceeds
+``--max-ms``.
+
+Usage (from the repository root)::
+
+    python -m backend.benchmarks.bench_startup --runs 7 --max-ms 600
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[2]
+
+DEFAULT_FORBIDDEN = ["google.genai", "numpy", "supabase"]
+
+
+def import_once(module: str) -> Tuple[float, Dict[str, int]]:
+    """Cumulative import time of ``module`` in ms, and self time in µs of every module it pulled in."""
+    env = {k: v for k, v in os.environ.items() if k not in ("GOOGLE_API_KEY", "SUPABASE_URL", "SUPABASE_ANON_KEY")}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        error = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+        sys.exit(f"import {module} failed:\n" + "\n".join(error[-10:]))
+    self_times: Dict[str, int] = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        self_times[name.strip()] = int(self_us)
+        if name.strip() == module:
+            total = int(cumulative_us)
+    return total / 1000, self_times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--module", default="backend.api.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="slowest modules to list, by self time")
+    parser.add_argument("--forbid", nargs="*", default=DEFAULT_FORBIDDEN, help="modules that must not be imported")
+    parser.add_argument("--max-ms", type=float, help="fail if the median import time exceeds this")
+    args = parser.parse_args()
+
+    totals: List[float] = []
+    modules: Dict[str, List[int]] = {}
+    for _ in range(args.runs):
+        total, self_times = import_once(args.module)
+        totals.append(total)
+        for name, self_us in self_times.items():
+            modules.setdefault(name, []).append(self_us)
+
+    median = statistics.median(totals)
+    print(f"import {args.module}: median {median:.1f} ms  (min {min(totals):.1f}, max {max(totals):.1f}, {args.runs} runs)")
+    print(f"\n{'self ms':>9}  module")
+    slowest = sorted(modules.items(), key=lambda item: statistics.median(item[1]), reverse=True)[: args.top]
+    for name, samples in slowest:
+        print(f"{statistics.median(samples) / 1000:>9.1f}  {name}")
+
+    failures = [
+        f"{name} is imported at startup"
+        for name in args.forbid
+        if any(module == name or module.startswith(name + ".") for module in modules)
+    ]
+    if args.max_ms is not None and median > args.max_ms:
+        failures.append(f"median import time {median:.1f} ms exceeds {args.max_ms:.1f} ms")
+    for message in failures:
+        print(f"FAIL {message}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,116 @@
+from functools import lru_cache
+from typing import Any
 from pydantic_settings import BaseSettings
-from dotenv import load_dotenv
 import os
 
-load_dotenv()
 
 class Settings(BaseSettings):
-    supabase_url: str
-    supabase_anon_key: str
+    # Required with the remote backend; checked when the Supabase client is first built
+    supabase_url: str = ""
+    supabase_anon_key: str = ""
 
-    google_api_key: str
+    # Optional: without it the app still starts and the /gemini endpoints answer 500
+    google_api_key: str = ""
+
+    # Database behind get_supabase: "remote" (the Supabase project above) or "memory"
+    # (the in-process store in services/memory_db.py, for local runs and load tests)
+    supabase_backend: str = "remote"
+
+    # Upper bound on concurrent blocking Supabase calls per worker process
+    db_max_workers: int = 64
+
+    # Gemini chat response cache
+    gemini_cache_max_entries: int = 1024
+    gemini_cache_ttl_seconds: float = 600.0
+
+    # Gemini upstream admission control
+    gemini_max_concurrency: int = 16
+    gemini_max_queue: int = 64
+    gemini_queue_timeout_seconds: float = 5.0
+
+    # Background chronotype training ("process" or "thread" executor)
+    training_executor: str = "process"
+    training_max_workers: int = 2
+    training_job_history: int = 1000
+
+    # Chronotypes trained as one stacked batch (and written in one upsert) by /predict/batch
+    batch_predict_chunk_size: int = 256
+
+    # Rows fetched per keyset page by the NDJSON chronotype export
+    chronotype_export_page_size: int = 500
+
+    # Shape new chronotype data_points are stored in: "rows" or "columnar" (reads accept both)
+    data_points_format: str = "rows"
+
+    # Quiz scoring rubric used for new submissions (see services/quiz_scoring.py)
+    quiz_rubric_version: str = "v1"
+
+    # Write-behind buffer for the quiz_submissions table
+    quiz_submission_max_pending: int = 10000
+    quiz_submission_batch_size: int = 500
+    quiz_submission_flush_interval_seconds: float = 1.0
+    quiz_submission_max_retries: int = 3
+
+    # Minutes between points of the baseline curve stored for new chronotypes (0: anchors only)
+    baseline_curve_resolution_minutes: int = 0
+
+    # Read-through caches of parsed chronotypes and their energy-at-time indexes. Entries
+    # are retired by this worker's writes; the TTL bounds staleness from other workers.
+    chronotype_cache_max_entries: int = 4096
+    chronotype_cache_ttl_seconds: float = 60.0
+    energy_index_cache_max_entries: int = 4096
+    energy_index_cache_ttl_seconds: float = 300.0
+    # Compact chronotype summaries for Gemini prompts. They also embed the latest quiz
+    # result, which no chronotype write retires, so the TTL bounds how long it can lag.
+    insight_context_cache_max_entries: int = 4096
+    insight_context_cache_ttl_seconds: float = 300.0
+
+    # Connection pool shared by the Supabase and Gemini HTTP clients; HTTP/2 needs the
+    # h2 package, which the httpx[http2] dependency installs
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry_seconds: float = 90.0
+    http2: bool = True
+    http_connect_timeout_seconds: float = 5.0
+    http_read_timeout_seconds: float = 60.0
+
+    # Open upstream connections before the worker reports ready (GET /ready), then
+    # re-ping them this often so they stay open; keep it below the keep-alive expiry
+    http_warmup_enabled: bool = True
+    http_warmup_connections: int = 4
+    http_keepwarm_interval_seconds: float = 45.0
+
+    # Opt-in per-request profiling: with this on, requests sending "X-Profile: 1" are
+    # run under cProfile and their pstats dumps written to profiling_dir
+    profiling_enabled: bool = False
+    profiling_dir: str = "profiles"
 
     model_config = {
         "env_file": os.path.join(os.path.dirname(__file__), ".env"),
         "env_file_encoding": "utf-8",
     }
 
-settings = Settings()
\ No newline at end of file
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Load ``.env`` and build the settings once, on first use rather than at import."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return Settings()
+
+
+class _LazySettings:
+    """Stands in for the ``Settings`` instance until an attribute is first read or set."""
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_settings(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(get_settings(), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        delattr(get_settings(), name)
+
+
+settings: Settings = _LazySettings()  # type: ignore[assignment]
@@ -1,24 +1,175 @@
-from functools import lru_cache
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, partial
 
-from supabase import Client, create_client
+from typing import TYPE_CHECKING
+
+from fastapi import Depends
 
 from backend.config import settings
-# from services.rl_engine import ChronotypeRLEngine
+from backend.services.async_db import AsyncSupabase
+from backend.services.http_pool import ConnectionWarmer, sync_client
+from backend.services.memory_db import MemoryClient
+from backend.services.write_behind import WriteBehindBuffer
+
+if TYPE_CHECKING:
+    import httpx
+    from supabase import Client
+
+    from backend.services.chronotype_cache import ChronotypeCache
+    from backend.services.rl_engine import ChronotypeRLEngine
+    from backend.services.training_jobs import TrainingJobManager
+
+
+@lru_cache(maxsize=1)
+def _get_supabase_http() -> "httpx.Client":
+    return sync_client()
 
 
 @lru_cache(maxsize=1)
-def _get_supabase_client() -> Client:
-    return create_client(settings.supabase_url, settings.supabase_anon_key)
+def _get_supabase_client() -> "Client":
+    if settings.supabase_backend == "memory":
+        return MemoryClient()
+    if not settings.supabase_url or not settings.supabase_anon_key:
+        raise ValueError("SUPABASE_URL and SUPABASE_ANON_KEY must be set unless SUPABASE_BACKEND=memory")
+    # Imported on first use: supabase-py pulls in its whole HTTP stack.
+    from supabase import ClientOptions, create_client
 
+    # On the shared pool settings, and warmed by the connection warmer.
+    options = ClientOptions(httpx_client=_get_supabase_http())
+    return create_client(settings.supabase_url, settings.supabase_anon_key, options=options)
 
-def get_supabase() -> Client:
+
+@lru_cache(maxsize=1)
+def _get_db_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(
+        max_workers=settings.db_max_workers,
+        thread_name_prefix="supabase",
+    )
+
+
+# Both providers are ``async def`` so FastAPI resolves them on the event loop
+# instead of spending a threadpool hop per request on a cached lookup.
+async def get_supabase() -> "Client":
     return _get_supabase_client()
 
 
-# @lru_cache(maxsize=1)
-# def _get_rl_engine_instance() -> ChronotypeRLEngine:
-#     return ChronotypeRLEngine()
+async def get_async_db(db: "Client" = Depends(get_supabase)) -> AsyncSupabase:
+    return AsyncSupabase(db, _get_db_executor())
+
+
+@lru_cache(maxsize=1)
+def _get_rl_engine_instance() -> "ChronotypeRLEngine":
+    # Imported on first use, as are the services below, so starting the app doesn't load numpy.
+    from backend.services.rl_engine import ChronotypeRLEngine
+
+    return ChronotypeRLEngine()
+
+
+async def get_rl_engine() -> "ChronotypeRLEngine":
+    return _get_rl_engine_instance()
+
+
+@lru_cache(maxsize=1)
+def _get_training_job_manager() -> "TrainingJobManager":
+    from backend.services.training_jobs import TrainingJobManager
+
+    executor: Executor
+    if settings.training_executor == "thread":
+        executor = ThreadPoolExecutor(max_workers=settings.training_max_workers, thread_name_prefix="training")
+    else:
+        executor = ProcessPoolExecutor(
+            max_workers=settings.training_max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return TrainingJobManager(executor, history_size=settings.training_job_history)
+
+
+async def get_training_jobs() -> "TrainingJobManager":
+    return _get_training_job_manager()
+
+
+def shutdown_training_jobs() -> None:
+    if _get_training_job_manager.cache_info().currsize:
+        _get_training_job_manager().shutdown()
+        _get_training_job_manager.cache_clear()
+
+
+@lru_cache(maxsize=1)
+def _get_chronotype_cache() -> "ChronotypeCache":
+    from backend.services.chronotype_cache import ChronotypeCache
+
+    return ChronotypeCache(
+        maxsize=settings.chronotype_cache_max_entries,
+        ttl_seconds=settings.chronotype_cache_ttl_seconds,
+        index_maxsize=settings.energy_index_cache_max_entries,
+        index_ttl_seconds=settings.energy_index_cache_ttl_seconds,
+        insight_maxsize=settings.insight_context_cache_max_entries,
+        insight_ttl_seconds=settings.insight_context_cache_ttl_seconds,
+    )
+
+
+async def get_chronotype_cache() -> "ChronotypeCache":
+    return _get_chronotype_cache()
+
+
+@lru_cache(maxsize=1)
+def _get_quiz_submission_buffer() -> WriteBehindBuffer:
+    return WriteBehindBuffer(
+        "quiz_submissions",
+        on_conflict="quiz_id",
+        max_pending=settings.quiz_submission_max_pending,
+        batch_size=settings.quiz_submission_batch_size,
+        flush_interval=settings.quiz_submission_flush_interval_seconds,
+        max_retries=settings.quiz_submission_max_retries,
+    )
+
+
+async def get_quiz_submission_buffer() -> WriteBehindBuffer:
+    return _get_quiz_submission_buffer()
+
+
+async def close_quiz_submission_buffer() -> None:
+    if _get_quiz_submission_buffer.cache_info().currsize:
+        await _get_quiz_submission_buffer().close()
+
+
+async def _ping_supabase() -> None:
+    """Open a pooled connection to the Supabase REST endpoint (any HTTP status will do)."""
+    _get_supabase_client()
+    request = partial(
+        _get_supabase_http().head,
+        settings.supabase_url.rstrip("/") + "/rest/v1/",
+        headers={"apikey": settings.supabase_anon_key},
+    )
+    # From the pool that runs every other Supabase call.
+    await asyncio.get_running_loop().run_in_executor(_get_db_executor(), request)
+
+
+@lru_cache(maxsize=1)
+def _get_connection_warmer() -> ConnectionWarmer:
+    warmer = ConnectionWarmer(
+        enabled=settings.http_warmup_enabled,
+        connections=settings.http_warmup_connections,
+        interval=settings.http_keepwarm_interval_seconds,
+    )
+    if settings.supabase_backend == "memory":
+        warmer.skip("supabase", "in-memory backend")
+    else:
+        warmer.add("supabase", _ping_supabase)
+    return warmer
+
+
+async def get_connection_warmer() -> ConnectionWarmer:
+    return _get_connection_warmer()
 
 
-# def get_rl_engine() -> ChronotypeRLEngine:
-#     return _get_rl_engine_instance()
+async def close_connection_pools() -> None:
+    if _get_connection_warmer.cache_info().currsize:
+        await _get_connection_warmer().close()
+        _get_connection_warmer.cache_clear()
+    if _get_supabase_http.cache_info().currsize:
+        _get_supabase_http().close()
+        _get_supabase_http.cache_clear()
+        _get_supabase_client.cache_clear()
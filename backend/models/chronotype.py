@@ -1,7 +1,10 @@
-from datetime import time
-from typing import Any, Dict, List, Optional
+from datetime import datetime, time
+from typing import Annotated, Any, Dict, List, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+EnergyLevel = Annotated[float, Field(ge=0.0, le=1.0)]
+InterpolationMethod = Literal["linear", "spline"]
 
 
 class ChronotypeDataPoint(BaseModel):
@@ -14,6 +17,34 @@ class ChronotypeDataPoint(BaseModel):
     context: Dict[str, Any] = Field(default_factory=dict)
 
 
+class ChronotypeDataColumns(BaseModel):
+    """
+    Data points as parallel columns. ``context[i]`` is the position of point i's
+    context in ``context_table``, which holds each distinct context once.
+    """
+    time_of_day: List[time] = Field(default_factory=list)
+    predicted_energy_level: List[EnergyLevel] = Field(default_factory=list)
+    actual_energy_level: List[EnergyLevel] = Field(default_factory=list)
+    difference_from_actual: List[float] = Field(default_factory=list)
+    context: List[int] = Field(default_factory=list)
+    context_table: List[Dict[str, Any]] = Field(default_factory=list)
+
+    @model_validator(mode="after")
+    def _check_shape(self) -> "ChronotypeDataColumns":
+        columns = (
+            self.time_of_day,
+            self.predicted_energy_level,
+            self.actual_energy_level,
+            self.difference_from_actual,
+            self.context,
+        )
+        if len({len(column) for column in columns}) > 1:
+            raise ValueError("all data point columns must have the same length")
+        if any(not 0 <= ref < len(self.context_table) for ref in self.context):
+            raise ValueError("context entries must index into context_table")
+        return self
+
+
 class ChronotypeBase(BaseModel):
     """Shared chronotype fields."""
     user_id: str
@@ -22,15 +53,123 @@ class ChronotypeBase(BaseModel):
 
 
 class ChronotypeCreate(ChronotypeBase):
-    """Payload for creating a chronotype entry."""
-    pass
+    """Payload for creating a chronotype entry; data may be sent as ``data_columns`` instead of ``data_points``."""
+    data_columns: Optional[ChronotypeDataColumns] = None
 
 
 class ChronotypeUpdate(BaseModel):
-    """Payload for updating chronotype data points."""
+    """Payload for updating chronotype data points, as rows or as ``data_columns``."""
     data_points: Optional[List[ChronotypeDataPoint]] = None
+    data_columns: Optional[ChronotypeDataColumns] = None
 
 
 class ChronotypeResponse(ChronotypeBase):
     """Chronotype representation returned from the API."""
     chronotype_id: str
+
+
+class ChronotypeColumnarResponse(BaseModel):
+    """Chronotype representation with its data points in columnar form (``?format=columnar``)."""
+    user_id: str
+    chronotype_id: str
+    data_columns: ChronotypeDataColumns = Field(default_factory=ChronotypeDataColumns)
+
+
+class ChronotypeListResponse(BaseModel):
+    """One page of chronotypes; pass ``next_cursor`` back as ``cursor`` for the next page."""
+    items: List[Dict[str, Any]] = Field(default_factory=list, description="Chronotypes, or the requested fields of them")
+    next_cursor: Optional[str] = None
+
+
+class ChronotypeFeedback(BaseModel):
+    """Payload for appending feedback data points to a chronotype."""
+    data_points: List[ChronotypeDataPoint] = Field(..., min_length=1)
+
+
+class ChronotypeFeedbackResponse(BaseModel):
+    """Acknowledgement of appended feedback."""
+    chronotype_id: str
+    appended: int
+
+
+class ChronotypeFeedbackPoint(BaseModel):
+    """Energy level reported by the user at a point in time; a training target for the model."""
+    time_of_day: time = Field(..., description="Reference time for the energy measurement")
+    actual_energy_level: float = Field(..., ge=0.0, le=1.0)
+    predicted_energy_level: Optional[float] = Field(None, ge=0.0, le=1.0)
+    difference_from_actual: Optional[float] = Field(None, description="Predicted minus actual value")
+    context: Dict[str, Any] = Field(default_factory=dict)
+
+
+class TrainingConfig(BaseModel):
+    """Hyper-parameters for a chronotype model retrain."""
+    max_epochs: int = Field(50, ge=1, le=10_000)
+    learning_rate: float = Field(0.01, gt=0.0, le=1.0)
+    batch_size: int = Field(32, ge=1)
+
+
+class ChronotypePredictRequest(BaseModel):
+    """Payload for retraining a chronotype's energy model and re-predicting its curve."""
+    feedback: List[ChronotypeFeedbackPoint] = Field(default_factory=list)
+    training_config: TrainingConfig = Field(default_factory=TrainingConfig)
+
+
+class ChronotypePredictResponse(BaseModel):
+    """Retrained chronotype along with details of the training run."""
+    chronotype_id: str
+    updated_chronotype: ChronotypeResponse
+    training_metadata: Dict[str, Any] = Field(default_factory=dict)
+
+
+class TrainingJobStatus(BaseModel):
+    """State of a background chronotype training job."""
+    job_id: str
+    chronotype_id: str
+    status: str = Field(..., description="queued, running, succeeded or failed")
+    submitted_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    coalesced_submissions: int = Field(0, description="Later submissions folded into this job")
+    training_metadata: Dict[str, Any] = Field(default_factory=dict)
+    error: Optional[str] = None
+
+
+class ChronotypeBatchPredictRequest(BaseModel):
+    """Chronotypes to retrain together: the listed ids plus every chronotype of the listed users."""
+    chronotype_ids: List[str] = Field(default_factory=list)
+    user_ids: List[str] = Field(default_factory=list)
+    training_config: TrainingConfig = Field(default_factory=TrainingConfig)
+
+
+class ChronotypeBatchItemResult(BaseModel):
+    """Outcome of retraining one chronotype in a batch."""
+    chronotype_id: str
+    status: str = Field(..., description="succeeded or failed")
+    error: Optional[str] = None
+    training_metadata: Dict[str, Any] = Field(default_factory=dict)
+
+
+class ChronotypeBatchPredictResponse(BaseModel):
+    """Per-chronotype results of a batch retrain and its overall throughput."""
+    results: List[ChronotypeBatchItemResult] = Field(default_factory=list)
+    succeeded: int = 0
+    failed: int = 0
+    elapsed_seconds: float = 0.0
+    chronotypes_per_second: float = 0.0
+
+
+class ChronotypeEnergyAtTime(BaseModel):
+    """Interpolated energy level at one time of day."""
+    chronotype_id: str
+    time_of_day: time
+    energy_level: float
+    method: str
+
+
+class ChronotypeEnergyRange(BaseModel):
+    """Interpolated energy levels at evenly spaced times of day, as parallel lists."""
+    chronotype_id: str
+    method: str
+    step_minutes: int
+    times: List[str] = Field(default_factory=list)
+    energy_levels: List[float] = Field(default_factory=list)
@@ -1,8 +1,12 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
 class ChatRequest(BaseModel):
     message: str
     model: str = "gemini-2.5-flash"
+    # Grounds the answer in a compact summary of this chronotype
+    chronotype_id: Optional[str] = None
 
 class ChatResponse(BaseModel):
     response: str
@@ -1,5 +1,8 @@
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Literal, Optional, Any
 from pydantic import BaseModel, Field
+from backend.models.chronotype import ChronotypeDataPoint
+
+ChronotypeType = Literal["Early Bird", "Night Owl", "Intermediate"]
 
 class QuizResponse(BaseModel):
     """Individual quiz question response."""
@@ -31,3 +34,33 @@ class QuizSubmissionResponse(BaseModel):
     chronotype_result: ChronotypeResult = Field(..., description="Analysis results")
     chronotype_id: str = Field(..., description="ID of the created chronotype record")
     message: str = Field(..., description="Success message")
+
+
+class QuizScoreBatchRequest(BaseModel):
+    """Stored quiz submissions to (re-)score, e.g. after a rubric change."""
+    submissions: List[QuizSubmission] = Field(..., description="Submissions to score")
+    rubric_version: Optional[str] = Field(None, description="Rubric to score with; defaults to the current one")
+
+
+class QuizScoreBatchItem(BaseModel):
+    """Scoring outcome for one submission in a batch."""
+    user_id: str
+    chronotype_result: Optional[ChronotypeResult] = None
+    error: Optional[str] = None
+
+
+class QuizScoreBatchResponse(BaseModel):
+    """Per-submission results of a batch scoring run."""
+    rubric_version: str
+    results: List[QuizScoreBatchItem] = Field(default_factory=list)
+    scored: int = 0
+    failed: int = 0
+    elapsed_seconds: float = 0.0
+    submissions_per_second: float = 0.0
+
+
+class BaselineCurveResponse(BaseModel):
+    """Baseline energy curve for a chronotype type at a given resolution."""
+    chronotype_type: str
+    resolution_minutes: int
+    data_points: List[ChronotypeDataPoint] = Field(default_factory=list)
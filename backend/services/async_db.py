@@ -0,0 +1,72 @@
+"""
+Async facade over the synchronous Supabase client.
+
+supabase-py's ``Client`` performs a blocking HTTP round-trip inside ``execute()``.
+Calling it from an ``async def`` route freezes the event loop for the whole
+round-trip, so every other request on the worker waits behind it.
+
+``AsyncSupabase`` keeps the familiar builder syntax::
+
+    response = await db.table("chronotypes").select("*").eq("chronotype_id", cid).execute()
+
+Building the query stays on the event loop (it is pure, in-memory work); only the
+final ``execute()`` is handed to a bounded thread pool. Every ``execute()`` is timed
+into the ``supabase_*`` metrics, labelled by table and the first operation called on
+it (``select``, ``insert``, ...).
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, Callable, Optional, TypeVar
+
+from backend.services.metrics import DB_ERRORS, DB_LATENCY, track
+
+T = TypeVar("T")
+
+
+class AsyncQuery:
+    """Wraps a PostgREST request builder so that ``execute()`` is awaitable."""
+
+    __slots__ = ("_builder", "_executor", "_table", "_operation")
+
+    def __init__(self, builder: Any, executor: Executor, table: str = "", operation: Optional[str] = None):
+        self._builder = builder
+        self._executor = executor
+        self._table = table
+        self._operation = operation
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._builder, name)
+        operation = self._operation or name
+
+        # Properties such as ``not_`` hand back another builder.
+        if hasattr(attr, "execute"):
+            return AsyncQuery(attr, self._executor, self._table, operation)
+        if not callable(attr):
+            return attr
+
+        def call(*args: Any, **kwargs: Any) -> "AsyncQuery":
+            return AsyncQuery(attr(*args, **kwargs), self._executor, self._table, operation)
+
+        return call
+
+    async def execute(self) -> Any:
+        loop = asyncio.get_running_loop()
+        with track(DB_LATENCY, DB_ERRORS, self._table, self._operation or "unknown"):
+            return await loop.run_in_executor(self._executor, self._builder.execute)
+
+
+class AsyncSupabase:
+    """Awaitable view of a Supabase ``Client`` backed by a shared thread pool."""
+
+    def __init__(self, client: Any, executor: Executor):
+        self.client = client
+        self._executor = executor
+
+    def table(self, name: str) -> AsyncQuery:
+        return AsyncQuery(self.client.table(name), self._executor, name)
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Run an arbitrary blocking call against the client off the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
@@ -0,0 +1,110 @@
+"""
+Baseline energy curves for newly classified chronotypes.
+
+Each chronotype type has a handful of anchor points (``BASELINE_ANCHORS``). A curve
+at a given resolution is the anchors plus every ``resolution_minutes`` step between
+the first and last anchor, filled in with one vectorised ``np.interp``. Curves are
+built once per ``(chronotype_type, resolution_minutes)`` and memoized; the template
+is immutable (frozen points whose shared ``context`` is read-only), so quiz
+submissions reference its data points instead of rebuilding them.
+
+A resolution of 0 gives just the anchor points.
+"""
+
+from dataclasses import dataclass
+from datetime import time as time_of_day
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from pydantic import ConfigDict
+
+from backend.models.chronotype import ChronotypeDataPoint
+from backend.services.quiz_scoring import EARLY_BIRD, INTERMEDIATE, NIGHT_OWL
+
+# (hour, energy level) anchors per chronotype type
+BASELINE_ANCHORS: Dict[str, Tuple[Tuple[int, float], ...]] = {
+    # Early birds peak in morning, decline in evening
+    EARLY_BIRD: ((6, 0.8), (9, 0.9), (12, 0.7), (15, 0.6), (18, 0.4), (21, 0.2)),
+    # Night owls start low, peak in evening
+    NIGHT_OWL: ((6, 0.2), (9, 0.3), (12, 0.5), (15, 0.7), (18, 0.8), (21, 0.9)),
+    # Intermediate types have more balanced energy
+    INTERMEDIATE: ((6, 0.4), (9, 0.7), (12, 0.8), (15, 0.7), (18, 0.5), (21, 0.3)),
+}
+
+
+class _ReadOnlyContext(dict):
+    """A ``dict`` that refuses changes; copies of it are plain dicts."""
+
+    def _read_only(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("baseline curve points are shared between callers and read-only")
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self) -> Any:
+        return dict, (dict(self),)
+
+
+class BaselinePoint(ChronotypeDataPoint):
+    """A data point of a memoized curve; assigning to it raises, as does changing its context."""
+
+    model_config = ConfigDict(frozen=True)
+
+
+@dataclass(frozen=True)
+class BaselineCurve:
+    """An immutable baseline curve; ``seconds`` and ``levels`` are read-only arrays."""
+
+    chronotype_type: str
+    resolution_minutes: int
+    seconds: np.ndarray
+    levels: np.ndarray
+    points: Tuple[BaselinePoint, ...]
+
+    def data_points(self) -> List[ChronotypeDataPoint]:
+        """The shared, frozen points; use ``rows()`` for data that may be modified."""
+        return list(self.points)
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """The points as fresh row-shaped dicts, safe to modify."""
+        return [point.model_dump() for point in self.points]
+
+
+def _grid(anchor_seconds: np.ndarray, resolution_minutes: int) -> np.ndarray:
+    if resolution_minutes <= 0:
+        return anchor_seconds
+    steps = np.arange(anchor_seconds[0], anchor_seconds[-1], resolution_minutes * 60.0)
+    # Keep the anchors themselves so every resolution passes through them exactly.
+    return np.union1d(steps, anchor_seconds)
+
+
+@lru_cache(maxsize=64)
+def baseline_curve(chronotype_type: str, resolution_minutes: int = 0) -> BaselineCurve:
+    """The memoized baseline curve. Raises ``ValueError`` for an unknown chronotype type."""
+    if resolution_minutes < 0:
+        raise ValueError("resolution_minutes must not be negative")
+    anchors = BASELINE_ANCHORS.get(chronotype_type)
+    if anchors is None:
+        raise ValueError(f"Unknown chronotype type: {chronotype_type}")
+    anchor_seconds = np.array([hour * 3600.0 for hour, _ in anchors])
+    anchor_levels = np.array([level for _, level in anchors])
+
+    seconds = _grid(anchor_seconds, resolution_minutes)
+    levels = np.round(np.interp(seconds, anchor_seconds, anchor_levels), 4)
+    seconds.flags.writeable = False
+    levels.flags.writeable = False
+
+    context = _ReadOnlyContext(source="initial_quiz", chronotype=chronotype_type)
+    # Built from known-good values, so construct without validating (which would also
+    # copy the context into a plain, mutable dict).
+    points = tuple(
+        BaselinePoint.model_construct(
+            time_of_day=time_of_day(int(second) // 3600, int(second) // 60 % 60),
+            predicted_energy_level=level,
+            actual_energy_level=level,  # Initially same as predicted
+            difference_from_actual=0.0,  # No difference initially
+            context=context,
+        )
+        for second, level in zip(seconds.tolist(), levels.tolist())
+    )
+    return BaselineCurve(chronotype_type, resolution_minutes, seconds, levels, points)
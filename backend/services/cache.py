@@ -0,0 +1,227 @@
+"""
+In-process caching primitives shared by the service layer.
+
+``LRUTTLCache`` is a bounded mapping whose entries expire after a fixed TTL and are
+evicted least-recently-used first once ``maxsize`` is reached.
+
+``SingleFlight`` de-duplicates concurrent async work: while a call for a key is in
+flight, later callers for the same key await the same result instead of starting
+their own.
+
+``VersionedCache`` is a read-through cache for data that this process also writes.
+Every write bumps the key's stamp in a ``WriteVersions`` registry, and entries are
+only served while their stamp is current, so a slow read that raced a write can
+never put the old value back.
+
+All of these are per-process; with several uvicorn workers each worker keeps its own
+caches and in-flight calls.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Tuple, TypeVar
+
+V = TypeVar("V")
+
+# Sentinel distinguishing "not cached" from a cached ``None``.
+MISSING = object()
+
+
+class LRUTTLCache(Generic[V]):
+    """Bounded LRU cache with a per-entry time-to-live."""
+
+    def __init__(self, maxsize: int, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key, MISSING)
+        if entry is MISSING:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        self._entries[key] = (self._clock() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class SingleFlight(Generic[V]):
+    """Collapse concurrent calls for the same key onto one in-flight task."""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, "asyncio.Future[V]"] = {}
+        self.calls = 0
+        self.shared = 0
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[V]]) -> V:
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t: self._inflight.pop(key, None))
+        else:
+            self.shared += 1
+
+        # Shield so one cancelled caller does not cancel the call for everyone else.
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"calls": self.calls, "shared": self.shared, "inflight": self.inflight}
+
+
+class CachedSingleFlight(Generic[V]):
+    """Read-through ``LRUTTLCache`` whose misses are filled through ``SingleFlight``."""
+
+    def __init__(self, maxsize: int, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.cache: LRUTTLCache[V] = LRUTTLCache(maxsize, ttl_seconds, clock)
+        self.flight: SingleFlight[V] = SingleFlight()
+
+    async def get_or_compute(self, key: Hashable, factory: Callable[[], Awaitable[V]]) -> V:
+        value = self.cache.get(key, MISSING)
+        if value is not MISSING:
+            return value
+
+        async def fill() -> V:
+            result = await factory()
+            self.cache.set(key, result)
+            return result
+
+        return await self.flight.do(key, fill)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.cache.stats(), "singleflight": self.flight.stats()}
+
+
+class WriteVersions:
+    """
+    Per-key write stamps from a process-wide counter.
+
+    Only the ``max_tracked`` most recently written keys are remembered. A forgotten
+    key reports the highest stamp ever forgotten, which is never lower than its own
+    last write, so forgetting can cause extra misses but never a stale hit.
+    """
+
+    def __init__(self, max_tracked: int = 65536):
+        if max_tracked <= 0:
+            raise ValueError("max_tracked must be positive")
+        self.max_tracked = max_tracked
+        self._stamps: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._clock = 0
+        self._floor = 0
+
+    def version(self, key: Hashable) -> int:
+        return self._stamps.get(key, self._floor)
+
+    def bump(self, key: Hashable) -> int:
+        self._clock += 1
+        self._stamps[key] = self._clock
+        self._stamps.move_to_end(key)
+        while len(self._stamps) > self.max_tracked:
+            _, stamp = self._stamps.popitem(last=False)
+            self._floor = max(self._floor, stamp)
+        return self._clock
+
+
+class VersionedCache(Generic[V]):
+    """Read-through ``LRUTTLCache`` whose entries are tied to a key's write version."""
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl_seconds: float,
+        versions: WriteVersions,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.cache: LRUTTLCache[Tuple[int, V]] = LRUTTLCache(maxsize, ttl_seconds, clock)
+        self.flight: SingleFlight[V] = SingleFlight()
+        self.versions = versions
+        self.stale = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self.cache.get(key, MISSING)
+        if entry is MISSING:
+            return default
+        stamp, value = entry
+        if stamp != self.versions.version(key):
+            self.cache.invalidate(key)
+            self.stale += 1
+            return default
+        return value
+
+    async def get_or_compute(self, key: Hashable, factory: Callable[[], Awaitable[V]]) -> V:
+        value = self.get(key, MISSING)
+        if value is not MISSING:
+            return value
+
+        stamp = self.versions.version(key)
+
+        async def fill() -> V:
+            result = await factory()
+            self.put(key, result, stamp)
+            return result
+
+        # Callers at different versions must not share a load.
+        return await self.flight.do((key, stamp), fill)
+
+    def put(self, key: Hashable, value: V, version: int) -> bool:
+        """Cache ``value`` if it was read at ``version`` and the key has not been written since."""
+        if version != self.versions.version(key):
+            return False
+        self.cache.set(key, (version, value))
+        return True
+
+    def discard(self, key: Hashable) -> None:
+        self.cache.invalidate(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.cache.stats(), "stale": self.stale, "singleflight": self.flight.stats()}
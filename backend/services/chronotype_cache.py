@@ -0,0 +1,108 @@
+"""
+Per-process caches of chronotype read models.
+
+All three caches share one ``WriteVersions`` registry keyed by ``chronotype_id``, so a
+single ``record_write`` retires the cached response, energy index and insight context
+together.
+
+Cached responses carry their serialized JSON body and a strong ETag hashed from it,
+so every worker derives the same tag for the same content, and a cache hit is
+answered, conditionally or not, without serializing anything. The stored row's
+``revision`` token is what makes a write conditional on the tag a client last saw.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Optional
+from uuid import uuid4
+
+from pydantic import TypeAdapter
+
+from backend.models.chronotype import ChronotypeResponse
+from backend.services.cache import VersionedCache, WriteVersions
+
+if TYPE_CHECKING:
+    from backend.services.energy_index import EnergyIndex
+    from backend.services.insight_context import InsightContext
+
+
+_RESPONSE = TypeAdapter(ChronotypeResponse)
+
+
+def _etag_of(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+# Every write to a chronotypes row stores a fresh random token in this column. A
+# conditional update filters on the token it read, so it matches no row, rather than
+# overwriting, if anyone else wrote in between.
+REVISION_COLUMN = "revision"
+
+
+def new_revision() -> str:
+    return uuid4().hex
+
+
+@dataclass(frozen=True)
+class CachedChronotype:
+    """A parsed chronotype, its JSON body and that body's ETag."""
+
+    chronotype: ChronotypeResponse
+    etag: str
+    body: bytes
+
+    @classmethod
+    def of(cls, chronotype: ChronotypeResponse) -> "CachedChronotype":
+        body = _RESPONSE.dump_json(chronotype)
+        return cls(chronotype, _etag_of(body), body)
+
+
+class ChronotypeCache:
+    """Parsed chronotype responses, energy indexes and insight contexts, invalidated by this process's writes."""
+
+    def __init__(
+        self,
+        maxsize: int = 4096,
+        ttl_seconds: float = 300.0,
+        index_maxsize: int = 4096,
+        index_ttl_seconds: float = 300.0,
+        insight_maxsize: int = 4096,
+        insight_ttl_seconds: float = 300.0,
+    ):
+        self.versions = WriteVersions(max_tracked=4 * max(maxsize, index_maxsize, insight_maxsize))
+        self.responses: VersionedCache[CachedChronotype] = VersionedCache(maxsize, ttl_seconds, self.versions)
+        self.energy: VersionedCache[Optional["EnergyIndex"]] = VersionedCache(
+            index_maxsize, index_ttl_seconds, self.versions
+        )
+        self.insights: VersionedCache["InsightContext"] = VersionedCache(insight_maxsize, insight_ttl_seconds, self.versions)
+
+    def version(self, chronotype_id: str) -> int:
+        return self.versions.version(chronotype_id)
+
+    def record_write(
+        self,
+        chronotype_id: str,
+        read_version: Optional[int] = None,
+        response: Optional[CachedChronotype] = None,
+    ) -> None:
+        """
+        Retire everything cached for ``chronotype_id`` after a write.
+
+        When the writer also knows the new state, it passes ``response`` along with the
+        version it saw before writing; the response is cached only if no other write
+        landed in between, otherwise the next read reloads.
+        """
+        uncontended = read_version is not None and read_version == self.versions.version(chronotype_id)
+        stamp = self.versions.bump(chronotype_id)
+        self.responses.discard(chronotype_id)
+        self.energy.discard(chronotype_id)
+        self.insights.discard(chronotype_id)
+        if response is not None and uncontended:
+            self.responses.put(chronotype_id, response, stamp)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "responses": self.responses.stats(),
+            "energy_indexes": self.energy.stats(),
+            "insight_contexts": self.insights.stats(),
+        }
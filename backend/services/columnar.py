@@ -0,0 +1,101 @@
+"""
+Columnar encoding of chronotype data points.
+
+The row shape stores every data point as its own object, repeating the field names
+and the ``context`` dict on each one. The columnar shape keeps one list per field
+plus a de-duplicated context table that points refer to by position::
+
+    {
+        "time_of_day": ["06:00:00", "09:00:00"],
+        "predicted_energy_level": [0.8, 0.9],
+        "actual_energy_level": [0.8, 0.9],
+        "difference_from_actual": [0.0, 0.0],
+        "context": [0, 0],
+        "context_table": [{"source": "initial_quiz", "chronotype": "Early Bird"}],
+    }
+
+Conversion in either direction is lossless. Stored ``data_points`` may be in either
+shape (a list is rows, an object is columnar), so a table can be migrated gradually;
+new writes use ``DATA_POINTS_FORMAT``.
+"""
+
+import json
+from datetime import time as time_of_day
+from typing import Any, Dict, List, Optional, Union
+
+from backend.config import settings
+
+ROWS = "rows"
+COLUMNAR = "columnar"
+
+VALUE_COLUMNS = ("time_of_day", "predicted_energy_level", "actual_energy_level", "difference_from_actual")
+
+
+def _context_key(context: Dict[str, Any]) -> str:
+    return json.dumps(context, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def to_columns(points: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Row-shaped data points to the columnar shape."""
+    columns: Dict[str, List[Any]] = {name: [] for name in VALUE_COLUMNS}
+    refs: List[int] = []
+    table: List[Dict[str, Any]] = []
+    positions: Dict[str, int] = {}
+
+    for point in points:
+        for name in VALUE_COLUMNS:
+            columns[name].append(point[name])
+        context = point.get("context") or {}
+        key = _context_key(context)
+        position = positions.get(key)
+        if position is None:
+            position = positions[key] = len(table)
+            table.append(context)
+        refs.append(position)
+
+    times = columns["time_of_day"]
+    columns["time_of_day"] = [t.isoformat() if isinstance(t, time_of_day) else t for t in times]
+    return {**columns, "context": refs, "context_table": table}
+
+
+def from_columns(columns: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Columnar data points back to row-shaped dicts; raises ``ValueError`` if malformed."""
+    lengths = {len(columns.get(name) or []) for name in (*VALUE_COLUMNS, "context")}
+    if len(lengths) > 1:
+        raise ValueError("columnar data points have columns of different lengths")
+
+    table = columns.get("context_table") or []
+    refs = columns.get("context") or []
+    if any(not 0 <= ref < len(table) for ref in refs):
+        raise ValueError("columnar data points refer to a missing context")
+
+    return [
+        {
+            "time_of_day": t,
+            "predicted_energy_level": predicted,
+            "actual_energy_level": actual,
+            "difference_from_actual": difference,
+            "context": dict(table[ref]),
+        }
+        for t, predicted, actual, difference, ref in zip(
+            *(columns.get(name) or [] for name in VALUE_COLUMNS), refs
+        )
+    ]
+
+
+def decode_data_points(value: Union[None, List[Dict[str, Any]], Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Stored ``data_points`` in either shape, as a list of row-shaped dicts."""
+    if value is None:
+        return []
+    if isinstance(value, dict):
+        return from_columns(value)
+    return list(value)
+
+
+def encode_data_points(
+    points: List[Dict[str, Any]], data_format: Optional[str] = None
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+    """Row-shaped data points in the storage shape (``DATA_POINTS_FORMAT`` unless given)."""
+    if (data_format or settings.data_points_format) == COLUMNAR:
+        return to_columns(points)
+    return points
@@ -0,0 +1,134 @@
+"""
+Admission control for calls to slow upstream services.
+
+``ConcurrencyLimiter`` lets at most ``max_concurrent`` calls run at once. Up to
+``max_queue`` further callers wait for a slot, each for at most ``queue_timeout``
+seconds. Anyone beyond that is turned away immediately with ``LimiterRejected``,
+so an overload produces fast, retryable errors instead of an ever-growing pile of
+requests that all time out together.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+
+class LimiterRejected(Exception):
+    """Raised when a caller is not admitted; ``retry_after`` is a whole number of seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    """Semaphore with a bounded, deadline-limited wait queue and wait-time metrics."""
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float, sample_size: int = 1024):
+        if max_concurrent <= 0:
+            raise ValueError("max_concurrent must be positive")
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+        self.in_flight = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self._wait_samples: Deque[float] = deque(maxlen=sample_size)
+        self._service_samples: Deque[float] = deque(maxlen=sample_size)
+        self._wait_count = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _retry_after(self) -> int:
+        # Expected time for the current backlog to drain through the available slots.
+        mean_service = (
+            sum(self._service_samples) / len(self._service_samples) if self._service_samples else 1.0
+        )
+        backlog = self.queue_depth + self.in_flight
+        return max(1, math.ceil(mean_service * backlog / self.max_concurrent))
+
+    def _record_wait(self, waited: float) -> None:
+        self._wait_samples.append(waited)
+        self._wait_count += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+
+    async def acquire(self) -> None:
+        if not self._semaphore.locked():
+            # A free slot is taken without suspending, so the check above cannot go stale.
+            await self._semaphore.acquire()
+            self._record_wait(0.0)
+            self.in_flight += 1
+            self.admitted += 1
+            return
+
+        if self.queue_depth >= self.max_queue:
+            self.rejected_queue_full += 1
+            raise LimiterRejected("queue full", self._retry_after())
+
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected_timeout += 1
+            raise LimiterRejected("queue deadline exceeded", self._retry_after()) from None
+        finally:
+            self.queue_depth -= 1
+            self._record_wait(time.perf_counter() - started)
+
+        self.in_flight += 1
+        self.admitted += 1
+
+    def release(self, service_time: Optional[float] = None) -> None:
+        self.in_flight -= 1
+        if service_time is not None:
+            self._service_samples.append(service_time)
+        self._semaphore.release()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        await self.acquire()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        samples = sorted(self._wait_samples)
+
+        def percentile(q: float) -> float:
+            if not samples:
+                return 0.0
+            return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "queue_timeout_seconds": self.queue_timeout,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "wait_seconds": {
+                "count": self._wait_count,
+                "sum": self._wait_total,
+                "max": self._wait_max,
+                "p50": percentile(0.50),
+                "p99": percentile(0.99),
+                "window": len(samples),
+            },
+        }
@@ -0,0 +1,21 @@
+"""
+Times of day as seconds past midnight.
+
+Data points carry their ``time_of_day`` as a ``datetime.time`` once validated and as
+an ISO string in raw rows; the energy model, the energy index and data point slicing
+all accept either and work on seconds in ``[0, SECONDS_PER_DAY)``.
+"""
+
+from datetime import time as time_of_day
+from typing import Any
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+def parse_time(value: Any) -> time_of_day:
+    """A ``time`` from a ``time`` or an ISO ``HH:MM[:SS]`` string."""
+    return time_of_day.fromisoformat(value) if isinstance(value, str) else value
+
+
+def seconds_of_day(value: time_of_day) -> float:
+    return value.hour * 3600 + value.minute * 60 + value.second + value.microsecond / 1e6
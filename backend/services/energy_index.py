@@ -0,0 +1,121 @@
+"""
+Energy-at-time lookups over a chronotype's curve.
+
+``EnergyIndex`` sorts a chronotype's data points by time of day once and keeps them
+as flat arrays, so a point query is a ``bisect`` plus one interpolation step and a
+range query is a single vectorised ``searchsorted``. The curve is treated as
+periodic over the day: times before the first point or after the last interpolate
+across midnight.
+
+Two interpolation methods are supported:
+
+* ``linear`` - straight lines between neighbouring points
+* ``spline`` - monotone cubic Hermite (Fritsch-Carlson), smooth without overshooting
+  the measured values
+"""
+
+from bisect import bisect_right
+from datetime import time as time_of_day
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from backend.models.chronotype import InterpolationMethod
+from backend.services.daytime import SECONDS_PER_DAY, parse_time, seconds_of_day
+
+
+def _hermite(h: Any, t: Any, y0: Any, y1: Any, m0: Any, m1: Any) -> Any:
+    """Cubic Hermite on one segment of width ``h`` at fraction ``t``; works on floats and arrays."""
+    t2 = t * t
+    t3 = t2 * t
+    return (
+        (2 * t3 - 3 * t2 + 1) * y0
+        + (t3 - 2 * t2 + t) * h * m0
+        + (-2 * t3 + 3 * t2) * y1
+        + (t3 - t2) * h * m1
+    )
+
+
+class EnergyIndex:
+    """Sorted, array-backed view of one chronotype's energy curve."""
+
+    def __init__(self, seconds: np.ndarray, levels: np.ndarray):
+        if seconds.size == 0:
+            raise ValueError("an energy index needs at least one data point")
+
+        # Collapse points sharing a time of day to their mean.
+        knots, inverse = np.unique(np.mod(seconds, SECONDS_PER_DAY), return_inverse=True)
+        values = np.bincount(inverse, weights=levels) / np.bincount(inverse)
+
+        # Wrap one knot onto each end so every time of day falls inside a segment.
+        self.x = np.concatenate([[knots[-1] - SECONDS_PER_DAY], knots, [knots[0] + SECONDS_PER_DAY]])
+        self.y = np.concatenate([[values[-1]], values, [values[0]]])
+        self.widths = np.diff(self.x)
+        self.slopes = np.diff(self.y) / self.widths
+        self.tangents = self._monotone_tangents()
+        self.size = int(knots.size)
+
+        # Plain lists for the scalar path: bisect + float maths beat NumPy call overhead.
+        self._x_list: List[float] = self.x.tolist()
+        self._y_list: List[float] = self.y.tolist()
+        self._tangent_list: List[float] = self.tangents.tolist()
+
+    @classmethod
+    def from_data_points(cls, data_points: List[Dict[str, Any]]) -> "EnergyIndex":
+        seconds = np.array([seconds_of_day(parse_time(p["time_of_day"])) for p in data_points], dtype=np.float64)
+        levels = np.array([p["predicted_energy_level"] for p in data_points], dtype=np.float64)
+        return cls(seconds, levels)
+
+    def _monotone_tangents(self) -> np.ndarray:
+        # Periodic Fritsch-Carlson: harmonic mean of neighbouring slopes, zero at extrema.
+        # The wrapped end knots borrow the slopes on the far side of midnight.
+        before = np.concatenate([[self.slopes[-2]], self.slopes])
+        after = np.concatenate([self.slopes, [self.slopes[1]]])
+        same_sign = before * after > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(same_sign, 2.0 * before * after / (before + after), 0.0)
+
+    def at(self, when: Union[float, time_of_day], method: InterpolationMethod = "linear") -> float:
+        """Energy level at a time of day, given as a ``time`` or seconds past midnight."""
+        seconds = (seconds_of_day(when) if isinstance(when, time_of_day) else when) % SECONDS_PER_DAY
+        x, y = self._x_list, self._y_list
+        i = min(bisect_right(x, seconds) - 1, len(x) - 2)
+        h = x[i + 1] - x[i]
+        t = (seconds - x[i]) / h
+        if method == "spline":
+            value = _hermite(h, t, y[i], y[i + 1], self._tangent_list[i], self._tangent_list[i + 1])
+        else:
+            value = y[i] + t * (y[i + 1] - y[i])
+        return min(1.0, max(0.0, value))
+
+    def between(self, seconds: np.ndarray, method: InterpolationMethod = "linear") -> np.ndarray:
+        """Energy levels at each entry of ``seconds`` (any shape), vectorised."""
+        seconds = np.mod(seconds, SECONDS_PER_DAY)
+        i = np.minimum(np.searchsorted(self.x, seconds, side="right") - 1, self.x.size - 2)
+        h = self.widths[i]
+        t = (seconds - self.x[i]) / h
+        if method == "spline":
+            values = _hermite(h, t, self.y[i], self.y[i + 1], self.tangents[i], self.tangents[i + 1])
+        else:
+            values = self.y[i] + t * (self.y[i + 1] - self.y[i])
+        return np.clip(values, 0.0, 1.0)
+
+
+def time_range(start: time_of_day, end: time_of_day, step_seconds: float) -> np.ndarray:
+    """Seconds from ``start`` to ``end`` inclusive; an ``end`` before ``start`` wraps past midnight."""
+    first = seconds_of_day(start)
+    last = seconds_of_day(end)
+    if last < first:
+        last += SECONDS_PER_DAY
+    return np.arange(first, last + step_seconds / 2, step_seconds)
+
+
+def format_seconds(seconds: np.ndarray) -> List[str]:
+    """``HH:MM:SS`` strings for seconds past midnight."""
+    whole = np.mod(np.rint(seconds).astype(np.int64), SECONDS_PER_DAY)
+    return [f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}" for s in whole.tolist()]
+
+
+def build_index(data_points: List[Dict[str, Any]]) -> Optional[EnergyIndex]:
+    """Index for ``data_points``, or ``None`` when there is nothing to interpolate."""
+    return EnergyIndex.from_data_points(data_points) if data_points else None
@@ -0,0 +1,23 @@
+"""
+Bytes-first JSON responses.
+
+Returning a model from a route with a ``response_model`` makes FastAPI dump it to a
+dict, validate that dict again, convert it to JSON-compatible Python and finally run
+it through ``json.dumps``. ``FastJSONResponse`` skips all of that: models and plain
+Python values go straight to bytes through pydantic-core's serializer, and bytes that
+were serialized earlier (for example a cached body) are sent as they are.
+"""
+
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by pydantic-core instead of ``json.dumps``."""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return to_json(content)
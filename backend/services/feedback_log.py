@@ -0,0 +1,64 @@
+"""
+The append-only chronotype feedback log.
+
+Feedback is kept in its own table next to the chronotype row, so recording one
+"higher/lower" click is a single small insert instead of a rewrite of the whole
+``data_points`` array. Reads present the combined view, the stored data points
+followed by the logged ones, oldest first. Writes that replace the stored points
+(``PUT``, retraining) fold the log rows they read into them and delete those rows.
+"""
+
+from typing import Dict, List
+
+from backend.services.async_db import AsyncSupabase
+from backend.services.columnar import decode_data_points
+
+FEEDBACK_TABLE = "chronotype_feedback"
+
+
+async def load_feedback_rows(db: AsyncSupabase, chronotype_id: str) -> List[dict]:
+    response = await (
+        db.table(FEEDBACK_TABLE)
+        .select("feedback_id,data_point")
+        .eq("chronotype_id", chronotype_id)
+        .order("recorded_at")
+        .execute()
+    )
+    return response.data
+
+
+async def load_feedback(db: AsyncSupabase, chronotype_id: str) -> List[dict]:
+    return [row["data_point"] for row in await load_feedback_rows(db, chronotype_id)]
+
+
+async def load_feedback_for(db: AsyncSupabase, chronotype_ids: List[str]) -> Dict[str, List[dict]]:
+    """Feedback log rows for many chronotypes in one query, grouped by chronotype, oldest first."""
+    grouped: Dict[str, List[dict]] = {cid: [] for cid in chronotype_ids}
+    if not chronotype_ids:
+        return grouped
+    response = await (
+        db.table(FEEDBACK_TABLE)
+        .select("feedback_id,chronotype_id,data_point")
+        .in_("chronotype_id", chronotype_ids)
+        .order("recorded_at")
+        .execute()
+    )
+    for row in response.data:
+        grouped[row["chronotype_id"]].append(row)
+    return grouped
+
+
+async def drop_feedback(db: AsyncSupabase, feedback_rows: List[dict]) -> None:
+    """Delete feedback log rows once they have been folded into the stored data points."""
+    if feedback_rows:
+        await db.table(FEEDBACK_TABLE).delete().in_(
+            "feedback_id", [row["feedback_id"] for row in feedback_rows]
+        ).execute()
+
+
+def with_feedback(record: dict, feedback: List[dict]) -> dict:
+    """Combined view: the stored data points followed by appended feedback, oldest first."""
+    stored = record.get("data_points")
+    if not feedback and not isinstance(stored, dict):
+        return record
+    return {**record, "data_points": [*decode_data_points(stored), *feedback]}
@@ -16,28 +16,109 @@ Then it gets back
 """
 
 
-from google import genai
-from google.genai import types
 from backend.config import settings
-from typing import Optional
+from backend.services.cache import MISSING, CachedSingleFlight
+from backend.services.concurrency import ConcurrencyLimiter
+from backend.services.http_pool import async_client, sync_client
+from backend.services.metrics import LLM_ERRORS, LLM_LATENCY, track
+from functools import lru_cache
+from typing import Any, AsyncIterator, Hashable, Optional
+import re
+import time
+
+_WHITESPACE = re.compile(r"\s+")
+
+# google-genai's default endpoint; warm_up() opens connections to it.
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/"
+
+INSIGHT_PREAMBLE = "Personalise your answer using this summary of the user's chronotype and logged energy:"
+
+
+def _normalize_prompt(prompt: str) -> str:
+    """Collapse insignificant whitespace so trivially different prompts share a cache entry."""
+    return _WHITESPACE.sub(" ", prompt).strip()
+
+
+def insight_prompt(message: str, context: Optional[str] = None) -> str:
+    """``message`` prefixed with a user's insight context (see ``services.insight_context``), if any."""
+    if not context:
+        return message
+    return f"{INSIGHT_PREAMBLE}\n{context}\n\nUser question: {message}"
+
+
+@lru_cache(maxsize=1)
+def _generation_config() -> Any:
+    # google-genai takes a few hundred milliseconds to import, so it is only loaded
+    # once a wrapper is built, not when the app is.
+    from google.genai import types
+
+    return types.GenerateContentConfig(
+        thinking_config=types.ThinkingConfig(thinking_budget=0)  # Disables thinking
+    )
+
 
 class GeminiWrapper:
     """Simple wrapper for Google Gemini API with minimal thinking budget."""
-    
-    def __init__(self, api_key: Optional[str] = None):
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        cache: Optional[CachedSingleFlight[str]] = None,
+        limiter: Optional[ConcurrencyLimiter] = None,
+    ):
         """
         Initialize the Gemini wrapper.
         
         Args:
             api_key: Google API key. If None, will try to get from environment variable GOOGLE_API_KEY
+            cache: Response cache for chat calls. If None, one is built from the GEMINI_CACHE_* settings
+            limiter: Admission control for async upstream calls. If None, one is built from the
+                GEMINI_MAX_CONCURRENCY / GEMINI_MAX_QUEUE / GEMINI_QUEUE_TIMEOUT_SECONDS settings
         """
         if api_key is None:
             api_key = settings.google_api_key
             if not api_key:
                 raise ValueError("API key must be provided either as parameter or GOOGLE_API_KEY environment variable")
         
-        self.client = genai.Client(api_key=api_key)
-    
+        from google import genai
+        from google.genai import types
+
+        # Our own pooled clients instead of google-genai's defaults, so that they follow
+        # the shared HTTP_* pool settings and can be warmed and closed.
+        self.http_client = sync_client()
+        self.async_http_client = async_client()
+        self.client = genai.Client(
+            api_key=api_key,
+            http_options=types.HttpOptions(
+                httpx_client=self.http_client,
+                httpx_async_client=self.async_http_client,
+                # Per-request timeout in ms; without it google-genai disables httpx's.
+                timeout=int(settings.http_read_timeout_seconds * 1000),
+            ),
+        )
+        self.generation_config = _generation_config()
+        self._generation_config_key = self.generation_config.model_dump_json(exclude_none=True)
+        self.cache = cache if cache is not None else CachedSingleFlight(
+            maxsize=settings.gemini_cache_max_entries,
+            ttl_seconds=settings.gemini_cache_ttl_seconds,
+        )
+        self.limiter = limiter if limiter is not None else ConcurrencyLimiter(
+            max_concurrent=settings.gemini_max_concurrency,
+            max_queue=settings.gemini_max_queue,
+            queue_timeout=settings.gemini_queue_timeout_seconds,
+        )
+
+    async def warm_up(self) -> None:
+        """Open a pooled connection to the Gemini API (any HTTP status will do)."""
+        await self.async_http_client.head(GEMINI_BASE_URL)
+
+    async def aclose(self) -> None:
+        await self.async_http_client.aclose()
+        self.http_client.close()
+
+    def _cache_key(self, prompt: str, model: str) -> Hashable:
+        return (model, _normalize_prompt(prompt), self._generation_config_key)
+
     def generate_content(self, prompt: str, model: str = "gemini-2.5-flash") -> str:
         """
         Generate content using Gemini with minimal thinking budget.
@@ -50,26 +131,112 @@ class GeminiWrapper:
             Generated text response
         """
         try:
-            response = self.client.models.generate_content(
-                model=model,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    thinking_config=types.ThinkingConfig(thinking_budget=0)  # Disables thinking
-                ),
-            )
+            with track(LLM_LATENCY, LLM_ERRORS, model, "generate"):
+                response = self.client.models.generate_content(
+                    model=model,
+                    contents=prompt,
+                    config=self.generation_config,
+                )
             return response.text
         except Exception as e:
             raise Exception(f"Error generating content: {str(e)}")
+
+    async def generate_content_async(self, prompt: str, model: str = "gemini-2.5-flash") -> str:
+        """
+        Async variant of generate_content for use inside request handlers.
+        Runs under the concurrency limiter.
+        
+        Args:
+            prompt: The input prompt for the model
+            model: The model to use (default: gemini-2.5-flash)
+            
+        Returns:
+            Generated text response
+
+        Raises:
+            LimiterRejected: If no upstream slot became available in time
+        """
+        async with self.limiter.slot():
+            try:
+                with track(LLM_LATENCY, LLM_ERRORS, model, "generate_async"):
+                    response = await self.client.aio.models.generate_content(
+                        model=model,
+                        contents=prompt,
+                        config=self.generation_config,
+                    )
+                return response.text
+            except Exception as e:
+                raise Exception(f"Error generating content: {str(e)}")
+
+    async def stream_content(self, prompt: str, model: str = "gemini-2.5-flash") -> AsyncIterator[str]:
+        """
+        Stream generated text chunk by chunk as the model produces it.
+        
+        Args:
+            prompt: The input prompt for the model
+            model: The model to use (default: gemini-2.5-flash)
+            
+        Yields:
+            Text fragments in generation order
+
+        Raises:
+            LimiterRejected: If no upstream slot became available in time
+        """
+        await self.limiter.acquire()
+        started = time.perf_counter()
+        try:
+            # Timed until the last chunk arrives.
+            with track(LLM_LATENCY, LLM_ERRORS, model, "stream"):
+                stream = await self.client.aio.models.generate_content_stream(
+                    model=model,
+                    contents=prompt,
+                    config=self.generation_config,
+                )
+                async for chunk in stream:
+                    if chunk.text:
+                        yield chunk.text
+        except Exception as e:
+            raise Exception(f"Error generating content: {str(e)}")
+        finally:
+            self.limiter.release(time.perf_counter() - started)
     
-    def chat(self, message: str, model: str = "gemini-2.5-flash") -> str:
+    def chat(self, message: str, model: str = "gemini-2.5-flash", context: Optional[str] = None) -> str:
+        """
+        Simple chat interface - generate_content behind the response cache.
+        
+        Args:
+            message: The message to send to the model
+            model: The model to use (default: gemini-2.5-flash)
+            context: Optional insight context grounding the answer in the user's chronotype
+            
+        Returns:
+            Generated text response
+        """
+        prompt = insight_prompt(message, context)
+        key = self._cache_key(prompt, model)
+        cached = self.cache.cache.get(key, MISSING)
+        if cached is not MISSING:
+            return cached
+
+        response = self.generate_content(prompt, model)
+        self.cache.cache.set(key, response)
+        return response
+
+    async def chat_async(self, message: str, model: str = "gemini-2.5-flash", context: Optional[str] = None) -> str:
         """
-        Simple chat interface - alias for generate_content.
+        Async chat interface - generate_content_async behind the response cache.
+        Identical requests already in flight share a single upstream call.
         
         Args:
             message: The message to send to the model
             model: The model to use (default: gemini-2.5-flash)
+            context: Optional insight context grounding the answer in the user's chronotype
             
         Returns:
             Generated text response
         """
-        return self.generate_content(message, model)
+        prompt = insight_prompt(message, context)
+        return await self.cache.get_or_compute(
+            self._cache_key(prompt, model),
+            lambda: self.generate_content_async(prompt, model),
+        )
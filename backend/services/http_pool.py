@@ -0,0 +1,155 @@
+"""
+Shared HTTP connection pooling and warm-up for the Supabase and Gemini clients.
+
+Both upstream clients run on ``httpx`` clients built here. That way they share one
+pool configuration instead of each library's defaults:
+
+* ``HTTP_MAX_CONNECTIONS`` / ``HTTP_MAX_KEEPALIVE_CONNECTIONS`` /
+  ``HTTP_KEEPALIVE_EXPIRY_SECONDS`` size the pool and set how long an idle
+  connection is kept
+* ``HTTP2`` multiplexes requests over one connection per host (only when the
+  ``h2`` package is installed; otherwise HTTP/1.1 is used)
+* ``HTTP_CONNECT_TIMEOUT_SECONDS`` / ``HTTP_READ_TIMEOUT_SECONDS`` bound each call
+
+``ConnectionWarmer`` opens the connections before the worker reports ready, so the
+first requests after a deploy don't pay for DNS, TCP and TLS. It then re-pings every
+``HTTP_KEEPWARM_INTERVAL_SECONDS`` so connections never sit idle long enough to be
+dropped. ``GET /ready`` reports its state.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Optional
+
+from backend.config import settings
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def client_kwargs() -> Dict[str, Any]:
+    """Pool, protocol and timeout arguments shared by every upstream ``httpx`` client."""
+    # Imported here so that importing the app doesn't pay for httpx.
+    import httpx
+
+    return {
+        "limits": httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry_seconds,
+        ),
+        "timeout": httpx.Timeout(
+            settings.http_read_timeout_seconds,
+            connect=settings.http_connect_timeout_seconds,
+        ),
+        "http2": settings.http2 and http2_available(),
+    }
+
+
+def sync_client(**kwargs: Any) -> "httpx.Client":
+    import httpx
+
+    return httpx.Client(**client_kwargs(), **kwargs)
+
+
+def async_client(**kwargs: Any) -> "httpx.AsyncClient":
+    import httpx
+
+    return httpx.AsyncClient(**client_kwargs(), **kwargs)
+
+
+Probe = Callable[[], Awaitable[Any]]
+
+
+class ConnectionWarmer:
+    """
+    Opens pooled connections to each upstream at startup and keeps them open.
+
+    A probe is any request that makes its client open a connection. Only transport
+    errors count as failures, so a ``401`` from an unauthenticated ping still leaves
+    a warm connection. The worker becomes ready after the first round in which every
+    probe succeeds. Later failures are reported in ``status()`` but don't take it out
+    of rotation: a blip upstream shouldn't mark every worker unready at once.
+    """
+
+    def __init__(self, enabled: bool = True, connections: int = 1, interval: float = 0.0):
+        self.enabled = enabled
+        self.connections = connections
+        self.interval = interval
+        self.ready = False
+        self._probes: Dict[str, Probe] = {}
+        self._checks: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def add(self, name: str, probe: Probe) -> None:
+        self._probes[name] = probe
+
+    def skip(self, name: str, reason: str) -> None:
+        self._checks[name] = {"ok": True, "skipped": reason}
+
+    async def _probe(self, name: str, probe: Probe) -> bool:
+        started = time.perf_counter()
+        # Concurrent probes make an HTTP/1.1 pool open several connections.
+        results = await asyncio.gather(*(probe() for _ in range(self.connections)), return_exceptions=True)
+        errors = [result for result in results if isinstance(result, BaseException)]
+        check: Dict[str, Any] = {
+            "ok": not errors,
+            "connections": self.connections - len(errors),
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+            "checked_at": time.time(),
+        }
+        if errors:
+            check["error"] = f"{type(errors[0]).__name__}: {errors[0]}"
+            logger.warning("Warming %s connections failed: %s", name, check["error"])
+        self._checks[name] = check
+        return not errors
+
+    async def warm(self) -> bool:
+        """Probe every upstream once; returns whether all of them answered."""
+        names = list(self._probes)
+        results = await asyncio.gather(*(self._probe(name, self._probes[name]) for name in names))
+        if all(results):
+            self.ready = True
+        return all(results)
+
+    async def _keep_warm(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.warm()
+            except Exception:  # pragma: no cover - _probe already captures probe errors
+                logger.exception("Keep-warm round failed")
+
+    async def start(self) -> None:
+        """Warm every upstream, then keep re-pinging them in the background."""
+        if not self.enabled:
+            self.ready = True
+            return
+        await self.warm()
+        if self.interval > 0 and self._probes:
+            self._task = asyncio.get_running_loop().create_task(self._keep_warm())
+
+    async def close(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "warmup": "enabled" if self.enabled else "disabled",
+            "http2": settings.http2 and http2_available(),
+            "checks": dict(self._checks),
+        }
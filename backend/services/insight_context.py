@@ -0,0 +1,222 @@
+"""
+Compact summaries of a chronotype for grounding Gemini insight prompts.
+
+Pasting a chronotype's raw ``data_points`` and quiz answers into a prompt costs tokens
+and latency in proportion to the user's history. ``build_insight_context`` reduces it
+instead to a fixed handful of facts:
+
+* chronotype type, confidence, suggested sleep schedule and quiz answers, from the
+  ``ChronotypeResult`` stored with the quiz submission
+* up to ``PEAK_WINDOWS`` peak and ``TROUGH_WINDOWS`` trough windows of the predicted
+  curve, read off the chronotype's ``EnergyIndex`` at ``SAMPLE_MINUTES`` steps
+* how the last ``RECENT_OBSERVATIONS`` logged energy levels compare to the
+  prediction, and the ``TOP_DEVIATIONS`` largest of those gaps
+* the trend of that gap against the observations before them
+
+Every list is capped, so the text stays roughly the same size (never more than
+``MAX_CONTEXT_CHARS``) whether the user has logged ten points or ten thousand.
+Routes cache the result per chronotype version in ``ChronotypeCache.insights``.
+"""
+
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.models.chronotype import ChronotypeDataPoint, ChronotypeResponse
+from backend.models.quiz import ChronotypeResult
+from backend.services.energy_index import EnergyIndex, build_index
+from backend.services.daytime import SECONDS_PER_DAY
+
+PEAK_WINDOWS = 2
+TROUGH_WINDOWS = 2
+SAMPLE_MINUTES = 30
+# Share of the curve's range (from the top or bottom) that counts as a peak or trough.
+WINDOW_BAND = 0.2
+RECENT_OBSERVATIONS = 20
+TOP_DEVIATIONS = 3
+# Change in mean (actual - predicted) between windows that counts as a trend.
+TREND_THRESHOLD = 0.05
+MAX_QUIZ_DETAILS = 12
+MAX_VALUE_CHARS = 40
+MAX_CONTEXT_CHARS = 1200
+# Baseline points copy the prediction into actual_energy_level, so they aren't observations.
+BASELINE_SOURCE = "initial_quiz"
+
+
+@dataclass(frozen=True)
+class EnergyWindow:
+    start: str
+    end: str
+    level: float
+
+
+@dataclass(frozen=True)
+class Deviation:
+    time_of_day: str
+    predicted: float
+    actual: float
+
+
+@dataclass(frozen=True)
+class InsightContext:
+    """Bounded summary of one chronotype version; ``text`` is what goes into the prompt."""
+
+    chronotype_id: str
+    chronotype_type: Optional[str]
+    confidence: Optional[float]
+    peaks: Tuple[EnergyWindow, ...]
+    troughs: Tuple[EnergyWindow, ...]
+    observations: int
+    recent_bias: Optional[float]
+    deviations: Tuple[Deviation, ...]
+    trend: Optional[str]
+    text: str
+
+
+def _clock(seconds: float) -> str:
+    whole = int(round(seconds)) % SECONDS_PER_DAY
+    return f"{whole // 3600:02d}:{whole // 60 % 60:02d}"
+
+
+def _runs(mask: np.ndarray) -> List[Tuple[int, int]]:
+    """``(start, length)`` of each run of ``True`` in ``mask``, treating it as circular."""
+    n = mask.size
+    if mask.all():
+        return [(0, n)]
+    if not mask.any():
+        return []
+    # Rotate so the array starts outside a run; no run then wraps the end.
+    shift = int(np.argmin(mask))
+    rolled = np.roll(mask, -shift).astype(np.int8)
+    edges = np.diff(np.concatenate([[0], rolled, [0]]))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return [((int(start) + shift) % n, int(end - start)) for start, end in zip(starts, ends)]
+
+
+def _windows(levels: np.ndarray, mask: np.ndarray, limit: int, highest: bool) -> Tuple[EnergyWindow, ...]:
+    step = SECONDS_PER_DAY / levels.size
+    windows = []
+    for start, length in _runs(mask):
+        picked = levels[(np.arange(start, start + length)) % levels.size]
+        windows.append(EnergyWindow(_clock(start * step), _clock((start + length) * step), round(float(picked.mean()), 2)))
+    windows.sort(key=lambda window: window.level, reverse=highest)
+    return tuple(windows[:limit])
+
+
+def energy_windows(index: Optional[EnergyIndex]) -> Tuple[Tuple[EnergyWindow, ...], Tuple[EnergyWindow, ...]]:
+    """Peak and trough windows of the predicted curve; none for a flat or empty curve."""
+    if index is None:
+        return (), ()
+    levels = index.between(np.arange(0, SECONDS_PER_DAY, SAMPLE_MINUTES * 60, dtype=np.float64))
+    low, high = float(levels.min()), float(levels.max())
+    if high - low < 1e-6:
+        return (), ()
+    band = WINDOW_BAND * (high - low)
+    return (
+        _windows(levels, levels >= high - band, PEAK_WINDOWS, highest=True),
+        _windows(levels, levels <= low + band, TROUGH_WINDOWS, highest=False),
+    )
+
+
+def _observed(points: Sequence[ChronotypeDataPoint]) -> List[Deviation]:
+    """Points logged by the user, oldest first; feedback is appended after the stored points."""
+    return [
+        Deviation(point.time_of_day.strftime("%H:%M"), point.predicted_energy_level, point.actual_energy_level)
+        for point in points
+        if point.context.get("source") != BASELINE_SOURCE
+    ]
+
+
+def _bias(observations: Sequence[Deviation]) -> float:
+    return float(np.mean([o.actual - o.predicted for o in observations]))
+
+
+def _trend(observed: Sequence[Deviation]) -> Optional[str]:
+    recent = observed[-RECENT_OBSERVATIONS:]
+    earlier = observed[-2 * RECENT_OBSERVATIONS : -RECENT_OBSERVATIONS]
+    if len(recent) < 5 or len(earlier) < 5:
+        return None
+    change = _bias(recent) - _bias(earlier)
+    if change > TREND_THRESHOLD:
+        return "rising"
+    if change < -TREND_THRESHOLD:
+        return "falling"
+    return "steady"
+
+
+def _quiz_details(details: Dict[str, Any]) -> List[str]:
+    facts = [
+        f"{key}={str(value)[:MAX_VALUE_CHARS]}"
+        for key, value in details.items()
+        if isinstance(value, (str, int, float)) and key != "rubric_version"
+    ]
+    return facts[:MAX_QUIZ_DETAILS]
+
+
+def _render(context: InsightContext, result: Optional[ChronotypeResult]) -> str:
+    lines = []
+    if result is not None:
+        lines.append(f"Chronotype: {result.chronotype_type} (confidence {result.confidence_score:.0%})")
+        if result.recommended_sleep_schedule:
+            schedule = ", ".join(f"{key.replace('_', ' ')} {value}" for key, value in result.recommended_sleep_schedule.items())
+            lines.append(f"Suggested sleep: {schedule}")
+        quiz = _quiz_details(result.analysis_details)
+        if quiz:
+            lines.append("Quiz: " + "; ".join(quiz))
+
+    def windows(found: Tuple[EnergyWindow, ...]) -> str:
+        return ", ".join(f"{w.start}-{w.end} ({w.level:.2f})" for w in found)
+
+    if context.peaks:
+        lines.append(f"Peak energy: {windows(context.peaks)}")
+        lines.append(f"Low energy: {windows(context.troughs)}")
+    else:
+        lines.append("Predicted energy: no clear peaks or dips yet")
+
+    if context.recent_bias is None:
+        lines.append("Logged energy: none yet")
+    else:
+        recent = min(context.observations, RECENT_OBSERVATIONS)
+        direction = "above" if context.recent_bias >= 0 else "below"
+        lines.append(
+            f"Logged energy: last {recent} of {context.observations} check-ins averaged "
+            f"{abs(context.recent_bias):.2f} {direction} prediction"
+        )
+        gaps = "; ".join(f"{d.time_of_day} actual {d.actual:.2f} vs predicted {d.predicted:.2f}" for d in context.deviations)
+        lines.append(f"Largest recent gaps: {gaps}")
+    if context.trend is not None:
+        lines.append(f"Trend of logged vs predicted energy: {context.trend}")
+    return "\n".join(lines)[:MAX_CONTEXT_CHARS]
+
+
+def build_insight_context(
+    chronotype: ChronotypeResponse,
+    result: Optional[ChronotypeResult] = None,
+    index: Optional[EnergyIndex] = None,
+) -> InsightContext:
+    """
+    Summarise ``chronotype`` and its quiz ``result`` for a prompt. Pass the chronotype's
+    cached ``index`` when there is one; otherwise it is built from the data points.
+    """
+    if index is None:
+        index = build_index([point.model_dump() for point in chronotype.data_points])
+    peaks, troughs = energy_windows(index)
+    observed = _observed(chronotype.data_points)
+    recent = observed[-RECENT_OBSERVATIONS:]
+    deviations = sorted(recent, key=lambda o: abs(o.actual - o.predicted), reverse=True)[:TOP_DEVIATIONS]
+
+    context = InsightContext(
+        chronotype_id=chronotype.chronotype_id,
+        chronotype_type=result.chronotype_type if result is not None else None,
+        confidence=result.confidence_score if result is not None else None,
+        peaks=peaks,
+        troughs=troughs,
+        observations=len(observed),
+        recent_bias=round(_bias(recent), 3) if recent else None,
+        deviations=tuple(deviations),
+        trend=_trend(observed),
+        text="",
+    )
+    return replace(context, text=_render(context, result))
@@ -0,0 +1,449 @@
+"""
+In-process stand-in for the Supabase client.
+
+``MemoryClient`` implements the part of the supabase-py / PostgREST builder API the
+backend uses, against plain dicts in memory:
+
+* ``select`` / ``insert`` / ``upsert`` (optionally ``ignore_duplicates``) / ``update`` / ``delete``
+* filters ``eq``, ``neq``, ``gt``, ``gte``, ``lt``, ``lte``, ``in_`` and ``is_(column, "null")``
+* ``order``, ``limit`` and ``range``
+
+With ``SUPABASE_BACKEND=memory`` the whole API runs on it, which serves local
+development without a Supabase project and load tests at realistic data sizes with
+no network in the way. The test suite uses it as its database.
+
+It is built to stay fast as tables grow:
+
+* rows live in a dict keyed by the primary key ``id``. ``eq`` and ``in_`` filters
+  are answered from hash indexes (column -> value -> ids), built the first time a
+  column is filtered on and kept current by every write, so a lookup costs the size
+  of its result rather than of the table
+* a select with one ``order`` column and a ``limit`` (and no ``eq``/``in_`` filter)
+  walks a sorted index of that column instead, bisecting to the ``gt``/``gte``/
+  ``lt``/``lte`` bounds on it, so a keyset page costs its own size plus a log of
+  the table rather than a sort of the whole table
+* rows are copy-on-write: the store never changes a stored row in place, an update
+  swaps in a new dict. Payloads are copied once on the way in and results are
+  shallow copies, so reads never copy nested ``data_points``; treat nested values in
+  results as read-only
+* each table has its own lock, so ``execute()`` is safe from the ``AsyncSupabase``
+  thread pool
+
+Like PostgreSQL, comparisons against a missing (NULL) value never match, ``order``
+puts NULLs last (first when descending), and inserting an existing primary key fails.
+Data lives as long as the worker process and is not shared between workers.
+"""
+
+import itertools
+import operator
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from uuid import uuid4
+
+Row = Dict[str, Any]
+
+_COMPARISONS: Dict[str, Callable[[Any, Any], bool]] = {
+    "eq": operator.eq,
+    "neq": operator.ne,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+}
+
+
+def _copy(value: Any) -> Any:
+    """Deep copy of JSON-shaped data; far cheaper than ``copy.deepcopy`` for it."""
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_copy(item) for item in value]
+    return value
+
+
+def _sort_key(value: Any) -> Tuple[bool, Any]:
+    return (value is None, value)
+
+
+class SortedIndex:
+    """Primary keys in order of one column's value; rows where it is NULL are kept apart."""
+
+    def __init__(self, entries: List[Tuple[Any, Any]]):
+        # Stable sort: equal values stay in insertion order, as in a sorted scan.
+        entries.sort(key=lambda entry: entry[0])
+        self.values = [value for value, _ in entries]
+        self.keys = [key for _, key in entries]
+        self.nulls: Dict[Any, None] = {}
+
+    def add(self, value: Any, key: Any) -> None:
+        if value is None:
+            self.nulls[key] = None
+            return
+        position = bisect_right(self.values, value)
+        self.values.insert(position, value)
+        self.keys.insert(position, key)
+
+    def remove(self, value: Any, key: Any) -> None:
+        if value is None:
+            self.nulls.pop(key, None)
+            return
+        low = bisect_left(self.values, value)
+        position = self.keys.index(key, low, bisect_right(self.values, value, low))
+        del self.values[position]
+        del self.keys[position]
+
+    def scan(self, bounds: List[Tuple[str, Any]], desc: bool) -> Iterator[Any]:
+        """Keys within ``bounds`` (``(op, value)`` range filters), NULLs last (first when descending)."""
+        low, high = 0, len(self.values)
+        for op, value in bounds:
+            if op == "gt":
+                low = max(low, bisect_right(self.values, value))
+            elif op == "gte":
+                low = max(low, bisect_left(self.values, value))
+            elif op == "lt":
+                high = min(high, bisect_left(self.values, value))
+            else:
+                high = min(high, bisect_right(self.values, value))
+        # A range filter never matches NULL.
+        nulls: Iterable[Any] = () if bounds else self.nulls
+        if desc:
+            return itertools.chain(reversed(list(nulls)), (self.keys[i] for i in range(high - 1, low - 1, -1)))
+        return itertools.chain((self.keys[i] for i in range(low, high)), nulls)
+
+
+@dataclass
+class MemoryResponse:
+    data: List[Row]
+
+
+class MemoryQuery:
+    """Chainable request builder for one table; runs when ``execute()`` is called."""
+
+    def __init__(
+        self,
+        table: "MemoryTable",
+        action: str,
+        payload: Any = None,
+        columns: str = "*",
+        on_conflict: str = "id",
+        ignore_duplicates: bool = False,
+    ):
+        self._table = table
+        self.action = action
+        self.payload = payload
+        self.on_conflict = on_conflict
+        self.ignore_duplicates = ignore_duplicates
+        self.columns: Optional[List[str]] = None
+        if columns.strip() != "*":
+            self.columns = [column.strip() for column in columns.split(",") if column.strip()]
+        self.filters: List[Tuple[str, str, Any]] = []
+        self.ordering: List[Tuple[str, bool]] = []
+        self.offset = 0
+        self.count: Optional[int] = None
+
+    def execute(self) -> MemoryResponse:
+        return MemoryResponse(self._table._execute(self))
+
+    def _filter(self, op: str, column: str, value: Any) -> "MemoryQuery":
+        self.filters.append((op, column, value))
+        return self
+
+    def eq(self, column: str, value: Any) -> "MemoryQuery":
+        return self._filter("eq", column, value)
+
+    def neq(self, column: str, value: Any) -> "MemoryQuery":
+        return self._filter("neq", column, value)
+
+    def gt(self, column: str, value: Any) -> "MemoryQuery":
+        return self._filter("gt", column, value)
+
+    def gte(self, column: str, value: Any) -> "MemoryQuery":
+        return self._filter("gte", column, value)
+
+    def lt(self, column: str, value: Any) -> "MemoryQuery":
+        return self._filter("lt", column, value)
+
+    def lte(self, column: str, value: Any) -> "MemoryQuery":
+        return self._filter("lte", column, value)
+
+    def in_(self, column: str, values: Iterable[Any]) -> "MemoryQuery":
+        return self._filter("in", column, list(values))
+
+    def is_(self, column: str, value: Any) -> "MemoryQuery":
+        if value not in (None, "null"):
+            raise ValueError("only is_(column, 'null') is supported")
+        return self._filter("is", column, None)
+
+    def order(self, column: str, desc: bool = False) -> "MemoryQuery":
+        self.ordering.append((column, desc))
+        return self
+
+    def limit(self, count: int) -> "MemoryQuery":
+        self.count = count
+        return self
+
+    def range(self, start: int, end: int) -> "MemoryQuery":
+        self.offset = start
+        self.count = end - start + 1
+        return self
+
+    def matches(self, row: Row) -> bool:
+        for op, column, value in self.filters:
+            cell = row.get(column)
+            if op == "is":
+                if cell is not None:
+                    return False
+                continue
+            if cell is None:
+                return False
+            if op == "in":
+                if cell not in value:
+                    return False
+            elif not _COMPARISONS[op](cell, value):
+                return False
+        return True
+
+
+class MemoryTable:
+    """One table's rows, keyed by primary key, with lazily built hash indexes."""
+
+    def __init__(self, name: str, primary_key: str = "id"):
+        self.name = name
+        self.primary_key = primary_key
+        self.records: Dict[Any, Row] = {}
+        # column -> value -> ids (a dict used as an insertion-ordered set)
+        self._indexes: Dict[str, Dict[Any, Dict[Any, None]]] = {}
+        self._unindexable: set = set()
+        self._sorted: Dict[str, SortedIndex] = {}
+        self._unsortable: set = set()
+        self._lock = threading.RLock()
+
+    def select(self, columns: str = "*") -> MemoryQuery:
+        return MemoryQuery(self, "select", columns=columns)
+
+    def insert(self, data: Union[Row, List[Row]]) -> MemoryQuery:
+        return MemoryQuery(self, "insert", data)
+
+    def upsert(self, data: Union[Row, List[Row]], on_conflict: str = "id", ignore_duplicates: bool = False) -> MemoryQuery:
+        return MemoryQuery(self, "upsert", data, on_conflict=on_conflict, ignore_duplicates=ignore_duplicates)
+
+    def update(self, data: Row) -> MemoryQuery:
+        return MemoryQuery(self, "update", data)
+
+    def delete(self) -> MemoryQuery:
+        return MemoryQuery(self, "delete")
+
+    def _execute(self, query: MemoryQuery) -> List[Row]:
+        with self._lock:
+            return getattr(self, f"_execute_{query.action}")(query)
+
+    # Indexes
+
+    def _index(self, column: str) -> Optional[Dict[Any, Dict[Any, None]]]:
+        index = self._indexes.get(column)
+        if index is not None or column in self._unindexable:
+            return index
+        index = {}
+        try:
+            for key, row in self.records.items():
+                index.setdefault(row.get(column), {})[key] = None
+        except TypeError:  # unhashable values; filter on this column by scanning
+            self._unindexable.add(column)
+            return None
+        self._indexes[column] = index
+        return index
+
+    def _sorted_index(self, column: str) -> Optional[SortedIndex]:
+        index = self._sorted.get(column)
+        if index is not None or column in self._unsortable:
+            return index
+        try:
+            index = SortedIndex([(row[column], key) for key, row in self.records.items() if row.get(column) is not None])
+        except TypeError:  # values that don't compare; order by sorting instead
+            self._unsortable.add(column)
+            return None
+        for key, row in self.records.items():
+            if row.get(column) is None:
+                index.nulls[key] = None
+        self._sorted[column] = index
+        return index
+
+    def _index_add(self, key: Any, row: Row) -> None:
+        for column, index in list(self._indexes.items()):
+            try:
+                index.setdefault(row.get(column), {})[key] = None
+            except TypeError:
+                del self._indexes[column]
+                self._unindexable.add(column)
+        for column, sorted_index in list(self._sorted.items()):
+            try:
+                sorted_index.add(row.get(column), key)
+            except TypeError:
+                del self._sorted[column]
+                self._unsortable.add(column)
+
+    def _index_remove(self, key: Any, row: Row) -> None:
+        for column, index in self._indexes.items():
+            bucket = index.get(row.get(column))
+            if bucket is not None:
+                bucket.pop(key, None)
+                if not bucket:
+                    del index[row.get(column)]
+        for column, sorted_index in self._sorted.items():
+            sorted_index.remove(row.get(column), key)
+
+    def _keys_for(self, column: str, values: Iterable[Any]) -> Optional[List[Any]]:
+        """Primary keys of rows whose ``column`` may equal one of ``values``, or ``None`` to scan."""
+        try:
+            if column == self.primary_key:
+                return [value for value in values if value in self.records]
+            index = self._index(column)
+            if index is None:
+                return None
+            return [key for value in values for key in index.get(value, ())]
+        except TypeError:
+            return None
+
+    def _candidates(self, query: MemoryQuery) -> List[Row]:
+        best: Optional[List[Any]] = None
+        for op, column, value in query.filters:
+            if op not in ("eq", "in"):
+                continue
+            keys = self._keys_for(column, (value,) if op == "eq" else value)
+            if keys is not None and (best is None or len(keys) < len(best)):
+                best = keys
+        if best is None:
+            return list(self.records.values())
+        rows = (self.records.get(key) for key in dict.fromkeys(best))
+        return [row for row in rows if row is not None]
+
+    def _matching(self, query: MemoryQuery) -> List[Row]:
+        return [row for row in self._candidates(query) if query.matches(row)]
+
+    # Writes; stored rows are replaced, never mutated
+
+    def _store(self, row: Row) -> None:
+        key = row[self.primary_key]
+        self.records[key] = row
+        self._index_add(key, row)
+
+    def _replace(self, old: Row, new: Row) -> None:
+        self._index_remove(old[self.primary_key], old)
+        del self.records[old[self.primary_key]]
+        self._store(new)
+
+    def _new_row(self, data: Row) -> Row:
+        row = _copy(data)
+        if row.get(self.primary_key) is None:
+            row[self.primary_key] = str(uuid4())
+        return row
+
+    def _shape(self, rows: List[Row], query: MemoryQuery) -> List[Row]:
+        if query.columns is None:
+            return [dict(row) for row in rows]
+        return [{column: row.get(column) for column in query.columns} for row in rows]
+
+    def _ordered_page(self, query: MemoryQuery) -> Optional[List[Row]]:
+        """A limited single-column ``order`` read off a sorted index, or ``None`` to sort instead."""
+        if len(query.ordering) != 1 or query.count is None:
+            return None
+        # An eq/in filter narrows through a hash index; sorting that result is cheaper.
+        if any(op in ("eq", "in") for op, _, _ in query.filters):
+            return None
+        column, desc = query.ordering[0]
+        index = self._sorted_index(column)
+        if index is None:
+            return None
+        bounds = [(op, value) for op, name, value in query.filters if name == column and op in ("gt", "gte", "lt", "lte")]
+        try:
+            keys = index.scan(bounds, desc)
+        except TypeError:
+            return None
+        rows: List[Row] = []
+        skip = query.offset
+        for key in keys:
+            if len(rows) >= query.count:
+                break
+            row = self.records[key]
+            if not query.matches(row):
+                continue
+            if skip:
+                skip -= 1
+                continue
+            rows.append(row)
+        return rows
+
+    def _execute_select(self, query: MemoryQuery) -> List[Row]:
+        rows = self._ordered_page(query)
+        if rows is None:
+            rows = self._matching(query)
+            for column, desc in reversed(query.ordering):
+                rows.sort(key=lambda row: _sort_key(row.get(column)), reverse=desc)
+            if query.offset or query.count is not None:
+                end = None if query.count is None else query.offset + query.count
+                rows = rows[query.offset : end]
+        return self._shape(rows, query)
+
+    def _execute_insert(self, query: MemoryQuery) -> List[Row]:
+        rows = [self._new_row(row) for row in (query.payload if isinstance(query.payload, list) else [query.payload])]
+        keys = [row[self.primary_key] for row in rows]
+        duplicates = [key for key in keys if key in self.records]
+        if duplicates or len(set(keys)) != len(keys):
+            raise ValueError(f'duplicate key value violates unique constraint "{self.name}_pkey"')
+        for row in rows:
+            self._store(row)
+        return self._shape(rows, query)
+
+    def _execute_upsert(self, query: MemoryQuery) -> List[Row]:
+        column = query.on_conflict
+        upserted: List[Row] = []
+        for data in query.payload if isinstance(query.payload, list) else [query.payload]:
+            keys = self._keys_for(column, (data.get(column),))
+            if keys is None:
+                keys = [key for key, row in self.records.items() if row.get(column) == data.get(column)]
+            existing = next((self.records[key] for key in keys if key in self.records), None)
+            if data.get(column) is None or existing is None:
+                row = self._new_row(data)
+                self._store(row)
+            elif query.ignore_duplicates:
+                continue
+            else:
+                row = {**existing, **_copy(data)}
+                self._replace(existing, row)
+            upserted.append(row)
+        return self._shape(upserted, query)
+
+    def _execute_update(self, query: MemoryQuery) -> List[Row]:
+        changes = _copy(query.payload)
+        updated: List[Row] = []
+        for old in self._matching(query):
+            new = {**old, **changes}
+            self._replace(old, new)
+            updated.append(new)
+        return self._shape(updated, query)
+
+    def _execute_delete(self, query: MemoryQuery) -> List[Row]:
+        deleted = self._matching(query)
+        for row in deleted:
+            self._index_remove(row[self.primary_key], row)
+            del self.records[row[self.primary_key]]
+        return self._shape(deleted, query)
+
+
+class MemoryClient:
+    """Drop-in for ``supabase.Client`` as far as ``table()`` goes."""
+
+    def __init__(self) -> None:
+        self.tables: Dict[str, MemoryTable] = {}
+        self._lock = threading.Lock()
+
+    def table(self, name: str) -> MemoryTable:
+        with self._lock:
+            table = self.tables.get(name)
+            if table is None:
+                table = self.tables[name] = MemoryTable(name)
+            return table
+
+    from_ = table
@@ -0,0 +1,105 @@
+"""
+On-demand profiling of single requests.
+
+The app always installs ``ProfilingMiddleware``; with ``PROFILING_ENABLED=true`` a
+request carrying ``X-Profile: 1`` runs under ``cProfile``. The stats are written as a
+pstats file to ``PROFILING_DIR``, and the response names it in ``X-Profile-File``.
+Requests without the header pass straight through. The settings are read on the
+first request, not when the app is built, and kept; while profiling is disabled the
+middleware only forwards each request.
+
+Inspect a dump with ``python -m pstats <file>``, or render a flamegraph with any
+pstats-aware tool (snakeviz, flameprof, gprof2dot).
+
+``cProfile`` follows the event loop thread, so:
+
+* while the profiled request is suspended, other requests running on the same loop
+  are captured too; profile on a quiet worker where possible
+* work handed to thread pools (Supabase ``execute()``, training) shows up as the
+  time spent awaiting it, not as its own frames
+
+Only one request is profiled at a time. A second ``X-Profile`` request arriving
+meanwhile runs unprofiled, and its response says so in ``X-Profile-Skipped``.
+"""
+
+import cProfile
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from backend.config import settings
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9]+")
+
+
+def _dump_name(method: str, path: str) -> str:
+    slug = _UNSAFE.sub("_", path).strip("_")[:80] or "root"
+    stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+    return f"{stamp}-{method.lower()}-{slug}-{uuid.uuid4().hex[:8]}.prof"
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles requests sending ``header: 1``."""
+
+    def __init__(
+        self,
+        app: Callable[..., Awaitable[None]],
+        directory: Optional[str] = None,
+        header: str = "x-profile",
+        enabled: Optional[bool] = None,
+    ):
+        """``enabled`` and ``directory`` default to ``PROFILING_ENABLED`` and ``PROFILING_DIR``."""
+        self.app = app
+        self._directory = directory
+        self._enabled = enabled
+        self.header = header.lower().encode("latin-1")
+        self._active = False
+
+    @property
+    def enabled(self) -> bool:
+        if self._enabled is None:
+            self._enabled = settings.profiling_enabled
+        return self._enabled
+
+    @property
+    def directory(self) -> Path:
+        if self._directory is None:
+            self._directory = settings.profiling_dir
+        return Path(self._directory)
+
+    def _requested(self, scope: Dict[str, Any]) -> bool:
+        return any(name == self.header and value.strip() == b"1" for name, value in scope["headers"])
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable[..., Any], send: Callable[..., Any]) -> None:
+        if scope["type"] != "http" or not self.enabled or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if self._active:
+            await self.app(scope, receive, self._with_header(send, b"x-profile-skipped", b"another request is being profiled"))
+            return
+
+        name = _dump_name(scope["method"], scope["path"])
+        profiler = cProfile.Profile()
+        self._active = True
+        try:
+            profiler.enable()
+            try:
+                await self.app(scope, receive, self._with_header(send, b"x-profile-file", name.encode()))
+            finally:
+                profiler.disable()
+        finally:
+            self._active = False
+            self.directory.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(self.directory / name)
+
+    @staticmethod
+    def _with_header(send: Callable[..., Any], name: bytes, value: bytes) -> Callable[..., Any]:
+        async def wrapped(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (name, value)]}
+            await send(message)
+
+        return wrapped
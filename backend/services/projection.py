@@ -0,0 +1,138 @@
+"""
+Field projection and data point slicing for chronotype reads.
+
+A ``Projection`` names the response fields a caller wants and, optionally, which
+data points: the last ``last`` of them and/or those inside a time-of-day window.
+``load_projected`` and ``load_projected_page`` read chronotypes through it so that:
+
+* only the requested columns are selected from Supabase (``columns()``), so a
+  caller asking for ``user_id`` never pulls the ``data_points`` blob
+* the feedback log is only read when ``data_points`` is requested
+* data points are sliced as raw dicts *before* validation (``slice_points()``), so
+  a long history is neither validated nor serialized just to be thrown away
+"""
+
+import asyncio
+from dataclasses import dataclass
+from datetime import time as time_of_day
+from typing import Any, Callable, List, Optional, Sequence, Tuple, TypeVar
+
+from backend.models.chronotype import ChronotypeDataPoint, ChronotypeResponse
+from backend.services.async_db import AsyncSupabase
+from backend.services.columnar import decode_data_points
+from backend.services.daytime import parse_time
+from backend.services.feedback_log import load_feedback, load_feedback_for
+
+T = TypeVar("T")
+
+CHRONOTYPE_FIELDS = ("chronotype_id", "user_id", "data_points")
+
+
+@dataclass(frozen=True)
+class Projection:
+    """Which chronotype fields, and which of its data points, a read returns."""
+
+    fields: Tuple[str, ...] = CHRONOTYPE_FIELDS
+    last: Optional[int] = None
+    window: Optional[Tuple[time_of_day, time_of_day]] = None
+
+    @classmethod
+    def parse(
+        cls,
+        fields: Optional[str] = None,
+        last: Optional[int] = None,
+        start: Optional[time_of_day] = None,
+        end: Optional[time_of_day] = None,
+    ) -> Optional["Projection"]:
+        """
+        A projection from query parameters, or ``None`` when they ask for the full
+        chronotype. Raises ``ValueError`` for an unknown field or half a window.
+        """
+        if fields is None and last is None and start is None and end is None:
+            return None
+        if (start is None) != (end is None):
+            raise ValueError("Provide both points_from and points_to")
+        selected = CHRONOTYPE_FIELDS
+        if fields is not None:
+            requested = [name.strip() for name in fields.split(",") if name.strip()]
+            unknown = sorted(set(requested) - set(CHRONOTYPE_FIELDS))
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+            # Response field order, whatever order they were asked in.
+            selected = tuple(name for name in CHRONOTYPE_FIELDS if name in requested)
+        window = (start, end) if start is not None and end is not None else None
+        return cls(fields=selected, last=last, window=window)
+
+    @property
+    def wants_points(self) -> bool:
+        return "data_points" in self.fields
+
+    def columns(self) -> str:
+        """Column list for ``select()``; always includes ``chronotype_id`` for keying results."""
+        return ",".join(dict.fromkeys(("chronotype_id", *self.fields)))
+
+    def slice_points(self, points: Sequence[T], time_of: Callable[[T], Any] = lambda point: point["time_of_day"]) -> List[T]:
+        """Points inside the window (wrapping past midnight if it ends before it starts), then the last ``last``."""
+        selected = list(points)
+        if self.window is not None:
+            start, end = self.window
+            if start <= end:
+                selected = [point for point in selected if start <= parse_time(time_of(point)) <= end]
+            else:
+                selected = [point for point in selected if not end < parse_time(time_of(point)) < start]
+        if self.last is not None:
+            selected = selected[-self.last :] if self.last else []
+        return selected
+
+    def project_record(self, record: dict, feedback: List[dict]) -> dict:
+        """The projected JSON view of a stored row; only the points that survive slicing are validated."""
+        projected = {name: record.get(name) for name in self.fields if name != "data_points"}
+        if self.wants_points:
+            points = self.slice_points([*decode_data_points(record.get("data_points")), *feedback])
+            projected["data_points"] = [ChronotypeDataPoint(**point).model_dump(mode="json") for point in points]
+        return projected
+
+    def project_response(self, chronotype: ChronotypeResponse) -> dict:
+        """The projected JSON view of an already validated chronotype, e.g. one from the read cache."""
+        projected = {name: getattr(chronotype, name) for name in self.fields if name != "data_points"}
+        if self.wants_points:
+            points = self.slice_points(chronotype.data_points, lambda point: point.time_of_day)
+            projected["data_points"] = [point.model_dump(mode="json") for point in points]
+        return projected
+
+
+async def load_projected(db: AsyncSupabase, chronotype_id: str, projection: Projection) -> Optional[dict]:
+    """
+    One chronotype, selecting only the projected columns, or ``None`` if there is no
+    such chronotype. The feedback log is read only when ``data_points`` is requested.
+    """
+    query = db.table("chronotypes").select(projection.columns()).eq("chronotype_id", chronotype_id).execute()
+    if projection.wants_points:
+        response, feedback = await asyncio.gather(query, load_feedback(db, chronotype_id))
+    else:
+        response, feedback = await query, []
+    if not response.data:
+        return None
+    return projection.project_record(response.data[0], feedback)
+
+
+async def load_projected_page(
+    db: AsyncSupabase, user_id: Optional[str], after: Optional[str], limit: int, projection: Projection
+) -> List[dict]:
+    """Up to ``limit`` projected chronotypes with ids after ``after``, in id order."""
+    query = db.table("chronotypes").select(projection.columns())
+    if user_id is not None:
+        query = query.eq("user_id", user_id)
+    if after is not None:
+        query = query.gt("chronotype_id", after)
+    response = await query.order("chronotype_id").limit(limit).execute()
+
+    ids = [record["chronotype_id"] for record in response.data]
+    feedback = await load_feedback_for(db, ids) if projection.wants_points else {}
+    return [
+        {
+            "chronotype_id": record["chronotype_id"],
+            **projection.project_record(record, [row["data_point"] for row in feedback.get(record["chronotype_id"], [])]),
+        }
+        for record in response.data
+    ]
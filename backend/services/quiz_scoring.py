@@ -0,0 +1,243 @@
+"""
+Table-driven chronotype quiz scoring.
+
+Scoring rules are plain data in ``RUBRICS``, keyed by version. Each rubric maps a
+question id to the ``analysis_details`` key it is reported under and, per answer,
+the points it adds to the early-bird and night-owl scores. Rubrics are compiled
+once at import into flat lookup tables:
+
+* every known ``(question_id, answer)`` pair gets an integer code
+* ``early[code]`` / ``night[code]`` hold the points for that code and ``counted[code]``
+  whether it counts towards ``total_questions`` (code 0 is an unknown answer, code 1 a
+  skipped question)
+
+so scoring one submission is a dict lookup per answer, and scoring thousands is a
+single ``np.bincount`` over all of their answers at once.
+
+Rules carried over from the original hand-written scorer:
+
+* question 0 (the welcome screen) is ignored
+* every other answered question counts towards ``total_questions``, even an unknown
+  question or answer that scores nothing
+* confidence is the score gap over ``total_questions * max_points``, capped at 1
+* a type wins when its score beats the other by more than ``margin``
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from backend.config import settings
+from backend.models.quiz import ChronotypeResult, QuizResponse
+
+EARLY_BIRD = "Early Bird"
+NIGHT_OWL = "Night Owl"
+INTERMEDIATE = "Intermediate"
+
+RUBRICS: Dict[str, Dict[str, Any]] = {
+    "v1": {
+        "skip_questions": [0],
+        "max_points": 3,
+        "margin": 2,
+        "questions": {
+            # Performance after staying up late
+            1: {
+                "detail": "late_night_performance",
+                "answers": {"very-poorly": (2, 0), "poorly": (2, 0), "neither": (1, 1), "well": (0, 2)},
+            },
+            # Preferred wake time
+            2: {
+                "detail": "preferred_wake_time",
+                "answers": {"5am": (3, 0), "6am": (3, 0), "7am": (2, 0), "8am": (1, 1), "9am": (0, 2), "10am": (0, 3)},
+            },
+            # Preferred bedtime
+            3: {
+                "detail": "preferred_bedtime",
+                "answers": {"8pm": (3, 0), "9pm": (3, 0), "10pm": (2, 0), "11pm": (1, 1), "12am": (0, 2), "1am": (0, 3)},
+            },
+            # Morning alertness
+            4: {
+                "detail": "morning_alertness",
+                "answers": {"very-alert": (2, 0), "fairly-alert": (1, 0), "slightly-alert": (0, 1), "not-alert": (0, 2)},
+            },
+            # Peak performance time
+            5: {
+                "detail": "peak_performance_time",
+                "answers": {"8am-test": (3, 0), "11am-test": (1, 1), "3pm-test": (1, 1), "7pm-test": (0, 3)},
+            },
+            # Tiredness at 11pm
+            6: {
+                "detail": "evening_tiredness",
+                "answers": {"very-tired": (2, 0), "fairly-tired": (1, 0), "slightly-tired": (0, 1), "not-tired": (0, 2)},
+            },
+            # Sleep recovery pattern
+            7: {
+                "detail": "sleep_recovery",
+                "answers": {"wake-later": (2, 0), "wake-later-sleep": (1, 1), "wake-much-later": (0, 2)},
+            },
+        },
+        "schedules": {
+            EARLY_BIRD: {"bedtime": "9:00 PM - 10:00 PM", "wake_time": "5:00 AM - 6:00 AM"},
+            NIGHT_OWL: {"bedtime": "11:00 PM - 12:00 AM", "wake_time": "7:00 AM - 8:00 AM"},
+            INTERMEDIATE: {"bedtime": "10:00 PM - 11:00 PM", "wake_time": "6:00 AM - 7:00 AM"},
+        },
+    },
+}
+
+Answers = Sequence[Union[QuizResponse, Dict[str, Any]]]
+
+
+def _answer(response: Union[QuizResponse, Dict[str, Any]]) -> Tuple[int, str]:
+    if isinstance(response, dict):
+        return response["question_id"], response["response_value"]
+    return response.question_id, response.response_value
+
+
+@dataclass
+class Scores:
+    """Raw scores for a batch of submissions, one entry per submission."""
+
+    early: np.ndarray
+    night: np.ndarray
+    total: np.ndarray
+
+
+class CompiledRubric:
+    """A rubric flattened into lookup tables."""
+
+    def __init__(self, version: str, rubric: Dict[str, Any]):
+        self.version = version
+        self.max_points = rubric["max_points"]
+        self.margin = rubric["margin"]
+        self.skip = frozenset(rubric["skip_questions"])
+        self.schedules = rubric["schedules"]
+        self.details: Dict[int, str] = {qid: q["detail"] for qid, q in rubric["questions"].items()}
+
+        # Code 0 is an answer that counts but scores nothing, code 1 a skipped question.
+        self.codes: Dict[Tuple[int, str], int] = {}
+        early, night, counted = [0, 0], [0, 0], [1, 0]
+        for qid, question in rubric["questions"].items():
+            for answer, (early_points, night_points) in question["answers"].items():
+                self.codes[(qid, answer)] = len(early)
+                early.append(early_points)
+                night.append(night_points)
+                counted.append(0 if qid in self.skip else 1)
+        self.early = np.array(early, dtype=np.int64)
+        self.night = np.array(night, dtype=np.int64)
+        self.counted = np.array(counted, dtype=np.int64)
+        self._early_list: List[int] = early
+        self._night_list: List[int] = night
+        self._counted_list: List[int] = counted
+
+    def classify(self, early: int, night: int) -> str:
+        if early > night + self.margin:
+            return EARLY_BIRD
+        if night > early + self.margin:
+            return NIGHT_OWL
+        return INTERMEDIATE
+
+    def _encode(self, answers: Answers, codes: List[int]) -> Dict[str, Any]:
+        """Append each answer's code to ``codes``; returns the submission's analysis details."""
+        details: Dict[str, Any] = {}
+        for response in answers:
+            qid, value = _answer(response)
+            code = self.codes.get((qid, value))
+            if code is None:
+                code = 1 if qid in self.skip else 0
+            codes.append(code)
+            key = self.details.get(qid)
+            if key is not None:
+                details[key] = value
+        return details
+
+    def _result(
+        self, details: Dict[str, Any], early: int, night: int, total: int, chronotype_type: str, confidence: float
+    ) -> ChronotypeResult:
+        details.update(
+            {
+                "early_bird_score": early,
+                "night_owl_score": night,
+                "total_questions": total,
+                "rubric_version": self.version,
+            }
+        )
+        # Built from the rubric's own tables, so skip re-validating every field.
+        return ChronotypeResult.model_construct(
+            chronotype_type=chronotype_type,
+            confidence_score=confidence,
+            analysis_details=details,
+            recommended_sleep_schedule=dict(self.schedules[chronotype_type]),
+        )
+
+    def score(self, answers: Answers) -> ChronotypeResult:
+        """Score one submission; raises ``ValueError`` if no question counts."""
+        codes: List[int] = []
+        details = self._encode(answers, codes)
+        early = sum(self._early_list[code] for code in codes)
+        night = sum(self._night_list[code] for code in codes)
+        total = sum(self._counted_list[code] for code in codes)
+        if total == 0:
+            raise ValueError("No valid questions answered")
+        confidence = min(abs(early - night) / (total * self.max_points), 1.0)
+        return self._result(details, early, night, total, self.classify(early, night), confidence)
+
+    def _tally(self, codes: List[int], lengths: List[int]) -> Scores:
+        owner = np.repeat(np.arange(len(lengths)), lengths)
+        code = np.array(codes, dtype=np.int64)
+        n = len(lengths)
+        return Scores(
+            early=np.bincount(owner, weights=self.early[code], minlength=n).astype(np.int64),
+            night=np.bincount(owner, weights=self.night[code], minlength=n).astype(np.int64),
+            total=np.bincount(owner, weights=self.counted[code], minlength=n).astype(np.int64),
+        )
+
+    def raw_scores(self, submissions: Sequence[Answers]) -> Scores:
+        """Early/night/total scores for every submission in one vectorised pass."""
+        codes: List[int] = []
+        for answers in submissions:
+            self._encode(answers, codes)
+        return self._tally(codes, [len(answers) for answers in submissions])
+
+    def score_batch(self, submissions: Sequence[Answers]) -> List[Union[ChronotypeResult, ValueError]]:
+        """
+        Score many submissions; each entry is the ``ChronotypeResult`` or, for a
+        submission with no counted questions, the ``ValueError`` ``score`` would raise.
+        """
+        codes: List[int] = []
+        details = [self._encode(answers, codes) for answers in submissions]
+        scores = self._tally(codes, [len(answers) for answers in submissions])
+        types = np.where(
+            scores.early > scores.night + self.margin,
+            0,
+            np.where(scores.night > scores.early + self.margin, 1, 2),
+        )
+        confidence = np.minimum(
+            np.abs(scores.early - scores.night) / (np.maximum(scores.total, 1) * self.max_points), 1.0
+        )
+        names = (EARLY_BIRD, NIGHT_OWL, INTERMEDIATE)
+
+        results: List[Union[ChronotypeResult, ValueError]] = []
+        for submission_details, early, night, total, kind, conf in zip(
+            details,
+            scores.early.tolist(),
+            scores.night.tolist(),
+            scores.total.tolist(),
+            types.tolist(),
+            confidence.tolist(),
+        ):
+            if total == 0:
+                results.append(ValueError("No valid questions answered"))
+            else:
+                results.append(self._result(submission_details, early, night, total, names[kind], conf))
+        return results
+
+
+COMPILED_RUBRICS: Dict[str, CompiledRubric] = {
+    version: CompiledRubric(version, rubric) for version, rubric in RUBRICS.items()
+}
+
+
+def get_rubric(version: Optional[str] = None) -> CompiledRubric:
+    """The compiled rubric for ``version`` (``QUIZ_RUBRIC_VERSION`` by default); ``KeyError`` if unknown."""
+    return COMPILED_RUBRICS[version or settings.quiz_rubric_version]
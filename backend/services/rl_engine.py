@@ -0,0 +1,308 @@
+"""
+Chronotype energy model.
+
+A chronotype's energy curve is modelled as a low-order Fourier series over the day:
+
+    energy(t) = w0 + sum_k (a_k * cos(2*pi*k*t / 24h) + b_k * sin(2*pi*k*t / 24h))
+
+Training starts from a ridge fit to the curve's current predictions (the prior) and
+runs mini-batch gradient descent on the squared error against the observed energy
+levels, with an L2 pull back towards the prior so a few feedback points nudge the
+curve instead of replacing it.
+
+All arithmetic works on stacked arrays shaped (chronotypes, points, features), so
+retraining one user and retraining many at once share the same code path.
+"""
+
+import math
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from backend.models.chronotype import TrainingConfig
+from backend.services.daytime import SECONDS_PER_DAY, parse_time, seconds_of_day
+
+HARMONICS = 3
+PRIOR_STRENGTH = 1e-2
+RIDGE = 1e-3
+TOLERANCE = 1e-4
+
+
+def fourier_features(seconds: np.ndarray, harmonics: int = HARMONICS) -> np.ndarray:
+    """Map seconds-since-midnight to ``1 + 2 * harmonics`` periodic features (last axis)."""
+    angle = (2.0 * np.pi / SECONDS_PER_DAY) * np.asarray(seconds, dtype=np.float64)[..., None]
+    k = np.arange(1, harmonics + 1, dtype=np.float64)
+    return np.concatenate(
+        [np.ones(angle.shape, dtype=np.float64), np.cos(angle * k), np.sin(angle * k)],
+        axis=-1,
+    )
+
+
+def _compose_affine(maps: np.ndarray, offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compose a sequence of affine maps ``w -> maps[k] @ w + offsets[k]`` (k = 0 applied first).
+
+    ``maps`` is ``(K, B, F, F)`` and ``offsets`` ``(K, B, F)``. Neighbouring pairs are
+    combined level by level, so K sequential steps cost ~log2(K) batched matmuls.
+    """
+    while maps.shape[0] > 1:
+        if maps.shape[0] % 2:
+            identity = np.broadcast_to(np.eye(maps.shape[-1]), (1,) + maps.shape[1:])
+            maps = np.concatenate([maps, identity])
+            offsets = np.concatenate([offsets, np.zeros((1,) + offsets.shape[1:])])
+        first, second = maps[0::2], maps[1::2]
+        offsets = np.matmul(second, offsets[0::2][..., None])[..., 0] + offsets[1::2]
+        maps = np.matmul(second, first)
+    return maps[0], offsets[0]
+
+
+class ChronotypeRLEngine:
+    """Retrains per-chronotype energy curves from observed feedback."""
+
+    def __init__(self, harmonics: int = HARMONICS, prior_strength: float = PRIOR_STRENGTH, seed: int = 0):
+        self.harmonics = harmonics
+        self.prior_strength = prior_strength
+        self.seed = seed
+
+    def fit(
+        self,
+        seconds: np.ndarray,
+        actual: np.ndarray,
+        prior: np.ndarray,
+        mask: np.ndarray,
+        prior_mask: np.ndarray,
+        config: TrainingConfig,
+    ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Fit one weight vector per row of the stacked ``(B, N)`` inputs.
+
+        ``mask`` marks real (non-padding) points, ``prior_mask`` the subset that carries a
+        prior prediction. Returns weights shaped ``(B, F)`` and per-row training
+        statistics (arrays of length ``B``).
+        """
+        batch, width = seconds.shape
+        features = fourier_features(seconds, self.harmonics) * mask[..., None]
+        n_features = features.shape[-1]
+        eye = np.eye(n_features)
+
+        # Prior: ridge regression onto the curve the chronotype currently predicts.
+        prior_x = features * prior_mask[..., None]
+        gram = np.einsum("bni,bnj->bij", prior_x, prior_x) + RIDGE * eye
+        w_prior = np.linalg.solve(gram, np.einsum("bni,bn->bi", prior_x, prior)[..., None])[..., 0]
+        weights = w_prior.copy()
+
+        counts = mask.sum(axis=1)
+        safe_counts = np.maximum(counts, 1.0)
+
+        def loss_of(w: np.ndarray) -> np.ndarray:
+            residual = (np.einsum("bni,bi->bn", features, w) - actual) * mask
+            return (residual ** 2).sum(axis=1) / safe_counts
+
+        batch_size = max(1, min(config.batch_size, width))
+        n_batches = math.ceil(width / batch_size) if width else 0
+        extra = n_batches * batch_size - width
+        rng = np.random.default_rng(self.seed)
+        lr = config.learning_rate
+        pull = 2.0 * self.prior_strength
+
+        # Columns [features | target | mask], padded once to a whole number of batches,
+        # so a single gather + matmul per epoch yields X^T X, X^T y and batch counts.
+        augmented = np.concatenate([features, (actual * mask)[..., None], mask[..., None]], axis=-1)
+        augmented = np.pad(augmented, ((0, 0), (0, extra), (0, 0)))
+        padding = np.pad(mask == 0, ((0, 0), (0, extra)), constant_values=True)
+        rows = np.arange(batch)[:, None]
+        pull_offset = (lr * pull) * w_prior[:, None, :]
+        decay = (1.0 - lr * pull) * eye
+
+        initial_loss = loss_of(weights)
+        loss = initial_loss
+        epochs = np.zeros(batch, dtype=np.int64)
+        converged = np.zeros(batch, dtype=bool)
+        for _ in range(config.max_epochs if n_batches else 0):
+            active = ~converged
+            epochs += active
+            # Shuffle each row independently; padding sorts to the end of its row.
+            order = np.argsort(rng.random(padding.shape) + padding, axis=1)
+            z = augmented[rows, order]
+            z = z.reshape(batch, n_batches, batch_size, n_features + 2)
+            moments = np.matmul(np.swapaxes(z, -1, -2), z)
+            batch_counts = moments[..., -1, -1]
+            nonempty = batch_counts > 0
+            scales = (2.0 / np.maximum(batch_counts, 1.0)) * nonempty
+
+            # One SGD step on mini-batch k is affine in the weights:
+            #   w <- (I - lr * (s_k * X_k^T X_k + pull * I)) w + lr * (s_k * X_k^T y_k + pull * w_prior)
+            # so the whole epoch is composed in a log-depth reduction rather than a Python loop.
+            # Batches that are all padding (short rows in a ragged stack) are skipped.
+            maps = decay - (lr * scales)[..., None, None] * moments[..., :n_features, :n_features]
+            maps = np.where(nonempty[..., None, None], maps, eye)
+            offsets = ((lr * scales)[..., None] * moments[..., :n_features, n_features] + pull_offset) * nonempty[..., None]
+            epoch_map, epoch_offset = _compose_affine(np.swapaxes(maps, 0, 1), np.swapaxes(offsets, 0, 1))
+            stepped = np.matmul(epoch_map, weights[..., None])[..., 0] + epoch_offset
+            # Rows that already converged keep their weights, as if trained on their own.
+            weights = np.where(active[:, None], stepped, weights)
+
+            previous, loss = loss, loss_of(weights)
+            converged |= np.abs(previous - loss) <= TOLERANCE * np.maximum(previous, 1e-12)
+            if converged.all():
+                break
+
+        return weights, {
+            "epochs": epochs,
+            "batches_per_epoch": np.ceil(counts / batch_size).astype(np.int64),
+            "initial_loss": initial_loss,
+            "loss": loss,
+            "converged": converged,
+        }
+
+    def predict(self, weights: np.ndarray, seconds: np.ndarray) -> np.ndarray:
+        """Energy levels in ``[0, 1]`` for ``seconds`` shaped ``(B, N)`` under ``weights`` ``(B, F)``."""
+        return np.clip(np.einsum("bni,bi->bn", fourier_features(seconds, self.harmonics), weights), 0.0, 1.0)
+
+    def _points(self, chronotype: Dict[str, Any], feedback: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        points = list(chronotype.get("data_points") or [])
+        points.extend(
+            {
+                "time_of_day": fb["time_of_day"],
+                "predicted_energy_level": fb.get("predicted_energy_level"),
+                "actual_energy_level": fb["actual_energy_level"],
+                "context": dict(fb.get("context") or {}),
+            }
+            for fb in feedback
+        )
+        return points
+
+    def _columns(self, points: List[Dict[str, Any]]) -> Tuple[List[float], ...]:
+        """Per-point seconds, actual, prior and prior flag; raises on malformed points."""
+        return (
+            [seconds_of_day(parse_time(p["time_of_day"])) for p in points],
+            [float(p["actual_energy_level"]) for p in points],
+            [p.get("predicted_energy_level") or 0.0 for p in points],
+            [p.get("predicted_energy_level") is not None for p in points],
+        )
+
+    def _stack(self, columns: List[Tuple[List[float], ...]]) -> Tuple[np.ndarray, ...]:
+        """Right-pad per-chronotype columns into ``(B, N)`` arrays plus a mask of real points."""
+        width = max((len(seconds) for seconds, *_ in columns), default=0)
+        shape = (len(columns), width)
+        seconds, actual, prior, prior_mask, mask = (np.zeros(shape) for _ in range(5))
+        for row, (row_seconds, row_actual, row_prior, row_flags) in enumerate(columns):
+            n = len(row_seconds)
+            seconds[row, :n] = row_seconds
+            actual[row, :n] = row_actual
+            prior[row, :n] = row_prior
+            prior_mask[row, :n] = row_flags
+            mask[row, :n] = 1.0
+        return seconds, actual, prior, mask, prior_mask
+
+    def _result(
+        self,
+        chronotype: Dict[str, Any],
+        feedback: List[Dict[str, Any]],
+        points: List[Dict[str, Any]],
+        predicted: np.ndarray,
+        actual: np.ndarray,
+        weights: np.ndarray,
+        stats: Dict[str, Any],
+        row: int,
+        training_time: float,
+    ) -> Dict[str, Any]:
+        n = len(points)
+        predicted, actual = predicted[:n], actual[:n]
+        updated_points = [
+            {
+                **point,
+                "time_of_day": point["time_of_day"]
+                if isinstance(point["time_of_day"], str)
+                else point["time_of_day"].isoformat(),
+                "predicted_energy_level": value,
+                "difference_from_actual": value - point["actual_energy_level"],
+            }
+            for point, value in zip(points, predicted.tolist())
+        ]
+
+        mean_abs_error = float(np.abs(predicted - actual).mean()) if points else 0.0
+        return {
+            "chronotype": {**chronotype, "data_points": updated_points},
+            "training_metadata": {
+                "model": f"fourier-{self.harmonics}",
+                "samples": n,
+                "feedback_samples": len(feedback),
+                "epochs": int(stats["epochs"][row]),
+                "batches_per_epoch": int(stats["batches_per_epoch"][row]),
+                "converged": bool(stats["converged"][row]),
+                "initial_loss": float(stats["initial_loss"][row]),
+                "loss": float(stats["loss"][row]),
+                "reward": 1.0 - mean_abs_error,
+                "weights": weights[row].tolist(),
+                "training_time_seconds": training_time,
+            },
+        }
+
+    def train_and_predict(
+        self,
+        chronotype: Dict[str, Any],
+        feedback: List[Dict[str, Any]],
+        config: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Retrain ``chronotype`` on its data points plus ``feedback`` and re-predict every point.
+
+        Feedback entries are appended as new data points. Returns ``{"chronotype": ...,
+        "training_metadata": ...}`` where the chronotype's data points carry the new
+        predictions and differences.
+        """
+        started = time.perf_counter()
+        settings = TrainingConfig(**(config or {}))
+        points = self._points(chronotype, feedback)
+        seconds, actual, prior, mask, prior_mask = self._stack([self._columns(points)])
+
+        weights, stats = self.fit(seconds, actual, prior, mask, prior_mask, settings)
+        predicted = self.predict(weights, seconds)
+        return self._result(
+            chronotype, feedback, points, predicted[0], actual[0], weights, stats, 0, time.perf_counter() - started
+        )
+
+    def train_and_predict_batch(
+        self,
+        items: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]],
+        config: Optional[Dict[str, Any]] = None,
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Retrain many ``(chronotype, feedback)`` pairs in one stacked ``fit``.
+
+        Returns one entry per item, in order: the same result ``train_and_predict`` gives,
+        or the exception raised while reading that item's points, so one malformed
+        chronotype does not fail the rest. ``training_time_seconds`` is the stacked run's
+        time split evenly across the items in it.
+        """
+        started = time.perf_counter()
+        settings = TrainingConfig(**(config or {}))
+        results: List[Union[Dict[str, Any], Exception]] = list(items)
+        rows: List[int] = []
+        samples: List[List[Dict[str, Any]]] = []
+        columns: List[Tuple[List[float], ...]] = []
+        for index, (chronotype, feedback) in enumerate(items):
+            try:
+                points = self._points(chronotype, feedback)
+                columns.append(self._columns(points))
+            except Exception as exc:
+                results[index] = exc
+                continue
+            rows.append(index)
+            samples.append(points)
+
+        if not samples:
+            return results
+
+        seconds, actual, prior, mask, prior_mask = self._stack(columns)
+        weights, stats = self.fit(seconds, actual, prior, mask, prior_mask, settings)
+        predicted = self.predict(weights, seconds)
+        share = (time.perf_counter() - started) / len(samples)
+        for row, (index, points) in enumerate(zip(rows, samples)):
+            chronotype, feedback = items[index]
+            results[index] = self._result(
+                chronotype, feedback, points, predicted[row], actual[row], weights, stats, row, share
+            )
+        return results
@@ -0,0 +1,138 @@
+"""
+Background chronotype training jobs.
+
+Training is CPU-bound, so jobs hand the engine call to an executor (a
+``ProcessPoolExecutor`` in production, which sidesteps the GIL) while the web
+worker keeps serving requests. Job state lives in memory on the worker that
+accepted the job.
+
+Submissions are coalesced per chronotype: there is at most one running job and
+one pending follow-up for each chronotype.
+
+* With a job already active, a submission without new feedback and with the same
+  training config reuses it.
+* Any other submission while a job is running is merged into the pending
+  follow-up, which starts as soon as the running job finishes.
+"""
+
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+@dataclass
+class TrainingJob:
+    job_id: str
+    chronotype_id: str
+    feedback: List[Dict[str, Any]] = field(default_factory=list)
+    config: Dict[str, Any] = field(default_factory=dict)
+    status: str = QUEUED
+    submitted_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    coalesced_submissions: int = 0
+    training_metadata: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    task: Optional["asyncio.Task[None]"] = field(default=None, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+
+# Runs one job to completion and returns the engine result ({"chronotype", "training_metadata"}).
+JobRunner = Callable[[TrainingJob], Awaitable[Dict[str, Any]]]
+
+
+class TrainingJobManager:
+    """Tracks training jobs and runs them as asyncio tasks on top of ``executor``."""
+
+    def __init__(self, executor: Executor, history_size: int = 1000):
+        self.executor = executor
+        self.history_size = history_size
+        self._jobs: "OrderedDict[str, TrainingJob]" = OrderedDict()
+        self._running: Dict[str, TrainingJob] = {}
+        self._pending: Dict[str, TrainingJob] = {}
+
+    def get(self, job_id: str) -> Optional[TrainingJob]:
+        return self._jobs.get(job_id)
+
+    def submit(
+        self,
+        chronotype_id: str,
+        feedback: List[Dict[str, Any]],
+        config: Dict[str, Any],
+        runner: JobRunner,
+    ) -> Tuple[TrainingJob, bool]:
+        """Queue a training run. Returns the job that will cover it and whether it was coalesced."""
+        pending = self._pending.get(chronotype_id)
+        running = self._running.get(chronotype_id)
+
+        if pending is not None:
+            pending.feedback.extend(feedback)
+            pending.config.update(config)
+            pending.coalesced_submissions += 1
+            return pending, True
+
+        if running is not None:
+            # The running job was started with its own config; only an identical one is covered by it.
+            if not feedback and config == running.config:
+                running.coalesced_submissions += 1
+                return running, True
+            job = self._new_job(chronotype_id, feedback, config)
+            self._pending[chronotype_id] = job
+            return job, False
+
+        job = self._new_job(chronotype_id, feedback, config)
+        self._start(job, runner)
+        return job, False
+
+    def _new_job(self, chronotype_id: str, feedback: List[Dict[str, Any]], config: Dict[str, Any]) -> TrainingJob:
+        job = TrainingJob(job_id=str(uuid4()), chronotype_id=chronotype_id, feedback=list(feedback), config=dict(config))
+        self._jobs[job.job_id] = job
+        self._trim_history()
+        return job
+
+    def _trim_history(self) -> None:
+        while len(self._jobs) > self.history_size:
+            oldest_id = next(iter(self._jobs))
+            if not self._jobs[oldest_id].done:
+                break
+            del self._jobs[oldest_id]
+
+    def _start(self, job: TrainingJob, runner: JobRunner) -> None:
+        self._running[job.chronotype_id] = job
+        job.task = asyncio.ensure_future(self._run(job, runner))
+
+    async def _run(self, job: TrainingJob, runner: JobRunner) -> None:
+        job.status = RUNNING
+        job.started_at = datetime.utcnow()
+        try:
+            result = await runner(job)
+            job.training_metadata = result.get("training_metadata", {})
+            job.status = SUCCEEDED
+        except Exception as exc:
+            job.error = str(exc)
+            job.status = FAILED
+        finally:
+            job.finished_at = datetime.utcnow()
+            del self._running[job.chronotype_id]
+            follow_up = self._pending.pop(job.chronotype_id, None)
+            if follow_up is not None:
+                self._start(follow_up, runner)
+
+    async def run_in_executor(self, func: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,218 @@
+"""
+Write-behind buffering for inserts nobody waits on.
+
+``WriteBehindBuffer`` collects rows in memory and writes them in batches from a
+background task, so a request that only needs to *record* something returns
+without a database round-trip:
+
+* a batch is written every ``flush_interval`` seconds, or as soon as
+  ``batch_size`` rows are waiting
+* the buffer holds at most ``max_pending`` rows; a caller that finds it full
+  flushes inline first, so a slow database turns into backpressure rather than
+  unbounded memory
+* a failed write is retried ``max_retries`` times with exponential backoff. After
+  that the batch is set aside in two halves, retried after the rows queued behind
+  it, and halved again each time it fails. A single row that still fails is
+  dead-lettered, so one bad row costs its batch a few flushes rather than blocking
+  the buffer; rows arriving while the buffer is full are dropped (and counted)
+* ``close()`` stops the background task and flushes whatever is left
+
+Delivery is at-least-once: a write cancelled at shutdown is retried by the final
+flush even if the database had already applied it. Rows are written as an upsert on
+``on_conflict`` that ignores duplicates, so such a retry leaves the stored row as it
+is instead of failing on its key.
+
+Rows are lost if the process dies before they are flushed, so only use this for
+data that is acceptable to lose in a crash.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from backend.services.async_db import AsyncSupabase
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """Batches inserts into one table off the request path."""
+
+    def __init__(
+        self,
+        table: str,
+        on_conflict: str = "id",
+        max_pending: int = 10_000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+    ):
+        if batch_size <= 0 or max_pending < batch_size:
+            raise ValueError("need 0 < batch_size <= max_pending")
+        self.table = table
+        self.on_conflict = on_conflict
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+        self._pending: Deque[Dict[str, Any]] = deque()
+        # Parts of batches that used up their retries, each written on its own.
+        self._set_aside: Deque[List[Dict[str, Any]]] = deque()
+        self._set_aside_rows = 0
+        self.dead_letters: Deque[Dict[str, Any]] = deque(maxlen=max_pending)
+        self._db: Optional[AsyncSupabase] = None
+        # Loop-bound state, recreated if the buffer is used from a new event loop.
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._stopping = False
+
+        self.written = 0
+        self.batches = 0
+        self.retries = 0
+        self.failed_flushes = 0
+        self.dropped = 0
+        self.dead_lettered = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending) + self._set_aside_rows
+
+    def _bind(self) -> asyncio.AbstractEventLoop:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._task = None
+            self._wakeup = asyncio.Event()
+            self._lock = asyncio.Lock()
+        return loop
+
+    def _ensure_flusher(self) -> None:
+        loop = self._bind()
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._task = loop.create_task(self._run())
+
+    async def add(self, db: AsyncSupabase, row: Dict[str, Any]) -> None:
+        """Queue ``row`` for insertion through ``db``; returns without writing unless the buffer is full."""
+        self._db = db
+        self._ensure_flusher()
+        if self.pending >= self.max_pending:
+            await self.flush()
+            if self.pending >= self.max_pending:
+                self.dropped += 1
+                logger.error("Dropped a row for %s: write-behind buffer full", self.table)
+                return
+        self._pending.append(row)
+        if len(self._pending) >= self.batch_size:
+            assert self._wakeup is not None
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:  # pragma: no cover - flush already logs and sets failed rows aside
+                logger.exception("Write-behind flush of %s failed", self.table)
+
+    async def flush(self) -> int:
+        """
+        Write everything pending in ``batch_size`` chunks, then the set-aside parts of
+        earlier failed batches; returns the number of rows written. Stops at the first
+        batch that fails.
+        """
+        self._bind()
+        assert self._lock is not None
+        written = 0
+        async with self._lock:
+            while self._pending and self._db is not None:
+                batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+                if not await self._write(batch):
+                    return written
+                written += len(batch)
+            for _ in range(len(self._set_aside)):
+                if self._db is None:
+                    break
+                batch = self._set_aside.popleft()
+                self._set_aside_rows -= len(batch)
+                if not await self._write(batch):
+                    break
+                written += len(batch)
+        return written
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> bool:
+        try:
+            inserted = await self._insert(batch)
+        except asyncio.CancelledError:
+            # Shutting down mid-write: keep the rows for the final flush.
+            self._set_aside.appendleft(batch)
+            self._set_aside_rows += len(batch)
+            raise
+        if not inserted:
+            self._put_aside(batch)
+        return inserted
+
+    async def _insert(self, batch: List[Dict[str, Any]]) -> bool:
+        assert self._db is not None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.retries += 1
+                await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+            try:
+                await self._db.table(self.table).upsert(
+                    batch, on_conflict=self.on_conflict, ignore_duplicates=True
+                ).execute()
+            except Exception:
+                logger.warning("Insert of %d rows into %s failed (attempt %d)", len(batch), self.table, attempt + 1)
+                continue
+            self.written += len(batch)
+            self.batches += 1
+            return True
+        self.failed_flushes += 1
+        return False
+
+    def _put_aside(self, batch: List[Dict[str, Any]]) -> None:
+        """Halve a batch that used up its retries, or dead-letter it once it is a single row."""
+        if len(batch) == 1:
+            self.dead_letters.append(batch[0])
+            self.dead_lettered += 1
+            logger.error("Dead-lettered a row for %s after repeated failed writes", self.table)
+            return
+        middle = len(batch) // 2
+        self._set_aside.extend([batch[:middle], batch[middle:]])
+        self._set_aside_rows += len(batch)
+
+    async def close(self) -> None:
+        """Stop the background flusher and write out everything still pending."""
+        task, self._task = self._task, None
+        if task is not None and self._loop is asyncio.get_running_loop() and not task.done():
+            # Stop by flag rather than cancel(): wait_for can swallow a cancellation
+            # that races with the wakeup event.
+            self._stopping = True
+            assert self._wakeup is not None
+            self._wakeup.set()
+            await task
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "table": self.table,
+            "pending": self.pending,
+            "written": self.written,
+            "batches": self.batches,
+            "retries": self.retries,
+            "failed_flushes": self.failed_flushes,
+            "dropped": self.dropped,
+            "dead_lettered": self.dead_lettered,
+        }
@@ -0,0 +1,67 @@
+"""
+Tests for the async Supabase facade used by the chronotype and quiz routes.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from backend.services.async_db import AsyncSupabase
+
+
+class _SlowBuilder:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.filters = []
+        self.thread_ids = []
+
+    def select(self, *_args):
+        return self
+
+    def eq(self, field, value):
+        self.filters.append((field, value))
+        return self
+
+    def execute(self):
+        self.thread_ids.append(threading.get_ident())
+        time.sleep(self.latency)
+        return SimpleNamespace(data=list(self.filters))
+
+
+class _SlowClient:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.builders = []
+
+    def table(self, _name):
+        builder = _SlowBuilder(self.latency)
+        self.builders.append(builder)
+        return builder
+
+
+@pytest.mark.asyncio
+async def test_execute_runs_off_the_event_loop():
+    client = _SlowClient(latency=0.0)
+    db = AsyncSupabase(client, ThreadPoolExecutor(max_workers=2))
+
+    response = await db.table("chronotypes").select("*").eq("chronotype_id", "abc").execute()
+
+    assert response.data == [("chronotype_id", "abc")]
+    assert client.builders[0].thread_ids[0] != threading.get_ident()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_executes_overlap():
+    client = _SlowClient(latency=0.1)
+    db = AsyncSupabase(client, ThreadPoolExecutor(max_workers=10))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(db.table("chronotypes").select("*").execute() for _ in range(10)))
+    elapsed = time.perf_counter() - start
+
+    # Ten 100 ms round-trips serialised would take a full second.
+    assert elapsed < 0.5
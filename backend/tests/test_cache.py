@@ -0,0 +1,132 @@
+"""
+Tests for the in-process cache primitives in services/cache.py.
+"""
+
+import asyncio
+
+import pytest
+
+from backend.services.cache import MISSING, CachedSingleFlight, LRUTTLCache, VersionedCache, WriteVersions
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUTTLCache(maxsize=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b", MISSING) is MISSING
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = LRUTTLCache(maxsize=10, ttl_seconds=5, clock=clock)
+    cache.set("a", None)
+
+    assert cache.get("a", MISSING) is None
+    clock.now = 5.0
+    assert cache.get("a", MISSING) is MISSING
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["expirations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_one_upstream_call():
+    cached = CachedSingleFlight(maxsize=10, ttl_seconds=60)
+    calls = 0
+
+    async def upstream():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    results = await asyncio.gather(*(cached.get_or_compute("prompt", upstream) for _ in range(20)))
+
+    assert results == ["answer"] * 20
+    assert calls == 1
+    assert cached.stats()["singleflight"]["shared"] == 19
+
+    assert await cached.get_or_compute("prompt", upstream) == "answer"
+    assert calls == 1
+    assert cached.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_single_flight_does_not_cache_failures():
+    cached = CachedSingleFlight(maxsize=10, ttl_seconds=60)
+    attempts = 0
+
+    async def flaky():
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise RuntimeError("boom")
+        return "ok"
+
+    with pytest.raises(RuntimeError):
+        await cached.get_or_compute("k", flaky)
+    assert await cached.get_or_compute("k", flaky) == "ok"
+    assert attempts == 2
+
+
+@pytest.mark.asyncio
+async def test_versioned_cache_drops_a_fill_that_raced_a_write():
+    versions = WriteVersions()
+    cached = VersionedCache(maxsize=10, ttl_seconds=60, versions=versions)
+    release = asyncio.Event()
+
+    async def slow_read():
+        await release.wait()
+        return "before write"
+
+    read = asyncio.ensure_future(cached.get_or_compute("k", slow_read))
+    await asyncio.sleep(0)
+    versions.bump("k")
+    release.set()
+
+    assert await read == "before write"
+    assert cached.get("k", MISSING) is MISSING
+
+    async def fresh_read():
+        return "after write"
+
+    assert await cached.get_or_compute("k", fresh_read) == "after write"
+    assert cached.get("k") == "after write"
+
+
+def test_versioned_cache_entries_retire_on_write():
+    versions = WriteVersions()
+    cached = VersionedCache(maxsize=10, ttl_seconds=60, versions=versions)
+    assert cached.put("k", "v1", versions.version("k"))
+
+    versions.bump("k")
+
+    assert cached.get("k", MISSING) is MISSING
+    assert cached.stats()["stale"] == 1
+    assert not cached.put("k", "v1", 0)
+
+
+def test_forgotten_write_versions_never_report_an_older_stamp():
+    versions = WriteVersions(max_tracked=2)
+    stamp = versions.bump("a")
+    versions.bump("b")
+    versions.bump("c")
+
+    assert versions.version("a") >= stamp
+    assert versions.version("never-written") >= stamp
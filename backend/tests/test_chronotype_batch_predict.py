@@ -0,0 +1,99 @@
+"""
+Tests for batch chronotype retraining. Makes use of mocks in /conftest.py.
+"""
+
+import numpy as np
+import pytest
+from fastapi import status
+
+from backend.services.rl_engine import ChronotypeRLEngine
+
+
+def _points(hours, actual=0.5):
+    return [
+        {
+            "time_of_day": f"{hour:02d}:00:00",
+            "predicted_energy_level": 0.5,
+            "actual_energy_level": actual,
+            "difference_from_actual": 0.0,
+            "context": {},
+        }
+        for hour in hours
+    ]
+
+
+def _seed(mock_supabase_client, chronotype_id, user_id, hours):
+    mock_supabase_client.table("chronotypes").insert(
+        {"chronotype_id": chronotype_id, "user_id": user_id, "data_points": _points(hours)}
+    ).execute()
+
+
+def test_batch_matches_individual_training():
+    engine = ChronotypeRLEngine()
+    items = [
+        ({"chronotype_id": f"c{n}", "data_points": _points(range(n), actual=n / 24)}, [])
+        for n in (3, 10, 20)
+    ]
+
+    batch = engine.train_and_predict_batch(items, {"max_epochs": 200})
+
+    for (chronotype, feedback), result in zip(items, batch):
+        single = engine.train_and_predict(chronotype, feedback, {"max_epochs": 200})
+        assert result["training_metadata"]["epochs"] == single["training_metadata"]["epochs"]
+        assert np.allclose(
+            [p["predicted_energy_level"] for p in result["chronotype"]["data_points"]],
+            [p["predicted_energy_level"] for p in single["chronotype"]["data_points"]],
+        )
+
+
+def test_batch_isolates_malformed_items():
+    engine = ChronotypeRLEngine()
+    bad = {"chronotype_id": "bad", "data_points": [{"time_of_day": "not a time", "actual_energy_level": 0.5}]}
+    good = {"chronotype_id": "good", "data_points": _points([8, 12])}
+
+    bad_result, good_result = engine.train_and_predict_batch([(bad, []), (good, [])])
+
+    assert isinstance(bad_result, Exception)
+    assert good_result["training_metadata"]["samples"] == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_predict_by_ids_and_users(client, mock_supabase_client):
+    _seed(mock_supabase_client, "c-1", "user-a", [6, 12])
+    _seed(mock_supabase_client, "c-2", "user-a", [9, 15, 21])
+    _seed(mock_supabase_client, "c-3", "user-b", [7])
+    mock_supabase_client.table("chronotype_feedback").insert(
+        {
+            "feedback_id": "fb-1",
+            "chronotype_id": "c-3",
+            "data_point": _points([22], actual=0.1)[0],
+            "recorded_at": "2024-01-01T00:00:00",
+        }
+    ).execute()
+
+    response = client.post(
+        "/chronotype/predict/batch",
+        json={"chronotype_ids": ["c-3", "missing"], "user_ids": ["user-a"]},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert [r["chronotype_id"] for r in body["results"]] == ["c-3", "missing", "c-1", "c-2"]
+    assert [r["status"] for r in body["results"]] == ["succeeded", "failed", "succeeded", "succeeded"]
+    assert body["results"][1]["error"] == "Chronotype not found"
+    assert (body["succeeded"], body["failed"]) == (3, 1)
+    assert body["chronotypes_per_second"] > 0
+
+    stored = {
+        record["chronotype_id"]: record for record in mock_supabase_client.table("chronotypes").records.values()
+    }
+    assert len(stored) == 3
+    assert len(stored["c-3"]["data_points"]) == 2
+    assert mock_supabase_client.table("chronotype_feedback").records == {}
+
+
+@pytest.mark.asyncio
+async def test_batch_predict_requires_a_selector(client):
+    response = client.post("/chronotype/predict/batch", json={})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,83 @@
+"""
+Tests for the read-through chronotype cache. Makes use of mocks in /conftest.py.
+"""
+
+from fastapi import status
+
+
+def _payload(chronotype_id="c-cached", level=0.5):
+    return {
+        "user_id": "user-cache",
+        "chronotype_id": chronotype_id,
+        "data_points": [
+            {
+                "time_of_day": "09:00:00",
+                "predicted_energy_level": level,
+                "actual_energy_level": level,
+                "difference_from_actual": 0.0,
+                "context": {},
+            }
+        ],
+    }
+
+
+def _stored(mock_supabase_client):
+    return next(iter(mock_supabase_client.table("chronotypes").records.values()))
+
+
+def test_repeat_reads_are_served_from_cache(client, mock_supabase_client):
+    mock_supabase_client.table("chronotypes").insert(_payload()).execute()
+
+    first = client.get("/chronotype/c-cached")
+    # Change the row behind the API's back: a cached read must not see it.
+    _stored(mock_supabase_client)["data_points"][0]["predicted_energy_level"] = 0.9
+    second = client.get("/chronotype/c-cached")
+
+    assert first.status_code == second.status_code == status.HTTP_200_OK
+    assert second.json() == first.json()
+    stats = client.get("/chronotype/cache/stats").json()["responses"]
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_writes_refresh_the_cached_chronotype(client, mock_supabase_client):
+    client.post("/chronotype", json=_payload())
+    assert client.get("/chronotype/c-cached").json()["data_points"][0]["predicted_energy_level"] == 0.5
+
+    client.put("/chronotype/c-cached", json={"data_points": _payload(level=0.7)["data_points"]})
+    assert client.get("/chronotype/c-cached").json()["data_points"][0]["predicted_energy_level"] == 0.7
+
+    feedback = {**_payload(level=0.2)["data_points"][0], "time_of_day": "21:00:00"}
+    client.post("/chronotype/c-cached/feedback", json={"data_points": [feedback]})
+    assert len(client.get("/chronotype/c-cached").json()["data_points"]) == 2
+
+    client.delete("/chronotype/c-cached")
+    assert client.get("/chronotype/c-cached").status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_submitted_quiz_is_readable_without_a_round_trip(client, mock_supabase_client):
+    response = client.post(
+        "/quiz/submit",
+        json={
+            "user_id": "user-cache",
+            "responses": [{"question_id": 1, "question_text": "Staying up late?", "response_value": "a"}],
+        },
+    )
+    chronotype_id = response.json()["chronotype_id"]
+    mock_supabase_client.table("chronotypes").records.clear()
+
+    cached = client.get(f"/chronotype/{chronotype_id}")
+
+    assert cached.status_code == status.HTTP_200_OK
+    assert len(cached.json()["data_points"]) == 6
+
+
+def test_cache_hits_send_the_stored_body(client, mock_supabase_client):
+    mock_supabase_client.table("chronotypes").insert(_payload()).execute()
+    first = client.get("/chronotype/c-cached")
+    mock_supabase_client.table("chronotypes").records.clear()
+    second = client.get("/chronotype/c-cached")
+
+    assert second.status_code == status.HTTP_200_OK
+    assert second.content == first.content
+    assert first.headers["content-type"] == "application/json"
+    assert first.json()["data_points"][0]["time_of_day"] == "09:00:00"
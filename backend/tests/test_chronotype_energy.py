@@ -0,0 +1,86 @@
+"""
+Tests for energy-at-time queries. Makes use of mocks in /conftest.py.
+"""
+
+from datetime import time
+
+import numpy as np
+import pytest
+from fastapi import status
+
+from backend.services.energy_index import EnergyIndex
+
+
+def _point(hour, level):
+    return {
+        "time_of_day": f"{hour:02d}:00:00",
+        "predicted_energy_level": level,
+        "actual_energy_level": level,
+        "difference_from_actual": 0.0,
+        "context": {},
+    }
+
+
+def _seed(mock_supabase_client, chronotype_id, points):
+    mock_supabase_client.table("chronotypes").insert(
+        {"chronotype_id": chronotype_id, "user_id": "user-energy", "data_points": points}
+    ).execute()
+
+
+def test_index_interpolates_across_midnight():
+    index = EnergyIndex.from_data_points([_point(18, 0.6), _point(6, 0.2), _point(12, 0.8)])
+
+    assert index.at(time(9, 0)) == pytest.approx(0.5)
+    assert index.at(time(0, 0)) == pytest.approx(0.4)
+    assert index.at(12 * 3600, "spline") == pytest.approx(0.8)
+    assert index.between(np.array([9 * 3600, 0.0])).tolist() == pytest.approx([0.5, 0.4])
+
+
+def test_spline_stays_within_neighbouring_values():
+    index = EnergyIndex.from_data_points([_point(6, 0.2), _point(7, 0.9), _point(8, 1.0), _point(20, 0.1)])
+
+    levels = index.between(np.arange(6 * 3600, 8 * 3600, 60.0), "spline")
+
+    assert levels.min() >= 0.2 and levels.max() <= 1.0
+    assert np.all(np.diff(levels) >= 0)
+
+
+def test_energy_at_time(client, mock_supabase_client):
+    _seed(mock_supabase_client, "c-energy", [_point(6, 0.2), _point(12, 0.8)])
+
+    response = client.get("/chronotype/c-energy/energy", params={"t": "09:00"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "chronotype_id": "c-energy",
+        "time_of_day": "09:00:00",
+        "energy_level": pytest.approx(0.5),
+        "method": "linear",
+    }
+
+
+def test_energy_range_wraps_midnight(client, mock_supabase_client):
+    _seed(mock_supabase_client, "c-energy", [_point(6, 0.2), _point(18, 0.8)])
+
+    response = client.get("/chronotype/c-energy/energy", params={"from": "23:00", "to": "01:00", "step": 60})
+
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert body["times"] == ["23:00:00", "00:00:00", "01:00:00"]
+    assert body["energy_levels"] == pytest.approx([0.55, 0.5, 0.45])
+
+
+def test_energy_index_is_rebuilt_after_update(client, mock_supabase_client):
+    _seed(mock_supabase_client, "c-energy", [_point(6, 0.2), _point(12, 0.8)])
+    assert client.get("/chronotype/c-energy/energy", params={"t": "09:00"}).json()["energy_level"] == pytest.approx(0.5)
+
+    client.put("/chronotype/c-energy", json={"data_points": [_point(6, 0.4), _point(12, 0.4)]})
+
+    assert client.get("/chronotype/c-energy/energy", params={"t": "09:00"}).json()["energy_level"] == pytest.approx(0.4)
+
+
+def test_energy_requires_a_time(client, mock_supabase_client):
+    _seed(mock_supabase_client, "c-energy", [_point(6, 0.2)])
+
+    assert client.get("/chronotype/c-energy/energy").status_code == status.HTTP_400_BAD_REQUEST
+    assert client.get("/chronotype/missing/energy", params={"t": "09:00"}).status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,112 @@
+"""
+Tests for ETag / conditional request handling on chronotypes. Makes use of mocks in /conftest.py.
+"""
+
+from fastapi import status
+
+from backend.api import chronotype as chronotype_api
+from backend.models.chronotype import ChronotypeResponse
+from backend.services.chronotype_cache import CachedChronotype
+
+
+def _points(level):
+    return [
+        {
+            "time_of_day": "09:00:00",
+            "predicted_energy_level": level,
+            "actual_energy_level": level,
+            "difference_from_actual": 0.0,
+            "context": {},
+        }
+    ]
+
+
+def _create(client, level=0.5):
+    return client.post(
+        "/chronotype",
+        json={"user_id": "user-etag", "chronotype_id": "c-etag", "data_points": _points(level)},
+    )
+
+
+def test_get_returns_a_content_etag(client):
+    created = _create(client)
+
+    response = client.get("/chronotype/c-etag")
+
+    assert response.headers["ETag"] == created.headers["ETag"]
+    assert response.headers["ETag"] == CachedChronotype.of(ChronotypeResponse(**response.json())).etag
+    assert client.get("/chronotype/c-etag", params={"format": "columnar"}).headers["ETag"] != response.headers["ETag"]
+
+
+def test_if_none_match_returns_304_until_the_chronotype_changes(client):
+    etag = _create(client).headers["ETag"]
+
+    unchanged = client.get("/chronotype/c-etag", headers={"If-None-Match": etag})
+    weak = client.get("/chronotype/c-etag", headers={"If-None-Match": f"W/{etag}"})
+
+    assert unchanged.status_code == weak.status_code == status.HTTP_304_NOT_MODIFIED
+    assert unchanged.content == b""
+    assert unchanged.headers["ETag"] == etag
+
+    client.put("/chronotype/c-etag", json={"data_points": _points(0.8)})
+    changed = client.get("/chronotype/c-etag", headers={"If-None-Match": etag})
+
+    assert changed.status_code == status.HTTP_200_OK
+    assert changed.headers["ETag"] != etag
+
+
+def test_put_with_stale_if_match_is_rejected(client):
+    first = _create(client).headers["ETag"]
+    second = client.put(
+        "/chronotype/c-etag", json={"data_points": _points(0.6)}, headers={"If-Match": first}
+    )
+
+    assert second.status_code == status.HTTP_200_OK
+    assert second.headers["ETag"] != first
+
+    stale = client.put("/chronotype/c-etag", json={"data_points": _points(0.7)}, headers={"If-Match": first})
+
+    assert stale.status_code == status.HTTP_412_PRECONDITION_FAILED
+    assert client.get("/chronotype/c-etag").json()["data_points"][0]["predicted_energy_level"] == 0.6
+
+
+def test_put_if_match_accepts_the_columnar_etag_and_wildcard(client):
+    _create(client)
+    columnar = client.get("/chronotype/c-etag", params={"format": "columnar"}).headers["ETag"]
+
+    assert client.put(
+        "/chronotype/c-etag", json={"data_points": _points(0.3)}, headers={"If-Match": columnar}
+    ).status_code == status.HTTP_200_OK
+    assert client.put(
+        "/chronotype/c-etag", json={"data_points": _points(0.4)}, headers={"If-Match": "*"}
+    ).status_code == status.HTTP_200_OK
+
+
+def test_put_if_match_loses_to_a_write_after_the_check(client, mock_supabase_client, monkeypatch):
+    etag = _create(client).headers["ETag"]
+    load_stored = chronotype_api._load_stored
+
+    async def load_then_race(db, chronotype_id, columns):
+        loaded = await load_stored(db, chronotype_id, columns)
+        # Another worker writes between the ETag check and the update.
+        client.put("/chronotype/c-etag", json={"data_points": _points(0.9)})
+        return loaded
+
+    monkeypatch.setattr(chronotype_api, "_load_stored", load_then_race)
+    raced = client.put("/chronotype/c-etag", json={"data_points": _points(0.1)}, headers={"If-Match": etag})
+
+    assert raced.status_code == status.HTTP_412_PRECONDITION_FAILED
+    assert client.get("/chronotype/c-etag").json()["data_points"][0]["predicted_energy_level"] == 0.9
+
+
+def test_put_if_match_on_a_row_without_a_revision(client, mock_supabase_client):
+    mock_supabase_client.table("chronotypes").insert(
+        {"chronotype_id": "c-legacy", "user_id": "user-etag", "data_points": _points(0.5)}
+    ).execute()
+    etag = client.get("/chronotype/c-legacy").headers["ETag"]
+
+    first = client.put("/chronotype/c-legacy", json={"data_points": _points(0.6)}, headers={"If-Match": etag})
+    again = client.put("/chronotype/c-legacy", json={"data_points": _points(0.7)}, headers={"If-Match": etag})
+
+    assert first.status_code == status.HTTP_200_OK
+    assert again.status_code == status.HTTP_412_PRECONDITION_FAILED
@@ -0,0 +1,105 @@
+"""
+Tests for append-only chronotype feedback ingestion. Makes use of mocks in /conftest.py.
+"""
+
+import pytest
+from fastapi import status
+
+
+def _point(time_of_day, predicted, actual, source):
+    return {
+        "time_of_day": time_of_day,
+        "predicted_energy_level": predicted,
+        "actual_energy_level": actual,
+        "difference_from_actual": round(predicted - actual, 4),
+        "context": {"source": source},
+    }
+
+
+@pytest.fixture
+def seeded_chronotype(mock_supabase_client):
+    chronotype_id = "chronotype-feedback-001"
+    mock_supabase_client.table("chronotypes").insert(
+        {
+            "chronotype_id": chronotype_id,
+            "user_id": "user-feedback-001",
+            "data_points": [_point("08:00:00", 0.6, 0.6, "initial_quiz")],
+        }
+    ).execute()
+    return chronotype_id
+
+
+@pytest.mark.asyncio
+async def test_feedback_is_appended_without_rewriting_data_points(client, mock_supabase_client, seeded_chronotype):
+    first = client.post(
+        f"/chronotype/{seeded_chronotype}/feedback",
+        json={"data_points": [_point("09:00:00", 0.7, 0.9, "higher")]},
+    )
+    second = client.post(
+        f"/chronotype/{seeded_chronotype}/feedback",
+        json={"data_points": [_point("13:00:00", 0.7, 0.4, "lower"), _point("14:00:00", 0.6, 0.5, "lower")]},
+    )
+
+    assert first.status_code == status.HTTP_201_CREATED
+    assert first.json() == {"chronotype_id": seeded_chronotype, "appended": 1}
+    assert second.json()["appended"] == 2
+
+    stored = mock_supabase_client.table("chronotypes").select("*").eq("chronotype_id", seeded_chronotype).execute()
+    assert len(stored.data[0]["data_points"]) == 1
+
+    response = client.get(f"/chronotype/{seeded_chronotype}")
+
+    assert response.status_code == status.HTTP_200_OK
+    sources = [dp["context"]["source"] for dp in response.json()["data_points"]]
+    assert sources == ["initial_quiz", "higher", "lower", "lower"]
+
+
+@pytest.mark.asyncio
+async def test_put_of_combined_view_folds_in_feedback(client, mock_supabase_client, seeded_chronotype):
+    client.post(
+        f"/chronotype/{seeded_chronotype}/feedback",
+        json={"data_points": [_point("09:00:00", 0.7, 0.9, "higher")]},
+    )
+    points = client.get(f"/chronotype/{seeded_chronotype}").json()["data_points"]
+    assert len(points) == 2
+
+    points[0]["actual_energy_level"] = 0.5
+    response = client.put(f"/chronotype/{seeded_chronotype}", json={"data_points": points})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()["data_points"]) == 2
+    assert mock_supabase_client.table("chronotype_feedback").records == {}
+
+    roundtrip = client.get(f"/chronotype/{seeded_chronotype}").json()["data_points"]
+    assert [dp["context"]["source"] for dp in roundtrip] == ["initial_quiz", "higher"]
+    assert roundtrip[0]["actual_energy_level"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_feedback_for_unknown_chronotype_is_404(client):
+    response = client.post(
+        "/chronotype/does-not-exist/feedback",
+        json={"data_points": [_point("09:00:00", 0.7, 0.9, "higher")]},
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_feedback_requires_at_least_one_point(client, seeded_chronotype):
+    response = client.post(f"/chronotype/{seeded_chronotype}/feedback", json={"data_points": []})
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_deleting_chronotype_removes_feedback(client, mock_supabase_client, seeded_chronotype):
+    client.post(
+        f"/chronotype/{seeded_chronotype}/feedback",
+        json={"data_points": [_point("09:00:00", 0.7, 0.9, "higher")]},
+    )
+
+    response = client.delete(f"/chronotype/{seeded_chronotype}")
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert mock_supabase_client.table("chronotype_feedback").records == {}
@@ -0,0 +1,83 @@
+"""
+Tests for chronotype listing and NDJSON export. Makes use of mocks in /conftest.py.
+"""
+
+import json
+
+from fastapi import status
+
+from backend.config import settings
+
+
+def _seed(mock_supabase_client, count=5):
+    for i in range(count):
+        mock_supabase_client.table("chronotypes").insert(
+            {
+                "chronotype_id": f"c-{i:02d}",
+                "user_id": "user-a" if i % 2 == 0 else "user-b",
+                "data_points": [
+                    {
+                        "time_of_day": "09:00:00",
+                        "predicted_energy_level": 0.5,
+                        "actual_energy_level": 0.5,
+                        "difference_from_actual": 0.0,
+                        "context": {},
+                    }
+                ],
+            }
+        ).execute()
+
+
+def test_keyset_pages_cover_every_chronotype_once(client, mock_supabase_client):
+    _seed(mock_supabase_client)
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/chronotype", params=params).json()
+        seen.extend(item["chronotype_id"] for item in body["items"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == [f"c-{i:02d}" for i in range(5)]
+
+
+def test_listing_filters_by_user_and_includes_feedback(client, mock_supabase_client):
+    _seed(mock_supabase_client)
+    client.post(
+        "/chronotype/c-02/feedback",
+        json={
+            "data_points": [
+                {
+                    "time_of_day": "18:00:00",
+                    "predicted_energy_level": 0.4,
+                    "actual_energy_level": 0.6,
+                    "difference_from_actual": -0.2,
+                }
+            ]
+        },
+    )
+
+    response = client.get("/chronotype", params={"user_id": "user-a"})
+
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert [item["chronotype_id"] for item in body["items"]] == ["c-00", "c-02", "c-04"]
+    assert len(body["items"][1]["data_points"]) == 2
+    assert body["next_cursor"] is None
+
+
+def test_export_streams_ndjson_across_pages(client, mock_supabase_client, monkeypatch):
+    _seed(mock_supabase_client)
+    monkeypatch.setattr(settings, "chronotype_export_page_size", 2)
+
+    response = client.get("/chronotype/export")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["chronotype_id"] for line in lines] == [f"c-{i:02d}" for i in range(5)]
+
+    by_user = client.get("/chronotype/export", params={"user_id": "user-b"}).text.splitlines()
+    assert [json.loads(line)["chronotype_id"] for line in by_user] == ["c-01", "c-03"]
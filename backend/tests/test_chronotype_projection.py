@@ -0,0 +1,93 @@
+"""
+Tests for field projection and data point slicing. Makes use of mocks in /conftest.py.
+"""
+
+from datetime import time
+
+import pytest
+from fastapi import status
+
+from backend.services.projection import Projection
+
+
+def _point(hour, level=0.5):
+    return {
+        "time_of_day": f"{hour:02d}:00:00",
+        "predicted_energy_level": level,
+        "actual_energy_level": level,
+        "difference_from_actual": 0.0,
+        "context": {},
+    }
+
+
+def _seed(mock_supabase_client, chronotype_id="c-proj"):
+    mock_supabase_client.table("chronotypes").insert(
+        {
+            "chronotype_id": chronotype_id,
+            "user_id": "user-proj",
+            "data_points": [_point(hour, hour / 24) for hour in (6, 9, 12, 18, 23)],
+        }
+    ).execute()
+
+
+def test_projection_parses_and_slices():
+    assert Projection.parse() is None
+    projection = Projection.parse("data_points, user_id", last=2, start=time(22, 0), end=time(10, 0))
+
+    assert projection.fields == ("user_id", "data_points")
+    assert projection.columns() == "chronotype_id,user_id,data_points"
+    points = [_point(hour) for hour in (6, 9, 12, 23)]
+    assert [p["time_of_day"] for p in projection.slice_points(points)] == ["09:00:00", "23:00:00"]
+
+    with pytest.raises(ValueError, match="Unknown fields: created_at"):
+        Projection.parse("created_at")
+    with pytest.raises(ValueError):
+        Projection.parse(start=time(1, 0))
+
+
+def test_fields_are_pushed_down_to_the_select(client, mock_supabase_client):
+    _seed(mock_supabase_client)
+    selected = []
+    table = mock_supabase_client.table("chronotypes")
+    original = table.select
+
+    def spy(columns="*"):
+        selected.append(columns)
+        return original(columns)
+
+    table.select = spy
+    response = client.get("/chronotype/c-proj", params={"fields": "user_id"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"user_id": "user-proj"}
+    assert selected == ["chronotype_id,user_id"]
+    assert "ETag" not in response.headers
+    assert client.get("/chronotype/missing", params={"fields": "user_id"}).status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_slices_data_points_from_store_and_cache(client, mock_supabase_client):
+    _seed(mock_supabase_client)
+    params = {"fields": "data_points", "points_last": 2}
+
+    uncached = client.get("/chronotype/c-proj", params=params).json()
+    client.get("/chronotype/c-proj")
+    cached = client.get("/chronotype/c-proj", params=params).json()
+
+    assert [p["time_of_day"] for p in uncached["data_points"]] == ["18:00:00", "23:00:00"]
+    assert cached == uncached
+
+    window = client.get("/chronotype/c-proj", params={"points_from": "08:00", "points_to": "12:00"}).json()
+    assert window["chronotype_id"] == "c-proj"
+    assert [p["time_of_day"] for p in window["data_points"]] == ["09:00:00", "12:00:00"]
+
+    columnar = client.get("/chronotype/c-proj", params={**params, "format": "columnar"}).json()
+    assert columnar["data_columns"]["time_of_day"] == ["18:00:00", "23:00:00"]
+
+
+def test_listing_accepts_projection_and_rejects_unknown_fields(client, mock_supabase_client):
+    _seed(mock_supabase_client)
+
+    body = client.get("/chronotype", params={"fields": "user_id"}).json()
+    assert body["items"] == [{"chronotype_id": "c-proj", "user_id": "user-proj"}]
+
+    assert client.get("/chronotype", params={"fields": "secret"}).status_code == status.HTTP_400_BAD_REQUEST
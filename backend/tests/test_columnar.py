@@ -0,0 +1,95 @@
+"""
+Tests for the columnar data point format. Makes use of mocks in /conftest.py.
+"""
+
+import pytest
+from fastapi import status
+
+from backend.api.quiz import create_initial_chronotype_data
+from backend.config import settings
+from backend.models.quiz import ChronotypeResult
+from backend.services.columnar import from_columns, to_columns
+
+
+def _initial_points():
+    result = ChronotypeResult(
+        chronotype_type="Early Bird",
+        confidence_score=0.9,
+        analysis_details={},
+        recommended_sleep_schedule={},
+    )
+    return [dp.model_dump(mode="json") for dp in create_initial_chronotype_data(result).data_points()]
+
+
+def _payload(chronotype_id="c-columnar"):
+    return {"user_id": "user-columnar", "chronotype_id": chronotype_id, "data_points": _initial_points()}
+
+
+def test_round_trip_is_lossless_and_dedupes_context():
+    points = _initial_points()
+    points[2]["context"] = {"source": "feedback"}
+
+    columns = to_columns(points)
+
+    assert columns["context_table"] == [
+        {"source": "initial_quiz", "chronotype": "Early Bird"},
+        {"source": "feedback"},
+    ]
+    assert columns["context"] == [0, 0, 1, 0, 0, 0]
+    assert from_columns(columns) == points
+
+
+def test_malformed_columns_are_rejected():
+    columns = to_columns(_initial_points())
+    columns["actual_energy_level"].pop()
+
+    with pytest.raises(ValueError):
+        from_columns(columns)
+
+
+def test_get_columnar_includes_appended_feedback(client):
+    client.post("/chronotype", json=_payload())
+    feedback = {**_initial_points()[0], "time_of_day": "22:00:00", "context": {"source": "feedback"}}
+    client.post("/chronotype/c-columnar/feedback", json={"data_points": [feedback]})
+
+    response = client.get("/chronotype/c-columnar", params={"format": "columnar"})
+
+    assert response.status_code == status.HTTP_200_OK
+    columns = response.json()["data_columns"]
+    assert columns["time_of_day"][-1] == "22:00:00"
+    assert len(columns["context_table"]) == 2
+    assert from_columns(columns) == client.get("/chronotype/c-columnar").json()["data_points"]
+
+
+@pytest.fixture
+def columnar_storage(monkeypatch):
+    monkeypatch.setattr(settings, "data_points_format", "columnar")
+
+
+def test_columnar_storage_is_transparent_to_row_readers(client, mock_supabase_client, columnar_storage):
+    created = client.post("/chronotype", json=_payload())
+
+    assert created.status_code == status.HTTP_201_CREATED
+    stored = next(iter(mock_supabase_client.table("chronotypes").records.values()))
+    assert isinstance(stored["data_points"], dict)
+    assert created.json()["data_points"] == _initial_points()
+    assert client.get("/chronotype/c-columnar").json()["data_points"] == _initial_points()
+
+
+def test_update_accepts_data_columns(client, columnar_storage):
+    client.post("/chronotype", json=_payload())
+    points = _initial_points()[:2]
+
+    response = client.put("/chronotype/c-columnar", json={"data_columns": to_columns(points)})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["data_points"] == points
+
+
+def test_update_rejects_rows_and_columns_together(client):
+    client.post("/chronotype", json=_payload())
+    points = _initial_points()
+
+    response = client.put("/chronotype/c-columnar", json={"data_points": points, "data_columns": to_columns(points)})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,61 @@
+"""
+Tests for the upstream admission limiter in services/concurrency.py.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from backend.services.concurrency import ConcurrencyLimiter, LimiterRejected
+
+
+async def _call(limiter: ConcurrencyLimiter, duration: float) -> str:
+    try:
+        async with limiter.slot():
+            await asyncio.sleep(duration)
+        return "ok"
+    except LimiterRejected as exc:
+        return exc.reason
+
+
+@pytest.mark.asyncio
+async def test_sheds_load_beyond_queue_capacity():
+    limiter = ConcurrencyLimiter(max_concurrent=2, max_queue=2, queue_timeout=5.0)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(_call(limiter, 0.05) for _ in range(10)))
+
+    assert results.count("ok") == 4
+    assert results.count("queue full") == 6
+    assert time.perf_counter() - started < 0.5
+
+    stats = limiter.stats()
+    assert stats["admitted"] == 4
+    assert stats["rejected_queue_full"] == 6
+    assert stats["max_queue_depth"] == 2
+    assert stats["in_flight"] == 0
+    assert stats["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_rejects_waiters_past_deadline():
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_queue=10, queue_timeout=0.05)
+
+    results = await asyncio.gather(_call(limiter, 0.3), _call(limiter, 0.0))
+
+    assert results == ["ok", "queue deadline exceeded"]
+    stats = limiter.stats()
+    assert stats["rejected_timeout"] == 1
+    assert stats["wait_seconds"]["max"] >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_retry_after_is_at_least_one_second():
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_queue=0, queue_timeout=1.0)
+
+    async with limiter.slot():
+        with pytest.raises(LimiterRejected) as excinfo:
+            await limiter.acquire()
+
+    assert excinfo.value.retry_after >= 1
@@ -0,0 +1,178 @@
+"""
+Tests for the Gemini chat endpoints. The upstream client is replaced with a fake wrapper.
+"""
+
+import json
+
+import pytest
+from fastapi import status
+
+from backend.api.gemini import stream_chat_with_gemini
+from backend.models.gemini import ChatRequest
+from backend.services.cache import CachedSingleFlight
+from backend.services.concurrency import LimiterRejected
+from backend.services.gemini_wrapper import GeminiWrapper, insight_prompt
+
+
+class FakeGeminiWrapper:
+    def __init__(self, chunks=None, fail_after=None):
+        self.chunks = chunks or ["Sleep ", "earlier ", "tonight."]
+        self.fail_after = fail_after
+        self.calls = []
+        self.closed = False
+
+    async def chat_async(self, message, model="gemini-2.5-flash", context=None):
+        self.calls.append((insight_prompt(message, context), model))
+        return "".join(self.chunks)
+
+    async def stream_content(self, prompt, model="gemini-2.5-flash"):
+        self.calls.append((prompt, model))
+        try:
+            for index, chunk in enumerate(self.chunks):
+                if self.fail_after is not None and index == self.fail_after:
+                    raise Exception("upstream went away")
+                yield chunk
+        finally:
+            self.closed = True
+
+
+def _parse_sse(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        event = {"event": "message"}
+        for line in block.splitlines():
+            field, _, value = line.partition(": ")
+            event[field] = value
+        event["data"] = json.loads(event["data"])
+        events.append(event)
+    return events
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    fake = FakeGeminiWrapper()
+    monkeypatch.setattr("backend.api.gemini.gemini", fake)
+    return fake
+
+
+@pytest.mark.asyncio
+async def test_chat_uses_async_client(client, fake_gemini):
+    response = client.post("/gemini/chat", json={"message": "How do I sleep better?"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"response": "Sleep earlier tonight.", "success": True}
+    assert fake_gemini.calls == [("How do I sleep better?", "gemini-2.5-flash")]
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_sends_chunks_as_sse(client, fake_gemini):
+    response = client.post("/gemini/chat/stream", json={"message": "How do I sleep better?"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = _parse_sse(response.text)
+    assert [e["data"]["text"] for e in events[:-1]] == fake_gemini.chunks
+    assert events[-1]["event"] == "done"
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_reports_upstream_errors(client, monkeypatch):
+    monkeypatch.setattr("backend.api.gemini.gemini", FakeGeminiWrapper(fail_after=1))
+
+    response = client.post("/gemini/chat/stream", json={"message": "hello"})
+
+    events = _parse_sse(response.text)
+    assert events[0]["data"]["text"] == "Sleep "
+    assert events[-1]["event"] == "error"
+    assert "upstream went away" in events[-1]["data"]["detail"]
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_closes_upstream_when_client_disconnects(fake_gemini):
+    response = await stream_chat_with_gemini(ChatRequest(message="hello"), db=None, cache=None)
+    events = response.body_iterator
+
+    assert "Sleep " in await events.__anext__()
+    await events.aclose()
+
+    assert fake_gemini.closed is True
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_closes_upstream_when_client_leaves_before_the_body(fake_gemini):
+    response = await stream_chat_with_gemini(ChatRequest(message="hello"), db=None, cache=None)
+    scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        raise OSError("client went away")
+
+    with pytest.raises(Exception):
+        await response(scope, receive, send)
+
+    assert fake_gemini.closed is True
+
+
+@pytest.mark.asyncio
+async def test_wrapper_caches_normalized_prompts(monkeypatch):
+    wrapper = GeminiWrapper(api_key="test-key")
+    upstream_calls = []
+
+    async def fake_generate(prompt, model="gemini-2.5-flash"):
+        upstream_calls.append(prompt)
+        return f"answer to {prompt}"
+
+    monkeypatch.setattr(wrapper, "generate_content_async", fake_generate)
+
+    first = await wrapper.chat_async("What should I do to improve my energy levels?")
+    second = await wrapper.chat_async("  What should I do to   improve my energy levels?\n")
+    other_model = await wrapper.chat_async("What should I do to improve my energy levels?", "gemini-2.5-pro")
+
+    assert first == second
+    assert other_model == first
+    assert len(upstream_calls) == 2
+    assert wrapper.cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_stats_endpoint(client, fake_gemini):
+    fake_gemini.cache = CachedSingleFlight(maxsize=8, ttl_seconds=60)
+
+    response = client.get("/gemini/cache/stats")
+
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert body["maxsize"] == 8
+    assert {"hits", "misses", "hit_ratio", "singleflight"} <= body.keys()
+
+
+class RejectingGeminiWrapper(FakeGeminiWrapper):
+    async def chat_async(self, message, model="gemini-2.5-flash", context=None):
+        raise LimiterRejected("queue full", retry_after=3)
+
+    async def stream_content(self, prompt, model="gemini-2.5-flash"):
+        raise LimiterRejected("queue deadline exceeded", retry_after=2)
+        yield  # pragma: no cover - makes this an async generator
+
+
+@pytest.mark.asyncio
+async def test_chat_returns_503_with_retry_after_when_overloaded(client, monkeypatch):
+    monkeypatch.setattr("backend.api.gemini.gemini", RejectingGeminiWrapper())
+
+    response = client.post("/gemini/chat", json={"message": "hello"})
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["retry-after"] == "3"
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_returns_503_before_streaming_when_overloaded(client, monkeypatch):
+    monkeypatch.setattr("backend.api.gemini.gemini", RejectingGeminiWrapper())
+
+    response = client.post("/gemini/chat/stream", json={"message": "hello"})
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["retry-after"] == "2"
@@ -0,0 +1,101 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import status
+
+from api.main import app
+from backend import dependencies
+from backend.dependencies import get_connection_warmer
+from backend.services import gemini_wrapper
+from backend.services.http_pool import ConnectionWarmer
+
+
+def test_warmer_is_ready_once_every_probe_answers():
+    attempts = []
+
+    async def flaky():
+        attempts.append(len(attempts))
+        if len(attempts) <= 2:
+            raise httpx.ConnectError("connection refused")
+
+    async def steady():
+        return None
+
+    warmer = ConnectionWarmer(connections=2)
+    warmer.add("supabase", steady)
+    warmer.add("gemini", flaky)
+    warmer.skip("cache", "not used")
+
+    assert asyncio.run(warmer.warm()) is False
+    checks = warmer.status()["checks"]
+    assert warmer.ready is False
+    assert checks["supabase"]["ok"] and checks["supabase"]["connections"] == 2
+    assert not checks["gemini"]["ok"] and "ConnectError" in checks["gemini"]["error"]
+
+    assert asyncio.run(warmer.warm()) is True
+    assert warmer.ready is True
+    assert warmer.status()["checks"]["cache"] == {"ok": True, "skipped": "not used"}
+
+
+def test_ready_endpoint_reflects_warmup(client):
+    warmer = ConnectionWarmer()
+
+    async def probe():
+        return None
+
+    warmer.add("supabase", probe)
+    app.dependency_overrides[get_connection_warmer] = lambda: warmer
+
+    assert client.get("/ready").status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    asyncio.run(warmer.start())
+    response = client.get("/ready")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["ready"] is True
+
+
+def test_supabase_runs_on_the_shared_pool(monkeypatch):
+    requests = []
+
+    def handler(request):
+        requests.append((request.method, str(request.url), request.headers.get("apikey")))
+        return httpx.Response(200, json=[])
+
+    monkeypatch.setattr(dependencies.settings, "supabase_backend", "remote")
+    monkeypatch.setattr(dependencies.settings, "supabase_url", "https://project.supabase.co")
+    monkeypatch.setattr(dependencies, "sync_client", lambda: httpx.Client(transport=httpx.MockTransport(handler)))
+    dependencies._get_supabase_http.cache_clear()
+    dependencies._get_supabase_client.cache_clear()
+    try:
+        asyncio.run(dependencies._ping_supabase())
+        dependencies._get_supabase_client().table("chronotypes").select("chronotype_id").execute()
+    finally:
+        asyncio.run(dependencies.close_connection_pools())
+
+    key = dependencies.settings.supabase_anon_key
+    assert requests == [
+        ("HEAD", "https://project.supabase.co/rest/v1/", key),
+        ("GET", "https://project.supabase.co/rest/v1/chronotypes?select=chronotype_id", key),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_gemini_runs_on_the_shared_pool(monkeypatch):
+    requests = []
+
+    def handler(request):
+        requests.append((request.method, request.url.host))
+        if request.method == "HEAD":
+            return httpx.Response(404)
+        return httpx.Response(200, json={"candidates": [{"content": {"role": "model", "parts": [{"text": "Rest"}]}}]})
+
+    monkeypatch.setattr(gemini_wrapper, "async_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    wrapper = gemini_wrapper.GeminiWrapper(api_key="test-key")
+
+    await wrapper.warm_up()
+    answer = await wrapper.generate_content_async("How do I recover?")
+    await wrapper.aclose()
+
+    assert answer == "Rest"
+    assert requests == [("HEAD", "generativelanguage.googleapis.com"), ("POST", "generativelanguage.googleapis.com")]
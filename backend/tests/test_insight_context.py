@@ -0,0 +1,119 @@
+"""
+Tests for the compact chronotype summaries behind grounded Gemini prompts.
+"""
+
+from datetime import time
+
+import pytest
+from fastapi import status
+
+from backend.models.chronotype import ChronotypeDataPoint, ChronotypeResponse
+from backend.models.quiz import ChronotypeResult
+from backend.services.baseline_curves import baseline_curve
+from backend.services.gemini_wrapper import insight_prompt
+from backend.services.insight_context import MAX_CONTEXT_CHARS, build_insight_context
+
+RESULT = ChronotypeResult(
+    chronotype_type="Early Bird",
+    confidence_score=0.82,
+    analysis_details={"morning_alertness": 4.5, "preferred_wake_time": "6:00 AM", "rubric_version": "v1"},
+    recommended_sleep_schedule={"bedtime": "10:00 PM - 11:00 PM", "wake_time": "6:00 AM - 7:00 AM"},
+)
+
+
+class PromptRecorder:
+    def __init__(self):
+        self.prompts = []
+
+    async def chat_async(self, message, model="gemini-2.5-flash", context=None):
+        self.prompts.append(insight_prompt(message, context))
+        return "Train mid-morning."
+
+
+def _logged(count, bias, start=0):
+    return [
+        ChronotypeDataPoint(
+            time_of_day=time((start + i) % 24, 0),
+            predicted_energy_level=0.5,
+            actual_energy_level=0.5 + bias,
+            difference_from_actual=-bias,
+            context={"source": "feedback"},
+        )
+        for i in range(count)
+    ]
+
+
+def _chronotype(points):
+    baseline = baseline_curve("Early Bird").data_points()
+    return ChronotypeResponse(user_id="user-insight", chronotype_id="chrono-insight", data_points=baseline + points)
+
+
+def test_context_summarises_windows_and_trend():
+    context = build_insight_context(_chronotype(_logged(20, -0.1) + _logged(20, 0.1)), RESULT)
+
+    assert context.chronotype_type == "Early Bird"
+    assert context.peaks and context.troughs
+    assert context.peaks[0].level > context.troughs[0].level
+    assert context.observations == 40
+    assert context.recent_bias == pytest.approx(0.1)
+    assert context.trend == "rising"
+    assert "Peak energy:" in context.text
+    assert "bedtime 10:00 PM - 11:00 PM" in context.text
+    assert "rubric_version" not in context.text
+
+
+def test_baseline_points_are_not_observations():
+    context = build_insight_context(_chronotype([]))
+
+    assert context.observations == 0
+    assert context.trend is None
+    assert "Logged energy: none yet" in context.text
+
+
+def test_context_size_stays_flat_as_history_grows():
+    small = build_insight_context(_chronotype(_logged(50, 0.05)), RESULT)
+    large = build_insight_context(_chronotype(_logged(5000, 0.05)), RESULT)
+
+    assert large.observations == 5000
+    assert len(large.text) <= MAX_CONTEXT_CHARS
+    assert abs(len(large.text) - len(small.text)) <= 5
+
+
+def test_chat_is_grounded_in_cached_insight_context(client, mock_supabase_client, monkeypatch):
+    gemini = PromptRecorder()
+    monkeypatch.setattr("backend.api.gemini.gemini", gemini)
+    points = [p.model_dump(mode="json") for p in _chronotype(_logged(3, 0.2)).data_points]
+    mock_supabase_client.table("chronotypes").insert(
+        {"chronotype_id": "chrono-insight", "user_id": "user-insight", "data_points": points}
+    ).execute()
+    mock_supabase_client.table("quiz_submissions").insert(
+        {
+            "quiz_id": "quiz-insight",
+            "chronotype_id": "chrono-insight",
+            "chronotype_result": RESULT.model_dump(),
+            "submitted_at": "2026-01-01T08:00:00",
+        }
+    ).execute()
+    question = {"message": "When should I work out?", "chronotype_id": "chrono-insight"}
+
+    assert client.post("/gemini/chat", json=question).status_code == status.HTTP_200_OK
+    assert client.post("/gemini/chat", json=question).status_code == status.HTTP_200_OK
+
+    prompt = gemini.prompts[0]
+    assert "Chronotype: Early Bird (confidence 82%)" in prompt
+    assert "last 3 of 3 check-ins averaged 0.20 above prediction" in prompt
+    assert prompt.endswith("User question: When should I work out?")
+    assert client.get("/chronotype/cache/stats").json()["insight_contexts"]["hits"] == 1
+
+    client.post("/chronotype/chrono-insight/feedback", json={"data_points": [p.model_dump(mode="json") for p in _logged(1, -0.3)]})
+    client.post("/gemini/chat", json=question)
+
+    assert "last 4 of 4 check-ins" in gemini.prompts[-1]
+
+
+def test_chat_with_unknown_chronotype_is_404(client, monkeypatch):
+    monkeypatch.setattr("backend.api.gemini.gemini", PromptRecorder())
+
+    response = client.post("/gemini/chat", json={"message": "Hi", "chronotype_id": "missing"})
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+from backend import dependencies
+from backend.config import Settings
+from backend.services.memory_db import MemoryClient
+
+
+def _seed(table, count=6):
+    table.insert(
+        [{"id": f"row-{i}", "user_id": f"user-{i % 2}", "score": i, "points": [{"level": i}]} for i in range(count)]
+    ).execute()
+
+
+def test_filters_ordering_and_paging():
+    table = MemoryClient().table("items")
+    _seed(table)
+    table.insert({"id": "row-null", "user_id": "user-0"}).execute()
+
+    rows = table.select("id,score").eq("user_id", "user-0").order("score", desc=True).range(1, 2).execute().data
+    assert rows == [{"id": "row-4", "score": 4}, {"id": "row-2", "score": 2}]
+
+    ascending = table.select("id").eq("user_id", "user-0").order("score").execute().data
+    assert [row["id"] for row in ascending] == ["row-0", "row-2", "row-4", "row-null"]
+
+    picked = table.select("id").in_("id", ["row-5", "row-1", "missing"]).gte("score", 3).limit(5).execute().data
+    assert picked == [{"id": "row-5"}]
+    assert table.select("id").neq("score", 0).lt("score", 2).execute().data == [{"id": "row-1"}]
+
+
+def test_indexes_follow_updates_and_deletes():
+    table = MemoryClient().table("items")
+    _seed(table)
+    assert len(table.select("*").eq("user_id", "user-1").execute().data) == 3
+
+    table.update({"user_id": "user-9"}).eq("id", "row-1").execute()
+    table.delete().eq("user_id", "user-1").lte("score", 3).execute()
+
+    assert [row["id"] for row in table.select("id").eq("user_id", "user-1").execute().data] == ["row-5"]
+    assert [row["id"] for row in table.select("id").eq("user_id", "user-9").execute().data] == ["row-1"]
+    assert "row-3" not in table.records
+
+
+def test_keyset_pages_walk_a_sorted_index():
+    table = MemoryClient().table("items")
+    table.insert([{"id": f"row-{i}", "rank": (i * 7) % 10} for i in range(10)]).execute()
+    table.insert({"id": "row-null"}).execute()
+
+    def page(after=None, desc=False, limit=3):
+        query = table.select("rank").order("rank", desc=desc).limit(limit)
+        if after is not None:
+            query = query.lt("rank", after) if desc else query.gt("rank", after)
+        return [row["rank"] for row in query.execute().data]
+
+    assert page() == [0, 1, 2]
+    assert page(after=2) == [3, 4, 5]
+    assert page(after=8) == [9]
+    assert page(desc=True) == [None, 9, 8]
+    assert page(after=2, desc=True) == [1, 0]
+    assert "rank" in table._sorted
+
+    table.update({"rank": 42}).eq("id", "row-0").execute()
+    table.delete().eq("id", "row-1").execute()
+    table.insert({"id": "row-new", "rank": 3}).execute()
+    assert page(after=2, limit=4) == [3, 3, 4, 5]
+    assert page(after=8) == [9, 42]
+
+
+def test_rows_are_copy_on_write():
+    table = MemoryClient().table("items")
+    payload = {"id": "row-1", "user_id": "user-1", "points": [{"level": 1}]}
+    table.insert(payload).execute()
+    payload["points"].append({"level": 2})
+
+    before = table.select("*").eq("id", "row-1").execute().data[0]
+    before["user_id"] = "changed locally"
+    table.update({"points": []}).eq("id", "row-1").execute()
+
+    assert before["points"] == [{"level": 1}]
+    assert table.records["row-1"] == {"id": "row-1", "user_id": "user-1", "points": []}
+
+
+def test_upsert_and_duplicate_inserts():
+    table = MemoryClient().table("items")
+    table.insert({"chronotype_id": "c-1", "user_id": "user-1", "score": 1}).execute()
+
+    table.upsert(
+        [{"chronotype_id": "c-1", "score": 5}, {"chronotype_id": "c-2", "user_id": "user-2", "score": 2}],
+        on_conflict="chronotype_id",
+    ).execute()
+
+    rows = table.select("chronotype_id,user_id,score").order("chronotype_id").execute().data
+    assert rows == [
+        {"chronotype_id": "c-1", "user_id": "user-1", "score": 5},
+        {"chronotype_id": "c-2", "user_id": "user-2", "score": 2},
+    ]
+    existing_id = next(iter(table.records))
+    with pytest.raises(ValueError, match="duplicate key"):
+        table.insert([{"id": "fresh"}, {"id": existing_id}]).execute()
+    assert "fresh" not in table.records
+
+
+def test_memory_backend_is_selected_by_config(monkeypatch):
+    monkeypatch.setattr(dependencies.settings, "supabase_backend", "memory")
+    dependencies._get_supabase_client.cache_clear()
+    try:
+        client = asyncio.run(dependencies.get_supabase())
+        assert isinstance(client, MemoryClient)
+        assert asyncio.run(dependencies.get_supabase()) is client
+    finally:
+        dependencies._get_supabase_client.cache_clear()
+
+
+def test_only_the_remote_backend_needs_supabase_credentials(monkeypatch):
+    monkeypatch.delenv("SUPABASE_URL", raising=False)
+    monkeypatch.delenv("SUPABASE_ANON_KEY", raising=False)
+    assert Settings(_env_file=None).supabase_url == ""
+
+    monkeypatch.setattr(dependencies.settings, "supabase_url", "")
+    monkeypatch.setattr(dependencies.settings, "supabase_backend", "memory")
+    dependencies._get_supabase_client.cache_clear()
+    try:
+        assert isinstance(asyncio.run(dependencies.get_supabase()), MemoryClient)
+        dependencies._get_supabase_client.cache_clear()
+        monkeypatch.setattr(dependencies.settings, "supabase_backend", "remote")
+        with pytest.raises(ValueError, match="SUPABASE_URL"):
+            asyncio.run(dependencies.get_supabase())
+    finally:
+        dependencies._get_supabase_client.cache_clear()
@@ -0,0 +1,48 @@
+"""
+Tests for the Prometheus metrics endpoint. Makes use of mocks in /conftest.py.
+"""
+
+import pytest
+from fastapi import status
+
+from backend.services.metrics import DB_LATENCY, HTTP_REQUESTS, Counter, Histogram, Registry, track
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    latency = registry.register(Histogram("op_seconds", "Op latency.", ("op",), buckets=(0.1, 1.0)))
+    errors = registry.register(Counter("op_errors_total", "Op errors.", ("op",)))
+    latency.observe(0.05, "read")
+    latency.observe(0.5, "read")
+    with pytest.raises(RuntimeError):
+        with track(latency, errors, 'write "x"'):
+            raise RuntimeError("boom")
+
+    text = registry.render()
+
+    assert "# TYPE op_seconds histogram" in text
+    assert 'op_seconds_bucket{op="read",le="0.1"} 1' in text
+    assert 'op_seconds_bucket{op="read",le="1"} 2' in text
+    assert 'op_seconds_bucket{op="read",le="+Inf"} 2' in text
+    assert 'op_seconds_count{op="read"} 2' in text
+    assert 'op_errors_total{op="write \\"x\\""} 1' in text
+
+
+def test_requests_are_labelled_by_route_template(client, mock_supabase_client):
+    route = "/chronotype/{chronotype_id}"
+    before = HTTP_REQUESTS.value("GET", route, "404")
+    queries_before = DB_LATENCY.count("chronotypes", "select")
+
+    client.get("/chronotype/missing-1")
+    client.get("/chronotype/missing-2")
+    client.get("/no/such/path")
+
+    assert HTTP_REQUESTS.value("GET", route, "404") == before + 2
+    assert DB_LATENCY.count("chronotypes", "select") == queries_before + 2
+
+    response = client.get("/metrics")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_requests_total{method="GET",route="/chronotype/{chronotype_id}",status="404"}' in response.text
+    assert 'route="unmatched"' in response.text
+    assert 'supabase_query_duration_seconds_count{table="chronotypes",operation="select"}' in response.text
@@ -0,0 +1,51 @@
+"""
+Tests for on-demand request profiling.
+"""
+
+import pstats
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.config import settings
+from backend.services.profiling import ProfilingMiddleware
+
+
+def _app(**options):
+    app = FastAPI()
+
+    @app.get("/work/{n}")
+    async def work(n: int):
+        return {"total": sum(range(n))}
+
+    app.add_middleware(ProfilingMiddleware, **options)
+    return app
+
+
+def test_only_requests_with_the_header_are_profiled(tmp_path):
+    client = TestClient(_app(directory=str(tmp_path), enabled=True))
+
+    plain = client.get("/work/10")
+    assert "x-profile-file" not in plain.headers
+    assert list(tmp_path.iterdir()) == []
+
+    profiled = client.get("/work/1000", headers={"X-Profile": "1"})
+    assert profiled.json() == {"total": 499500}
+    dump = tmp_path / profiled.headers["x-profile-file"]
+    assert dump.name.endswith(".prof") and "work_1000" in dump.name
+
+    functions = {name for _, _, name in pstats.Stats(str(dump)).stats}
+    assert "work" in functions
+
+
+def test_settings_are_read_on_the_first_request(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "profiling_enabled", False)
+    client = TestClient(_app())
+
+    monkeypatch.setattr(settings, "profiling_enabled", True)
+    monkeypatch.setattr(settings, "profiling_dir", str(tmp_path))
+    profiled = client.get("/work/10", headers={"X-Profile": "1"})
+    assert (tmp_path / profiled.headers["x-profile-file"]).exists()
+
+    monkeypatch.setattr(settings, "profiling_enabled", False)
+    assert "x-profile-file" in client.get("/work/10", headers={"X-Profile": "1"}).headers
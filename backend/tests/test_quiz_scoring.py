@@ -0,0 +1,126 @@
+"""
+Tests for table-driven quiz scoring and baseline curves. Makes use of mocks in /conftest.py.
+"""
+
+import random
+from datetime import time
+
+import pytest
+from fastapi import status
+from pydantic import ValidationError
+
+from backend.services.baseline_curves import baseline_curve
+from backend.services.quiz_scoring import RUBRICS, get_rubric
+
+
+def _answers(*pairs):
+    return [
+        {"question_id": question_id, "question_text": f"Question {question_id}", "response_value": value}
+        for question_id, value in pairs
+    ]
+
+
+def test_score_classifies_and_reports_details():
+    rubric = get_rubric("v1")
+
+    early = rubric.score(_answers((0, "start"), (2, "5am"), (3, "9pm"), (5, "8am-test")))
+    assert early.chronotype_type == "Early Bird"
+    assert early.confidence_score == pytest.approx(1.0)
+    assert early.analysis_details["preferred_wake_time"] == "5am"
+    assert early.analysis_details["total_questions"] == 3
+    assert early.analysis_details["rubric_version"] == "v1"
+
+    night = rubric.score(_answers((2, "10am"), (3, "1am")))
+    assert night.chronotype_type == "Night Owl"
+    assert night.recommended_sleep_schedule["wake_time"] == "7:00 AM - 8:00 AM"
+
+    intermediate = rubric.score(_answers((1, "neither"), (9, "unknown")))
+    assert intermediate.chronotype_type == "Intermediate"
+    assert intermediate.analysis_details["total_questions"] == 2
+    assert intermediate.confidence_score == 0.0
+
+
+def test_score_rejects_submission_without_counted_questions():
+    with pytest.raises(ValueError, match="No valid questions answered"):
+        get_rubric().score(_answers((0, "start")))
+
+
+def test_batch_matches_scalar_scoring():
+    rubric = get_rubric("v1")
+    values = [answer for question in RUBRICS["v1"]["questions"].values() for answer in question["answers"]]
+    rng = random.Random(7)
+    submissions = [
+        _answers(*((rng.randint(0, 9), rng.choice(values + ["junk"])) for _ in range(rng.randint(0, 9))))
+        for _ in range(500)
+    ]
+
+    for answers, batched in zip(submissions, rubric.score_batch(submissions)):
+        try:
+            expected = rubric.score(answers)
+        except ValueError as exc:
+            assert isinstance(batched, ValueError) and str(batched) == str(exc)
+            continue
+        assert batched.model_dump() == expected.model_dump()
+
+
+def test_score_batch_endpoint(client):
+    response = client.post(
+        "/quiz/score/batch",
+        json={
+            "submissions": [
+                {"user_id": "user-a", "responses": _answers((2, "5am"), (3, "8pm"))},
+                {"user_id": "user-b", "responses": _answers((0, "start"))},
+            ]
+        },
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert body["rubric_version"] == "v1"
+    assert (body["scored"], body["failed"]) == (1, 1)
+    assert body["results"][0]["chronotype_result"]["chronotype_type"] == "Early Bird"
+    assert body["results"][1]["error"] == "No valid questions answered"
+
+
+def test_score_batch_rejects_unknown_rubric(client):
+    response = client.post("/quiz/score/batch", json={"submissions": [], "rubric_version": "v0"})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_baseline_curve_is_memoized_and_passes_through_anchors():
+    coarse = baseline_curve("Early Bird")
+    fine = baseline_curve("Early Bird", 15)
+
+    assert baseline_curve("Early Bird", 15) is fine
+    assert [point.predicted_energy_level for point in coarse.points] == [0.8, 0.9, 0.7, 0.6, 0.4, 0.2]
+    assert len(fine.points) == 15 * 4 + 1
+    assert fine.points[2].time_of_day == time(6, 30)
+    assert fine.points[2].predicted_energy_level == pytest.approx(0.8167, abs=1e-4)
+    assert set(coarse.seconds.tolist()) <= set(fine.seconds.tolist())
+    assert not fine.levels.flags.writeable
+
+
+def test_baseline_points_are_frozen_and_unknown_types_rejected():
+    point = baseline_curve("Night Owl").data_points()[0]
+
+    with pytest.raises(ValidationError):
+        point.actual_energy_level = 0.1
+    with pytest.raises(TypeError):
+        point.context["source"] = "edited"
+    assert baseline_curve("Night Owl").rows()[0]["context"] == {"source": "initial_quiz", "chronotype": "Night Owl"}
+    with pytest.raises(ValueError):
+        baseline_curve("Morning Lark")
+
+
+def test_baseline_endpoint(client):
+    response = client.get("/quiz/baseline", params={"chronotype_type": "Night Owl", "resolution_minutes": 60})
+
+    assert response.status_code == status.HTTP_200_OK
+    points = response.json()["data_points"]
+    assert len(points) == 16
+    assert points[0]["time_of_day"] == "06:00:00"
+    assert points[-1]["predicted_energy_level"] == 0.9
+
+    unknown = client.get("/quiz/baseline", params={"chronotype_type": "Morning Lark"})
+    assert unknown.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,88 @@
+"""
+Tests for the NumPy chronotype energy model in services/rl_engine.py.
+"""
+
+import numpy as np
+import pytest
+
+from backend.services.rl_engine import ChronotypeRLEngine
+
+
+def _chronotype(points):
+    return {
+        "chronotype_id": "chronotype-engine",
+        "user_id": "user-engine",
+        "data_points": [
+            {
+                "time_of_day": f"{hour:02d}:00:00",
+                "predicted_energy_level": level,
+                "actual_energy_level": level,
+                "difference_from_actual": 0.0,
+                "context": {"source": "initial_quiz"},
+            }
+            for hour, level in points
+        ],
+    }
+
+
+BASELINE = [(6, 0.4), (9, 0.7), (12, 0.8), (15, 0.7), (18, 0.5), (21, 0.3)]
+
+
+def test_feedback_pulls_prediction_towards_observed_energy():
+    engine = ChronotypeRLEngine()
+    feedback = [
+        {"time_of_day": "21:00:00", "actual_energy_level": 0.9, "context": {"note": "wide awake"}}
+        for _ in range(20)
+    ]
+
+    result = engine.train_and_predict(_chronotype(BASELINE), feedback, {"max_epochs": 200, "learning_rate": 0.05})
+
+    points = result["chronotype"]["data_points"]
+    assert len(points) == len(BASELINE) + len(feedback)
+    evening = points[-1]
+    assert evening["predicted_energy_level"] > 0.3
+    assert evening["difference_from_actual"] == pytest.approx(evening["predicted_energy_level"] - 0.9)
+    assert evening["context"] == {"note": "wide awake"}
+    assert all(0.0 <= p["predicted_energy_level"] <= 1.0 for p in points)
+
+
+def test_training_honours_config_and_reports_metadata():
+    engine = ChronotypeRLEngine()
+    feedback = [{"time_of_day": "07:30:00", "actual_energy_level": 0.1}]
+
+    metadata = engine.train_and_predict(
+        _chronotype(BASELINE), feedback, {"max_epochs": 3, "learning_rate": 0.01, "batch_size": 2}
+    )["training_metadata"]
+
+    assert metadata["epochs"] <= 3
+    assert metadata["batches_per_epoch"] == 4
+    assert metadata["samples"] == 7
+    assert metadata["feedback_samples"] == 1
+    assert metadata["loss"] <= metadata["initial_loss"]
+    assert 0.0 <= metadata["reward"] <= 1.0
+    assert metadata["training_time_seconds"] >= 0.0
+
+
+def test_retrain_on_thousands_of_points_fits_the_signal():
+    rng = np.random.default_rng(7)
+    seconds = rng.integers(0, 86400, size=3000)
+    truth = 0.5 + 0.3 * np.sin(2 * np.pi * seconds / 86400)
+    feedback = [
+        {
+            "time_of_day": f"{s // 3600:02d}:{(s // 60) % 60:02d}:{s % 60:02d}",
+            "actual_energy_level": float(np.clip(level + rng.normal(0, 0.02), 0, 1)),
+        }
+        for s, level in zip(seconds.tolist(), truth.tolist())
+    ]
+
+    metadata = ChronotypeRLEngine().train_and_predict(_chronotype(BASELINE), feedback, {})["training_metadata"]
+
+    assert metadata["loss"] < metadata["initial_loss"] / 5
+    assert metadata["reward"] > 0.9
+
+
+def test_empty_chronotype_is_returned_unchanged():
+    result = ChronotypeRLEngine().train_and_predict(_chronotype([]), [], {})
+
+    assert result["chronotype"]["data_points"] == []
+    assert result["training_metadata"]["epochs"] == 0
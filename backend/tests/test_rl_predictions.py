@@ -118,3 +118,49 @@ async def test_rl_prediction_invalid_feedback(client, mock_supabase_client, mock
     response = client.post(f"/chronotype/{chronotype_id}/predict", json=payload)
 
     assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_rl_prediction_persists_curve_and_folds_feedback_log(client, mock_supabase_client):
+    chronotype_id = "chronotype-rl-real"
+    mock_supabase_client.table("chronotypes").insert(
+        {
+            "chronotype_id": chronotype_id,
+            "user_id": "user-rl-real",
+            "data_points": [
+                {
+                    "time_of_day": "09:00:00",
+                    "predicted_energy_level": 0.7,
+                    "actual_energy_level": 0.7,
+                    "difference_from_actual": 0.0,
+                    "context": {"source": "initial_quiz"},
+                }
+            ],
+        }
+    ).execute()
+    client.post(
+        f"/chronotype/{chronotype_id}/feedback",
+        json={
+            "data_points": [
+                {
+                    "time_of_day": "14:00:00",
+                    "predicted_energy_level": 0.7,
+                    "actual_energy_level": 0.3,
+                    "difference_from_actual": 0.4,
+                    "context": {"source": "lower"},
+                }
+            ]
+        },
+    )
+
+    payload = {"feedback": [{"time_of_day": "20:00:00", "actual_energy_level": 0.8}]}
+    response = client.post(f"/chronotype/{chronotype_id}/predict", json=payload)
+
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert body["training_metadata"]["samples"] == 3
+    assert len(body["updated_chronotype"]["data_points"]) == 3
+
+    assert mock_supabase_client.table("chronotype_feedback").records == {}
+    follow_up = client.get(f"/chronotype/{chronotype_id}").json()
+    assert follow_up["data_points"] == body["updated_chronotype"]["data_points"]
@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi import status
+
+from backend.api import gemini as gemini_api
+from backend.config import settings
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def test_app_imports_without_settings_or_heavy_modules():
+    env = {k: v for k, v in os.environ.items() if k not in ("GOOGLE_API_KEY", "SUPABASE_URL", "SUPABASE_ANON_KEY")}
+    code = (
+        "import sys, backend.api.main, backend.api.gemini as g, backend.config as c; "
+        "print(g.gemini, c.get_settings.cache_info().currsize, "
+        "sorted(m for m in ('google.genai', 'numpy', 'supabase') if m in sys.modules))"
+    )
+
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["None", "0", "[]"]
+
+
+def test_gemini_is_built_on_first_use(client, monkeypatch):
+    monkeypatch.setattr(gemini_api, "gemini", None)
+    monkeypatch.setattr(settings, "google_api_key", "")
+
+    response = client.get("/gemini/cache/stats")
+
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert gemini_api.gemini is None
+
+    monkeypatch.setattr(settings, "google_api_key", "test-key")
+
+    response = client.get("/gemini/cache/stats")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert gemini_api.gemini is not None
@@ -0,0 +1,159 @@
+"""
+Tests for background chronotype training jobs. Makes use of mocks in /conftest.py.
+"""
+
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from api.main import app
+from backend.dependencies import get_training_jobs
+from backend.services.rl_engine import ChronotypeRLEngine
+from backend.services.training_jobs import FAILED, SUCCEEDED, TrainingJobManager
+
+
+def _seed(mock_supabase_client, chronotype_id):
+    mock_supabase_client.table("chronotypes").insert(
+        {
+            "chronotype_id": chronotype_id,
+            "user_id": "user-jobs",
+            "data_points": [
+                {
+                    "time_of_day": f"{hour:02d}:00:00",
+                    "predicted_energy_level": 0.5,
+                    "actual_energy_level": 0.5,
+                    "difference_from_actual": 0.0,
+                    "context": {"source": "initial_quiz"},
+                }
+                for hour in (6, 12, 18)
+            ],
+        }
+    ).execute()
+
+
+@pytest.fixture
+def thread_jobs():
+    manager = TrainingJobManager(ThreadPoolExecutor(max_workers=2))
+
+    async def override_jobs():
+        return manager
+
+    app.dependency_overrides[get_training_jobs] = override_jobs
+    yield manager
+    app.dependency_overrides.pop(get_training_jobs, None)
+    manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_repeat_submissions_are_coalesced():
+    manager = TrainingJobManager(ThreadPoolExecutor(max_workers=1))
+    release = asyncio.Event()
+    runs = []
+
+    async def runner(job):
+        runs.append((job.job_id, list(job.feedback)))
+        await release.wait()
+        return {"training_metadata": {"epochs": 1}}
+
+    first, coalesced = manager.submit("c1", [], {}, runner)
+    assert coalesced is False
+    await asyncio.sleep(0)
+
+    again, coalesced = manager.submit("c1", [], {}, runner)
+    assert (again, coalesced) == (first, True)
+
+    follow_up, coalesced = manager.submit("c1", [], {"learning_rate": 0.5}, runner)
+    assert follow_up is not first and coalesced is False
+    manager.submit("c1", [{"actual_energy_level": 0.2}], {}, runner)
+    merged, coalesced = manager.submit("c1", [{"actual_energy_level": 0.9}], {"max_epochs": 3}, runner)
+    assert follow_up is not first
+    assert (merged, coalesced) == (follow_up, True)
+
+    release.set()
+    await first.task
+    await follow_up.task
+
+    assert first.status == SUCCEEDED
+    assert first.coalesced_submissions == 1
+    assert follow_up.status == SUCCEEDED
+    assert runs[1] == (follow_up.job_id, [{"actual_energy_level": 0.2}, {"actual_energy_level": 0.9}])
+    assert follow_up.config == {"learning_rate": 0.5, "max_epochs": 3}
+    manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_failed_runner_marks_job_failed():
+    manager = TrainingJobManager(ThreadPoolExecutor(max_workers=1))
+
+    async def runner(job):
+        raise RuntimeError("engine exploded")
+
+    job, _ = manager.submit("c1", [], {}, runner)
+    await job.task
+
+    assert job.status == FAILED
+    assert job.error == "engine exploded"
+    assert job.finished_at is not None
+    manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_async_predict_returns_202_and_job_completes(mock_supabase_client, thread_jobs):
+    chronotype_id = "chronotype-job-001"
+    _seed(mock_supabase_client, chronotype_id)
+
+    with TestClient(app) as client:
+        response = client.post(
+            f"/chronotype/{chronotype_id}/predict?mode=async",
+            json={"feedback": [{"time_of_day": "21:00:00", "actual_energy_level": 0.9}]},
+        )
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        job_id = response.json()["job_id"]
+
+        deadline = time.monotonic() + 5
+        while True:
+            job = client.get(f"/chronotype/jobs/{job_id}").json()
+            if job["status"] in (SUCCEEDED, FAILED) or time.monotonic() > deadline:
+                break
+            time.sleep(0.01)
+
+        assert job["status"] == SUCCEEDED
+        assert job["chronotype_id"] == chronotype_id
+        assert job["training_metadata"]["samples"] == 4
+
+        stored = client.get(f"/chronotype/{chronotype_id}").json()
+        assert len(stored["data_points"]) == 4
+
+
+@pytest.mark.asyncio
+async def test_async_predict_for_unknown_chronotype_is_404(client, thread_jobs):
+    response = client.post("/chronotype/missing/predict?mode=async", json={})
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_unknown_job_is_404(client, thread_jobs):
+    response = client.get("/chronotype/jobs/not-a-job")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_engine_runs_in_a_process_pool():
+    chronotype = {
+        "chronotype_id": "chronotype-process",
+        "user_id": "user-process",
+        "data_points": [],
+    }
+    feedback = [{"time_of_day": "08:00:00", "actual_energy_level": 0.7}]
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        result = pool.submit(ChronotypeRLEngine().train_and_predict, chronotype, feedback, {}).result(timeout=60)
+
+    assert result["training_metadata"]["samples"] == 1
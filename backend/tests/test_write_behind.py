@@ -0,0 +1,148 @@
+"""
+Tests for the write-behind buffer behind quiz submissions. Makes use of mocks in /conftest.py.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from api.main import app
+from backend.dependencies import _get_quiz_submission_buffer, get_quiz_submission_buffer
+from backend.services.async_db import AsyncSupabase
+from backend.services.write_behind import WriteBehindBuffer
+
+
+class FakeDB:
+    """Records written batches; the first ``failures`` writes raise, as does any batch with a ``bad`` row."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.batches = []
+
+    def table(self, name):
+        return self
+
+    def upsert(self, rows, on_conflict, ignore_duplicates):
+        assert ignore_duplicates
+        self._rows = rows
+        return self
+
+    async def execute(self):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("database unavailable")
+        if any(row.get("bad") for row in self._rows):
+            raise RuntimeError("violates check constraint")
+        self.batches.append(list(self._rows))
+
+
+@pytest.mark.asyncio
+async def test_rows_are_written_in_batches_off_the_caller():
+    db = FakeDB()
+    buffer = WriteBehindBuffer("quiz_submissions", max_pending=10, batch_size=3, flush_interval=60)
+
+    for i in range(4):
+        await buffer.add(db, {"n": i})
+    assert db.batches == []
+
+    # A full batch wakes the flusher, which drains everything pending in batch-sized chunks.
+    await asyncio.sleep(0.01)
+    assert db.batches == [[{"n": 0}, {"n": 1}, {"n": 2}], [{"n": 3}]]
+
+    await buffer.add(db, {"n": 4})
+    await buffer.close()
+    assert db.batches[-1] == [{"n": 4}]
+    assert buffer.stats()["written"] == 5
+    assert buffer.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_insert_is_retried_then_set_aside_in_halves():
+    db = FakeDB(failures=3)
+    buffer = WriteBehindBuffer("t", max_pending=4, batch_size=2, flush_interval=60, max_retries=1, retry_backoff=0)
+    await buffer.add(db, {"n": 0})
+    await buffer.add(db, {"n": 1})
+
+    assert await buffer.flush() == 0
+    assert buffer.pending == 2
+    assert (buffer.retries, buffer.failed_flushes) == (1, 1)
+
+    assert await buffer.flush() == 2
+    assert db.batches == [[{"n": 0}], [{"n": 1}]]
+    await buffer.close()
+
+
+@pytest.mark.asyncio
+async def test_full_buffer_flushes_inline_and_drops_only_when_database_is_down():
+    db = FakeDB(failures=100)
+    buffer = WriteBehindBuffer("t", max_pending=2, batch_size=2, flush_interval=60, max_retries=0)
+    for i in range(3):
+        await buffer.add(db, {"n": i})
+
+    assert buffer.pending == 2
+    assert buffer.dropped == 1
+
+    db.failures = 0
+    await buffer.add(db, {"n": 3})
+    assert db.batches == [[{"n": 0}], [{"n": 1}]]
+    assert buffer.pending == 1
+    await buffer.close()
+
+
+@pytest.mark.asyncio
+async def test_a_row_that_always_fails_is_dead_lettered_without_blocking_later_rows():
+    db = FakeDB()
+    buffer = WriteBehindBuffer("t", max_pending=8, batch_size=4, flush_interval=60, max_retries=0)
+    for row in [{"n": 0}, {"n": 1, "bad": True}, {"n": 2}, {"n": 3}]:
+        await buffer.add(db, row)
+
+    assert await buffer.flush() == 0
+    await buffer.add(db, {"n": 4})
+    for _ in range(3):
+        await buffer.flush()
+
+    assert sorted(row["n"] for batch in db.batches for row in batch) == [0, 2, 3, 4]
+    assert list(buffer.dead_letters) == [{"n": 1, "bad": True}]
+    assert (buffer.pending, buffer.dead_lettered, buffer.dropped) == (0, 1, 0)
+    await buffer.close()
+
+
+@pytest.mark.asyncio
+async def test_retried_rows_are_not_written_twice(mock_supabase_client):
+    db = AsyncSupabase(mock_supabase_client, ThreadPoolExecutor(max_workers=1))
+    buffer = WriteBehindBuffer("quiz_submissions", on_conflict="quiz_id", batch_size=2, max_pending=4, flush_interval=60)
+    mock_supabase_client.table("quiz_submissions").insert({"quiz_id": "q-1", "attempt": 1}).execute()
+
+    await buffer.add(db, {"quiz_id": "q-1", "attempt": 2})
+    await buffer.add(db, {"quiz_id": "q-2", "attempt": 1})
+    assert await buffer.flush() == 2
+
+    rows = sorted(mock_supabase_client.table("quiz_submissions").records.values(), key=lambda row: row["quiz_id"])
+    assert [(row["quiz_id"], row["attempt"]) for row in rows] == [("q-1", 1), ("q-2", 1)]
+    await buffer.close()
+
+
+def test_submit_quiz_stores_submission_on_shutdown(mock_supabase_client):
+    # Use the application's own buffer, which the lifespan flushes on shutdown.
+    app.dependency_overrides.pop(get_quiz_submission_buffer, None)
+    _get_quiz_submission_buffer.cache_clear()
+    with TestClient(app) as client:
+        response = client.post(
+            "/quiz/submit",
+            json={
+                "user_id": "user-wb",
+                "responses": [{"question_id": 2, "question_text": "Wake time?", "response_value": "5am"}],
+            },
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert mock_supabase_client.table("quiz_submissions").records == {}
+        assert client.get("/quiz/submissions/stats").json()["pending"] == 1
+
+    _get_quiz_submission_buffer.cache_clear()
+
+    rows = list(mock_supabase_client.table("quiz_submissions").records.values())
+    assert [row["quiz_id"] for row in rows] == [response.json()["quiz_id"]]
+    assert rows[0]["chronotype_id"] == response.json()["chronotype_id"]